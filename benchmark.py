@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Toner Inventory System
+Generiše sintetičku bazu zadate veličine i meri glavne operacije bez prozora (Qt offscreen).
+
+Primeri:
+    python benchmark.py --scale small
+    python benchmark.py --scale medium --repeat 5 --output results_v1.json
+    python benchmark.py --scale medium --compare results_v1.json --threshold 20
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+SCALES = {
+    # toneri, štampači, radnici, narudžbine, potrošnja
+    'tiny': dict(toners=200, printers=100, employees=300, orders=2_000, consumption=5_000),
+    'small': dict(toners=1_000, printers=500, employees=2_000, orders=50_000, consumption=100_000),
+    'medium': dict(toners=10_000, printers=5_000, employees=20_000, orders=500_000, consumption=1_000_000),
+    'large': dict(toners=10_000, printers=5_000, employees=20_000, orders=2_000_000, consumption=5_000_000),
+}
+
+BRANDS = ['HP', 'Canon', 'Brother', 'Kyocera', 'Xerox', 'Lexmark', 'Ricoh', 'Samsung', 'Epson', 'OKI']
+FIRST_NAMES = ['Marko', 'Jelena', 'Nikola', 'Ana', 'Stefan', 'Milica', 'Luka', 'Ivana', 'Petar', 'Marija',
+               'Igor', 'Dragana', 'Miloš', 'Tijana', 'Vuk', 'Sanja', 'Đorđe', 'Katarina', 'Nemanja', 'Jovana']
+LAST_NAMES = ['Petrović', 'Jovanović', 'Nikolić', 'Marković', 'Đorđević', 'Stojanović', 'Ilić', 'Stanković',
+              'Pavlović', 'Milošević', 'Popović', 'Kovačević', 'Todorović', 'Lazić', 'Malkočević']
+DEPARTMENTS = ['Računovodstvo', 'Prodaja', 'IT', 'Pravna služba', 'Nabavka', 'Marketing', 'Uprava', 'Magacin']
+STATUSES = ['Aktivan'] * 8 + ['Na servisu', 'Za rashod']
+HISTORY_DAYS = 700  # unutar 2 godine - cleanup_old_history ništa ne briše tokom merenja
+SEARCH_PATTERNS = ['tn-00', 'kyocera', 'petrović', 'sprat 3']
+
+
+def generate_dataset(db_path, toners, printers, employees, orders, consumption, seed=42):
+    """Pravi bazu preko Database() (sve migracije) i puni je sintetičkim podacima"""
+    import toner_app_multilang as app
+
+    rng = random.Random(seed)
+    app.Database(db_path).close()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    today = date.today()
+
+    def some_day():
+        return (today - timedelta(days=rng.randrange(HISTORY_DAYS))).isoformat()
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO toneri (model, opis, minimalna_kolicina, trenutno_stanje) VALUES (?, ?, ?, ?)",
+            ((f"TN-{i:05d}", f"{rng.choice(BRANDS)} {rng.choice(['crni', 'cijan', 'magenta', 'žuti'])}",
+              rng.randint(1, 5), rng.randint(0, 12)) for i in range(toners)))
+        conn.executemany(
+            "INSERT INTO stampaci (model, serijski_broj, status, napomena, kolicina, driver_link) VALUES (?, ?, ?, ?, ?, ?)",
+            ((f"{rng.choice(BRANDS)} {rng.choice(['LaserJet', 'i-SENSYS', 'ECOSYS', 'WorkCentre'])} {i}",
+              f"SN{i:08d}", rng.choice(STATUSES), f"sprat {rng.randint(0, 9)}, kancelarija {rng.randint(1, 60)}",
+              rng.randint(1, 5), "www.example.com/drivers" if rng.random() < 0.3 else None)
+             for i in range(printers)))
+        conn.executemany(
+            "INSERT INTO radnici (ime, prezime, odeljenje) VALUES (?, ?, ?)",
+            ((rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)}{i}", rng.choice(DEPARTMENTS))
+             for i in range(employees)))
+        # Svaki štampač koristi 1-4 tonera, radnici dele štampače (jedan štampač - više radnika)
+        conn.executemany(
+            "INSERT OR IGNORE INTO stampac_toneri (stampac_id, toner_id) VALUES (?, ?)",
+            ((stampac_id, rng.randint(1, toners))
+             for stampac_id in range(1, printers + 1) for _ in range(rng.randint(1, 4))))
+        conn.executemany(
+            "INSERT OR IGNORE INTO radnik_stampaci (radnik_id, stampac_id) VALUES (?, ?)",
+            ((radnik_id, rng.randint(1, printers))
+             for radnik_id in range(1, employees + 1) for _ in range(rng.randint(0, 2))))
+        conn.executemany(
+            "INSERT INTO istorija_narudzbi (datum, toner_id, kolicina, napomena) VALUES (?, ?, ?, ?)",
+            ((some_day(), rng.randint(1, toners), rng.randint(1, 10), rng.choice(['Narudžbina', 'Automatska narudžbina']))
+             for _ in range(orders)))
+        conn.executemany(
+            "INSERT INTO istorija_potrosnje (datum, toner_id) VALUES (?, ?)",
+            ((some_day(), rng.randint(1, toners)) for _ in range(consumption)))
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+class Benchmark:
+    """Pokreće MainWindow nad generisanom bazom i meri operacije (svaka do kraja pozadinskog posla)"""
+    def __init__(self, app, module, repeat, timeout=600):
+        self.qt_app = app
+        self.m = module
+        self.repeat = repeat
+        self.timeout = timeout
+        self.results = {}
+        self.window = None
+
+    def pump(self):
+        self.qt_app.processEvents()
+        time.sleep(0.001)
+
+    def wait_idle(self):
+        """Čeka da DatabaseWorker i red izvoza završe sve poslove i da event loop isprazni posledice"""
+        deadline = time.perf_counter() + self.timeout
+        idle_rounds = 0
+        while idle_rounds < 3:
+            self.pump()
+            idle = self.window.db_worker.is_idle() and self.window.export_jobs.is_idle()
+            idle_rounds = idle_rounds + 1 if idle else 0
+            if time.perf_counter() > deadline:
+                raise TimeoutError("benchmark operation did not finish")
+
+    def measure(self, name, action, wait=None):
+        runs = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            action()
+            (wait or self.wait_idle)()
+            runs.append((time.perf_counter() - start) * 1000)
+        self.results[name] = {
+            'runs_ms': [round(ms, 2) for ms in runs],
+            'median_ms': round(statistics.median(runs), 2),
+            'min_ms': round(min(runs), 2),
+        }
+        print(f"  {name:<32} median {statistics.median(runs):9.1f} ms   min {min(runs):9.1f} ms")
+
+    def patch_dialogs(self, output_dir):
+        """Bez dijaloga i spoljnih programa: fajlovi idu u output_dir, 'otvaranje' se samo beleži"""
+        m = self.m
+        counter = iter(range(1_000_000))
+        m.QFileDialog.getSaveFileName = staticmethod(
+            lambda *a, **k: (os.path.join(output_dir, f"export_{next(counter)}.xlsx"), ''))
+        for name in ('information', 'warning', 'critical'):
+            setattr(m.QMessageBox, name, staticmethod(lambda *a, **k: m.QMessageBox.Ok))
+        m.QMessageBox.question = staticmethod(lambda *a, **k: m.QMessageBox.No)
+        m.QDesktopServices.openUrl = staticmethod(self.discard_preview)
+        m.subprocess = argparse.Namespace(Popen=lambda *a, **k: None)
+        if hasattr(m.os, 'startfile'):
+            m.os.startfile = lambda path: None
+
+    @staticmethod
+    def discard_preview(url):
+        """Umesto browsera: preview ostaje u kešu izveštaja (REPORT_CACHE_DIR u radnom folderu)"""
+        return True
+
+    def run(self):
+        m = self.m
+        start = time.perf_counter()
+        self.window = w = m.MainWindow()
+        w.show()
+        self.wait_idle()
+        while w.startup.interactive_ms is None:
+            self.pump()
+        self.results['startup'] = {
+            'runs_ms': [round((time.perf_counter() - start) * 1000, 2)],
+            'interactive_ms': round(w.startup.interactive_ms, 2),
+            'phases_ms': {phase: round(ms, 2) for phase, ms in w.startup.timings},
+        }
+        print(f"  {'startup (window + first data)':<32} {self.results['startup']['runs_ms'][0]:9.1f} ms")
+        self.wait_idle()
+
+        # Učitavanje tabova se meri bez keša skupova (ReportDatasets), izveštaji kasnije koriste keš
+        self.measure('load_toneri', self.cold(w.load_toneri))
+        self.measure('load_stampaci', self.cold(w.load_stampaci))
+        self.measure('load_radnici', self.cold(w.load_radnici))
+        self.measure('load_pregled', self.cold(w.load_pregled))
+
+        # Istorija i statistika za ceo period (najgori slučaj)
+        w.istorija_tab.build()
+        w.statistika_tab.build()
+        self.wait_idle()
+        w.history_year_combo.setCurrentIndex(0)
+        w.history_month_combo.setCurrentIndex(0)
+        w.stats_year_combo.setCurrentIndex(0)
+        w.stats_month_combo.setCurrentIndex(0)
+        self.wait_idle()
+        self.measure('load_istorija', w.load_istorija)
+        self.measure('show_statistika', w.show_statistika)
+
+        # Pretraga: sve tabele moraju biti učitane, debounce se preskače
+        w.invalidation_bus.set_live((w.toneri_tab, w.stampaci_tab, w.radnici_tab, w.pregled_tab))
+        self.wait_idle()
+        for pattern in SEARCH_PATTERNS:
+            self.measure(f'search_all[{pattern}]', lambda: self.search(pattern), wait=self.wait_search)
+        self.search('')
+        self.wait_search()
+
+        order_rows = self.order_rows()
+        self.measure('export_tonere_excel', w.export_tonere_excel)
+        self.measure('export_stampace_excel', w.export_stampace_excel)
+        self.measure('export_pregled_excel', w.export_pregled_excel)
+        self.measure('export_narudzbu_excel', lambda: w.export_narudzbu_excel(order_rows))
+        self.measure('export_full_excel', self.cold(w.export_full_excel))
+        previews = (
+            ('preview_tonere_html', w.stampaj_tonere),
+            ('preview_stampace_html', w.stampaj_stampace),
+            ('preview_pregled_html', w.preview_pregled),
+            ('preview_narudzbu_html', lambda: w.preview_narudzbu(order_rows)),
+        )
+        for name, action in previews:
+            self.measure(name, self.uncached(action))
+        for name, action in previews:
+            self.measure(f'{name}_cached', action)
+
+        w.db_worker.shutdown()
+        w.db.close()
+        return self.results
+
+    def cold(self, action):
+        """Akcija koja pre pokretanja prazni keš skupova izveštaja"""
+        def run():
+            self.window.datasets.clear()
+            action()
+        return run
+
+    def uncached(self, action):
+        """Akcija koja pre pokretanja prazni keš gotovih HTML izveštaja (skupovi redova ostaju)"""
+        def run():
+            self.window.report_cache.clear()
+            action()
+        return run
+
+    def search(self, pattern):
+        self.search_done = False
+        self.window.search_scheduler.finished.connect(self.on_search_finished)
+        self.window.search_input.setText(pattern)
+        self.window.search_scheduler.timer.stop()
+        self.window.search_scheduler.run()
+
+    def on_search_finished(self, pattern):
+        self.search_done = True
+        self.window.search_scheduler.finished.disconnect(self.on_search_finished)
+
+    def wait_search(self):
+        deadline = time.perf_counter() + self.timeout
+        while not self.search_done:
+            self.pump()
+            if time.perf_counter() > deadline:
+                raise TimeoutError("search did not finish")
+
+    def order_rows(self):
+        """Isti skup kao prikazi_narudzbu - toneri ispod minimuma"""
+        conn = self.window.db.get_connection()
+        rows = conn.execute('''
+            SELECT model, minimalna_kolicina, trenutno_stanje, (minimalna_kolicina - trenutno_stanje) as za_narucivanje
+            FROM toneri
+            WHERE CAST(trenutno_stanje AS INTEGER) < CAST(minimalna_kolicina AS INTEGER)
+            ORDER BY za_narucivanje DESC
+        ''').fetchall()
+        conn.close()
+        return rows
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, counts, baseline_path, threshold):
+    """Ispisuje operacije sporije od baseline-a za više od threshold % - vraća broj regresija"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline_report = json.load(f)
+    baseline = baseline_report['results']
+    regressions = 0
+    print(f"\nCompared to {baseline_path} (threshold {threshold:.0f}%):")
+    if baseline_report.get('counts') != counts:
+        print(f"  ⚠️ Baseline was measured on a different dataset: {baseline_report.get('counts')}")
+    for name, current in results.items():
+        old = baseline.get(name)
+        if not old or 'median_ms' not in current or not old.get('median_ms'):
+            continue
+        change = (current['median_ms'] - old['median_ms']) / old['median_ms'] * 100
+        marker = "❌ REGRESSION" if change > threshold else ("✅" if change < -threshold else "")
+        regressions += change > threshold
+        print(f"  {name:<32} {old['median_ms']:9.1f} -> {current['median_ms']:9.1f} ms  {change:+6.1f}% {marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Toner Inventory benchmark (headless)")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    for name in SCALES['small']:
+        parser.add_argument(f'--{name}', type=int, help=f"override {name} count for the chosen scale")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per operation")
+    parser.add_argument('--workdir', help="directory for toneri.db (generated data is reused if present)")
+    parser.add_argument('--regenerate', action='store_true', help="regenerate data even if workdir has toneri.db")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="previous results JSON - exit code 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=20.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    for name in counts:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+
+    output_path = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix='toner_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(workdir)  # aplikacija koristi toneri.db, app_config.json i backups/ iz tekućeg foldera
+
+    db_path = os.path.join(workdir, 'toneri.db')
+    generated_ms = None
+    if args.regenerate or not os.path.exists(db_path):
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        print(f"📦 Generating {args.scale} dataset in {workdir}: {counts}")
+        start = time.perf_counter()
+        generate_dataset(db_path, seed=args.seed, **counts)
+        generated_ms = (time.perf_counter() - start) * 1000
+        print(f"   done in {generated_ms / 1000:.1f} s")
+
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QT_VERSION_STR
+    import toner_app_multilang as app_module
+
+    qt_app = QApplication(sys.argv[:1])
+    exports_dir = os.path.join(workdir, 'exports')
+    os.makedirs(exports_dir, exist_ok=True)
+
+    print(f"⏱️ Running benchmark ({args.repeat} runs per operation)")
+    app_module.REPORT_CACHE_DIR = os.path.join(workdir, 'reports')
+    bench = Benchmark(qt_app, app_module, args.repeat)
+    bench.patch_dialogs(exports_dir)
+    results = bench.run()
+    shutil.rmtree(exports_dir, ignore_errors=True)
+    shutil.rmtree(app_module.REPORT_CACHE_DIR, ignore_errors=True)
+    for name in os.listdir(workdir):  # export_narudzbu_excel piše u tekući folder
+        if name.endswith('.xlsx'):
+            os.remove(os.path.join(workdir, name))
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'qt': QT_VERSION_STR,
+            'platform': platform.platform(),
+        },
+        'scale': args.scale,
+        'counts': counts,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'generate_ms': round(generated_ms, 2) if generated_ms is not None else None,
+        'results': results,
+        'instrumentation': [
+            dict(zip(('name', 'calls', 'samples', 'p50_ms', 'p95_ms', 'max_ms', 'rows'), row))
+            for row in app_module.INSTRUMENTATION.summary()],
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Results written to {output_path}")
+
+    regressions = compare(results, counts, baseline_path, args.threshold) if baseline_path else 0
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,143 +6,2554 @@ Pravi: Igor Malkočević
 """
 
 import sys
+import os
+import io
+import json
+import hashlib
+import time
+import pickle
+import shutil
+import string
 import sqlite3
+import platform
+import tempfile
+import threading
+import re
+import inspect
+import itertools
+import functools
+import subprocess
+import logging
+import logging.handlers
+from collections import deque, Counter
+from contextlib import contextmanager
+from datetime import date, datetime
+from html import escape as html_escape
 from translations import T
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QTabWidget, QTableWidget, QTableWidgetItem,
                              QPushButton, QLineEdit, QLabel, QComboBox, QSpinBox,
                              QMessageBox, QDialog, QFormLayout, QTextEdit, QHeaderView,
-                             QCheckBox, QFileDialog, QMenuBar, QAction, QMenu)
-from PyQt5.QtCore import Qt, QUrl, QTimer, QSettings
-from PyQt5.QtGui import QColor, QDesktopServices
+                             QCheckBox, QFileDialog, QMenuBar, QAction, QMenu, QTableView,
+                             QStyledItemDelegate, QShortcut, QProgressBar)
+from PyQt5.QtCore import (Qt, QUrl, QTimer, QSettings, QObject, QRunnable, QThreadPool,
+                          QEvent, pyqtSignal, QAbstractTableModel, QAbstractProxyModel, QSortFilterProxyModel,
+                          QModelIndex)
+from PyQt5.QtGui import QColor, QFont, QBrush, QPalette, QDesktopServices, QTextDocument, QKeySequence
+
+APP_CONFIG_FILE = 'app_config.json'
+REPORT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'toner_app_reports')  # HTML preview-i (ReportCache)
+
+
+def _add_column_if_missing(cursor, table, column, definition):
+    """Dodaje kolonu samo ako već ne postoji (idempotentno)"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _migration_1_base_schema(cursor):
+    """Osnovna šema - sve tabele iz verzije 2.0.0"""
+    # Tabela TONERI
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS toneri (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            model TEXT NOT NULL UNIQUE,
+            opis TEXT,
+            minimalna_kolicina INTEGER DEFAULT 2,
+            trenutno_stanje INTEGER DEFAULT 0,
+            driver_link TEXT
+        )
+    ''')
+    
+    # Tabela ŠTAMPAČI
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stampaci (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            model TEXT NOT NULL,
+            serijski_broj TEXT UNIQUE,
+            status TEXT DEFAULT 'Aktivan',
+            napomena TEXT,
+            kolicina INTEGER DEFAULT 1,
+            driver_link TEXT
+        )
+    ''')
+    
+    # Kolone dodate kasnije (za starije baze)
+    _add_column_if_missing(cursor, "stampaci", "kolicina", "INTEGER DEFAULT 1")
+    _add_column_if_missing(cursor, "stampaci", "driver_link", "TEXT")
+    
+    # Tabela RADNICI
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS radnici (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ime TEXT NOT NULL,
+            prezime TEXT NOT NULL,
+            odeljenje TEXT
+        )
+    ''')
+    
+    # Veza: Štampač koristi tonere (Many-to-Many)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stampac_toneri (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stampac_id INTEGER,
+            toner_id INTEGER,
+            FOREIGN KEY (stampac_id) REFERENCES stampaci(id),
+            FOREIGN KEY (toner_id) REFERENCES toneri(id),
+            UNIQUE(stampac_id, toner_id)
+        )
+    ''')
+    
+    # Veza: Radnik ima štampače (Many-to-Many)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS radnik_stampaci (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            radnik_id INTEGER,
+            stampac_id INTEGER,
+            datum_dodeljivanja DATE DEFAULT CURRENT_DATE,
+            FOREIGN KEY (radnik_id) REFERENCES radnici(id),
+            FOREIGN KEY (stampac_id) REFERENCES stampaci(id),
+            UNIQUE(radnik_id, stampac_id)
+        )
+    ''')
+    
+    # Istorija narudžbina
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS istorija_narudzbi (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            datum DATE DEFAULT CURRENT_DATE,
+            toner_id INTEGER,
+            kolicina INTEGER,
+            napomena TEXT,
+            FOREIGN KEY (toner_id) REFERENCES toneri(id)
+        )
+    ''')
+    
+    # Istorija potrošnje
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS istorija_potrosnje (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            datum DATE DEFAULT CURRENT_DATE,
+            toner_id INTEGER,
+            kolicina INTEGER DEFAULT 1,
+            FOREIGN KEY (toner_id) REFERENCES toneri(id)
+        )
+    ''')
+    
+    # Backup settings
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS backup_settings (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            enabled INTEGER DEFAULT 0,
+            day_of_month INTEGER DEFAULT 1,
+            last_backup_date DATE
+        )
+    ''')
+    
+    # Inicijalizuj backup settings ako ne postoji
+    cursor.execute("INSERT OR IGNORE INTO backup_settings (id) VALUES (1)")
+
+
+def _migration_2_indexes(cursor):
+    """Sekundarni indeksi za veze i datume istorije"""
+    # UNIQUE(stampac_id, toner_id) i UNIQUE(radnik_id, stampac_id) već pokrivaju prvu kolonu,
+    # ovde dodajemo indekse za pretragu po drugoj koloni veze
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stampac_toneri_toner ON stampac_toneri(toner_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_radnik_stampaci_stampac ON radnik_stampaci(stampac_id)")
+    
+    # Istorija: filtriranje po periodu i po toneru
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_istorija_narudzbi_datum ON istorija_narudzbi(datum)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_istorija_narudzbi_toner_datum ON istorija_narudzbi(toner_id, datum)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_istorija_potrosnje_datum ON istorija_potrosnje(datum)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_istorija_potrosnje_toner_datum ON istorija_potrosnje(toner_id, datum)")
+
+
+def _migration_3_consumption_rollup(cursor):
+    """Dnevni zbir potrošnje po toneru, održavan trigerima nad istorija_potrosnje"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS potrosnja_dnevno (
+            datum DATE NOT NULL,
+            toner_id INTEGER NOT NULL,
+            broj INTEGER NOT NULL DEFAULT 0,
+            kolicina INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (datum, toner_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_potrosnja_dnevno_toner ON potrosnja_dnevno(toner_id, datum)")
+    
+    # Mesečni zbir za grafikone - čita se iz dnevnog, ne iz sirovih događaja
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS potrosnja_mesecno AS
+        SELECT substr(datum, 1, 7) AS mesec, toner_id, SUM(broj) AS broj, SUM(kolicina) AS kolicina
+        FROM potrosnja_dnevno
+        GROUP BY substr(datum, 1, 7), toner_id
+    ''')
+    
+    # Ključ dana: date() normalizuje eventualno vreme u datumu, NULL toner/datum idu pod 0/''
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_potrosnja_insert AFTER INSERT ON istorija_potrosnje
+        BEGIN
+            INSERT INTO potrosnja_dnevno (datum, toner_id, broj, kolicina)
+            VALUES (COALESCE(date(NEW.datum), NEW.datum, ''), COALESCE(NEW.toner_id, 0), 1, COALESCE(NEW.kolicina, 0))
+            ON CONFLICT(datum, toner_id) DO UPDATE
+            SET broj = broj + 1, kolicina = kolicina + excluded.kolicina;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_potrosnja_delete AFTER DELETE ON istorija_potrosnje
+        BEGIN
+            UPDATE potrosnja_dnevno
+            SET broj = broj - 1, kolicina = kolicina - COALESCE(OLD.kolicina, 0)
+            WHERE datum = COALESCE(date(OLD.datum), OLD.datum, '') AND toner_id = COALESCE(OLD.toner_id, 0);
+            DELETE FROM potrosnja_dnevno
+            WHERE datum = COALESCE(date(OLD.datum), OLD.datum, '') AND toner_id = COALESCE(OLD.toner_id, 0) AND broj <= 0;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_potrosnja_update AFTER UPDATE OF datum, toner_id, kolicina ON istorija_potrosnje
+        BEGIN
+            UPDATE potrosnja_dnevno
+            SET broj = broj - 1, kolicina = kolicina - COALESCE(OLD.kolicina, 0)
+            WHERE datum = COALESCE(date(OLD.datum), OLD.datum, '') AND toner_id = COALESCE(OLD.toner_id, 0);
+            DELETE FROM potrosnja_dnevno
+            WHERE datum = COALESCE(date(OLD.datum), OLD.datum, '') AND toner_id = COALESCE(OLD.toner_id, 0) AND broj <= 0;
+            INSERT INTO potrosnja_dnevno (datum, toner_id, broj, kolicina)
+            VALUES (COALESCE(date(NEW.datum), NEW.datum, ''), COALESCE(NEW.toner_id, 0), 1, COALESCE(NEW.kolicina, 0))
+            ON CONFLICT(datum, toner_id) DO UPDATE
+            SET broj = broj + 1, kolicina = kolicina + excluded.kolicina;
+        END
+    ''')
+    
+    # Jednokratno popunjavanje za postojeće baze
+    cursor.execute("DELETE FROM potrosnja_dnevno")
+    cursor.execute('''
+        INSERT INTO potrosnja_dnevno (datum, toner_id, broj, kolicina)
+        SELECT COALESCE(date(datum), datum, ''), COALESCE(toner_id, 0), COUNT(*), SUM(COALESCE(kolicina, 0))
+        FROM istorija_potrosnje
+        GROUP BY 1, 2
+    ''')
+
+
+def _migration_4_search_index(cursor):
+    """FTS5 indeks za globalnu pretragu - toneri, štampači i radnici u jednoj tabeli.
+    Trigram tokeni daju pretragu po podnizu (kao u tabelama); rowid = id * 4 + vrsta."""
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS pretraga USING fts5(tekst, tokenize='trigram')")
+    except sqlite3.OperationalError as e:
+        # SQLite bez FTS5 ili trigram tokenizera (< 3.34) - pretraga ostaje u memoriji
+        print(f"⚠️ Search index unavailable: {e}")
+        return
+    
+    # (tabela, vrsta, kolone koje ulaze u indeks, tekst reda - {r} je new/ime tabele)
+    sources = (
+        ('toneri', 1, "model, opis",
+         "{r}.model || char(10) || COALESCE({r}.opis, '')"),
+        ('stampaci', 2, "model, serijski_broj, status, napomena, driver_link",
+         "{r}.model || char(10) || COALESCE({r}.serijski_broj, '') || char(10) || COALESCE({r}.status, '')"
+         " || char(10) || COALESCE({r}.napomena, '') || char(10) || COALESCE({r}.driver_link, '')"),
+        ('radnici', 3, "ime, prezime, odeljenje",
+         "{r}.ime || ' ' || {r}.prezime || char(10) || COALESCE({r}.odeljenje, '')"),
+    )
+    _create_search_triggers(cursor, sources)
+
+
+def _create_search_triggers(cursor, sources):
+    """Trigeri koji drže 'pretraga' usklađenom sa tabelama i popunjavanje za postojeće redove
+    (sources kao u _migration_4_search_index)"""
+    for table, kind, columns, text in sources:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_pretraga_{table}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO pretraga(rowid, tekst) VALUES (new.id * 4 + {kind}, {text.format(r='new')});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_pretraga_{table}_update AFTER UPDATE OF {columns} ON {table}
+            BEGIN
+                DELETE FROM pretraga WHERE rowid = old.id * 4 + {kind};
+                INSERT INTO pretraga(rowid, tekst) VALUES (new.id * 4 + {kind}, {text.format(r='new')});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_pretraga_{table}_delete AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM pretraga WHERE rowid = old.id * 4 + {kind};
+            END
+        ''')
+        # Postojeći podaci
+        cursor.execute(f"DELETE FROM pretraga WHERE rowid % 4 = {kind}")
+        cursor.execute(f"INSERT INTO pretraga(rowid, tekst) SELECT id * 4 + {kind}, {text.format(r=table)} FROM {table}")
+
+
+def _migration_6_search_index_text(cursor):
+    """Tekst reda u 'pretraga' pokriva i ono što tabela prikazuje (id, količine, status na oba jezika),
+    pa pogotke globalne pretrage daje indeks, isto kao pretraga po prikaznom tekstu u memoriji"""
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pretraga'").fetchone() is None:
+        return  # SQLite bez FTS5 - vidi _migration_4_search_index
+    
+    labels = {}
+    for lang in ('sr', 'en'):
+        for status, label in status_labels(lang).items():
+            labels.setdefault(status, []).append(label)
+    status_text = "CASE {r}.status " + " ".join(
+        "WHEN '{}' THEN '{}'".format(status.replace("'", "''"), " ".join(names).replace("'", "''"))
+        for status, names in labels.items()) + " ELSE COALESCE({r}.status, '') END"
+    
+    # Redosled kao kolone tabele, zatim kolone koje se ne prikazuju (opis, serijski broj, odeljenje)
+    sources = (
+        ('toneri', 1, "model, minimalna_kolicina, trenutno_stanje, opis",
+         "{r}.id || char(10) || {r}.model || char(10) || COALESCE({r}.minimalna_kolicina, '')"
+         " || char(10) || COALESCE({r}.trenutno_stanje, '') || char(10) || COALESCE({r}.opis, '')"),
+        ('stampaci', 2, "model, kolicina, serijski_broj, status, napomena, driver_link",
+         "{r}.id || char(10) || {r}.model || char(10) || COALESCE({r}.kolicina, 1) || char(10) || " + status_text +
+         " || char(10) || COALESCE({r}.napomena, '') || char(10) || COALESCE({r}.driver_link, '')"
+         " || char(10) || COALESCE({r}.serijski_broj, '')"),
+        ('radnici', 3, "ime, prezime, odeljenje",
+         "{r}.id || char(10) || {r}.ime || char(10) || {r}.prezime || char(10) || COALESCE({r}.odeljenje, '')"),
+    )
+    for table, _, _, _ in sources:
+        for event in ('insert', 'update', 'delete'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_pretraga_{table}_{event}")
+    _create_search_triggers(cursor, sources)
+
+
+# Tabele čija izmena menja data_version (keš izveštaja, vidi ReportDatasets)
+DATA_VERSION_TABLES = ('toneri', 'stampaci', 'radnici', 'stampac_toneri', 'radnik_stampaci',
+                       'istorija_narudzbi', 'istorija_potrosnje')
+
+
+def _migration_5_data_version(cursor):
+    """Brojač izmena podataka u tabeli meta - trigeri ga uvećavaju pri svakoj izmeni"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS meta (
+            kljuc TEXT PRIMARY KEY,
+            vrednost INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO meta (kljuc, vrednost) VALUES ('data_version', 0)")
+    for table in DATA_VERSION_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_data_version_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE meta SET vrednost = vrednost + 1 WHERE kljuc = 'data_version';
+                END
+            ''')
+
+
+# Migracije šeme po redu: (verzija, funkcija). Svaka mora biti idempotentna.
+# Nova migracija se dodaje na kraj liste sa sledećim brojem verzije.
+MIGRATIONS = [
+    (1, _migration_1_base_schema),
+    (2, _migration_2_indexes),
+    (3, _migration_3_consumption_rollup),
+    (4, _migration_4_search_index),
+    (5, _migration_5_data_version),
+    (6, _migration_6_search_index_text),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def build_period_filter(column, year=None, month=None):
+    """Pravi filter za period kao poluotvoren opseg (column >= ? AND column < ?) da bi upit mogao da koristi indeks.
+    
+    Vraća (sql, params); prazan sql znači "sve vreme". Datumi u bazi su ISO tekst (YYYY-MM-DD).
+    """
+    if year is None:
+        if month is None:
+            return "", []
+        # Isti mesec u svim godinama ne može da se izrazi jednim opsegom (retko se koristi)
+        return f"strftime('%m', {column}) = ?", [f"{int(month):02d}"]
+    
+    year = int(year)
+    if month is None:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    else:
+        month = int(month)
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return f"{column} >= ? AND {column} < ?", [start.isoformat(), end.isoformat()]
+
+
+class TimingRecord:
+    """Jedno merenje: kada, šta (name), koliko ms, koliko redova, detalj (npr. SQL)"""
+    __slots__ = ('when', 'name', 'ms', 'rows', 'detail')
+    
+    def __init__(self, name, ms=0.0, rows=None, detail=None):
+        self.when = time.time()
+        self.name = name
+        self.ms = ms
+        self.rows = rows
+        self.detail = detail
+    
+    def to_dict(self):
+        return {'when': datetime.fromtimestamp(self.when).isoformat(timespec='milliseconds'),
+                'name': self.name, 'ms': round(self.ms, 3), 'rows': self.rows, 'detail': self.detail}
+
+
+def _percentile(values, percent):
+    """Percentil (nearest-rank) sortirane liste"""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+def _row_count(result):
+    """Broj redova iz rezultata _fetch_* metode: lista redova, (redovi, ...) tuple ili ReportDataset"""
+    if isinstance(getattr(result, 'rows', None), list):
+        return len(result.rows)
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    return None
+
+
+class Instrumentation:
+    """Merenja u memoriji: poslednjih N merenja (ring buffer) i ukupan broj poziva po operaciji.
+    
+    Upisuju ga SQL kursori (TimedCursor, ime 'sql') i metode označene sa @INSTRUMENTATION.timed();
+    čita ga DiagnosticsDialog (Ctrl+Shift+D). Upis je bezbedan iz više threadova.
+    """
+    QUERY = 'sql'
+    
+    def __init__(self, capacity=5000):
+        self.records = deque(maxlen=capacity)
+        self.calls = Counter()  # broji i merenja koja su ispala iz bafera
+        self.lock = threading.Lock()
+    
+    def record(self, name, ms, rows=None, detail=None):
+        record = TimingRecord(name, ms, rows, detail)
+        with self.lock:
+            self.records.append(record)
+            self.calls[name] += 1
+        return record
+    
+    @contextmanager
+    def measure(self, name, detail=None):
+        """with INSTRUMENTATION.measure('ime') as record: ... record.rows = n"""
+        record = TimingRecord(name, detail=detail)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.ms = (time.perf_counter() - start) * 1000
+            with self.lock:
+                self.records.append(record)
+                self.calls[name] += 1
+    
+    def timed(self, name=None):
+        """Dekorator: meri svaki poziv funkcije; broj redova čita iz povratne vrednosti"""
+        def decorator(fn):
+            label = name or fn.__name__
+            # Qt signali (npr. clicked(bool)) šalju argumente koje metoda ne prima - PyQt ih
+            # odbacuje samo kad vidi pravu metodu, pa to radi omotač
+            code = fn.__code__
+            positional = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+            
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if positional is not None:
+                    args = args[:positional]
+                with self.measure(label) as record:
+                    result = fn(*args, **kwargs)
+                    record.rows = _row_count(result)
+                return result
+            return wrapper
+        return decorator
+    
+    def summary(self):
+        """Po operaciji: (ime, pozivi, uzoraka, p50, p95, max ms, ukupno redova) - najsporije prvo"""
+        with self.lock:
+            records = list(self.records)
+            calls = dict(self.calls)
+        by_name = {}
+        for record in records:
+            by_name.setdefault(record.name, []).append(record)
+        rows = []
+        for name, items in by_name.items():
+            times = sorted(record.ms for record in items)
+            total_rows = sum(record.rows for record in items if record.rows is not None)
+            rows.append((name, calls.get(name, len(items)), len(items),
+                         _percentile(times, 50), _percentile(times, 95), times[-1], total_rows))
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows
+    
+    def slowest(self, name=QUERY, limit=20):
+        with self.lock:
+            records = [record for record in self.records if record.name == name]
+        return sorted(records, key=lambda record: record.ms, reverse=True)[:limit]
+    
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+            self.calls.clear()
+    
+    def snapshot(self):
+        """Sve za JSON izvoz"""
+        with self.lock:
+            records = [record.to_dict() for record in self.records]
+        return {
+            'summary': [dict(zip(('name', 'calls', 'samples', 'p50_ms', 'p95_ms', 'max_ms', 'rows'), row))
+                        for row in self.summary()],
+            'slowest_queries': [record.to_dict() for record in self.slowest()],
+            'records': records,
+        }
+
+
+INSTRUMENTATION = Instrumentation()
+
+
+class SlowQueryLog:
+    """Opt-in log sporih upita (slow_query_ms u app_config.json).
+    
+    Upit koji traje duže od praga (execute + čitanje redova) se upisuje u rotirajući log
+    sa parametrima i EXPLAIN QUERY PLAN izlazom - izvršenim na istoj konekciji.
+    """
+    EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+    LEADING_COMMENTS = re.compile(r'^(\s+|--[^\n]*\n?|/\*.*?\*/)*', re.S)
+    
+    def __init__(self, threshold_ms, path='slow_queries.log', max_bytes=1_000_000, backup_count=3):
+        self.threshold_ms = float(threshold_ms)
+        self.path = path
+        self.logger = logging.getLogger(f'toner.slow_queries.{os.path.abspath(path)}')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes,
+                                                           backupCount=backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self.logger.addHandler(handler)
+    
+    def check(self, conn, record, sql, parameters):
+        """Upisuje record ako je spor - vraća True ako je upisan"""
+        if record.ms < self.threshold_ms:
+            return False
+        lines = [f"[{threading.current_thread().name}] {record.ms:.1f} ms, rows={record.rows}: {record.detail}"]
+        if parameters:
+            lines.append(f"    params: {_short_repr(parameters)}")
+        if self.LEADING_COMMENTS.sub('', sql).upper().startswith(self.EXPLAINABLE):
+            try:
+                # Običan sqlite3.Cursor - EXPLAIN ne ulazi u merenja
+                cursor = sqlite3.Cursor(conn)
+                for row in cursor.execute("EXPLAIN QUERY PLAN " + sql, parameters or ()):
+                    lines.append(f"    plan: {row[-1]}")
+                cursor.close()
+            except sqlite3.Error as e:
+                lines.append(f"    plan: unavailable ({e})")
+        self.logger.info("\n".join(lines))
+        return True
+
+
+def _short_repr(value, limit=500):
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Kursor koji meri execute i fetch* - SQL merenja idu u INSTRUMENTATION pod imenom 'sql',
+    a spori upiti u SlowQueryLog konekcije (ako je uključen)"""
+    _record = None
+    _sql = None
+    _parameters = None
+    _slow_logged = False
+    
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._executed(sql, parameters, start)
+    
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._executed(sql, None, start)
+    
+    def _executed(self, sql, parameters, start):
+        self._record = INSTRUMENTATION.record(
+            Instrumentation.QUERY, (time.perf_counter() - start) * 1000,
+            self.rowcount if self.rowcount >= 0 else None, " ".join(sql.split()))
+        self._sql = sql
+        self._parameters = parameters
+        self._slow_logged = False
+        if self.description is None:
+            self._check_slow()  # SELECT se proverava posle čitanja redova
+    
+    def _check_slow(self):
+        slow_log = getattr(self.connection, 'slow_query_log', None)
+        if slow_log is not None and not self._slow_logged:
+            self._slow_logged = slow_log.check(self.connection, self._record, self._sql, self._parameters)
+    
+    def _fetched(self, start, rows):
+        # Vreme čitanja redova se dodaje merenju poslednjeg execute-a
+        if self._record is not None:
+            self._record.ms += (time.perf_counter() - start) * 1000
+            self._record.rows = (self._record.rows or 0) + rows
+            self._check_slow()
+    
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1)
+        return row
+    
+    def fetchmany(self, *args):
+        start = time.perf_counter()
+        rows = super().fetchmany(*args)
+        self._fetched(start, len(rows))
+        return rows
+    
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 konekcija čiji su svi kursori TimedCursor (i za conn.execute)"""
+    slow_query_log = None  # SlowQueryLog - postavlja Database
+    
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class PooledConnection:
+    """Omotač oko deljene konekcije - close() ne zatvara fajl, samo poništava nezavršenu transakciju"""
+    def __init__(self, conn):
+        self._conn = conn
+    
+    def close(self):
+        # Isto ponašanje kao sqlite3 close(): nekomitovane izmene se odbacuju
+        if self._conn.in_transaction:
+            self._conn.rollback()
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
 
 class Database:
-    def __init__(self, db_name="toneri.db"):
+    # Podešavanja koja se primenjuju na svaku novu konekciju
+    PRAGMAS = (
+        "PRAGMA busy_timeout = 5000",
+        "PRAGMA cache_size = -8000",
+        "PRAGMA temp_store = MEMORY",
+    )
+    
+    # Najčešći upiti iz MainWindow i indeks koji moraju da koriste (proverava check_query_plans)
+    HOT_QUERIES = (
+        ("load_pregled: toneri bez štampača",
+         "SELECT t.model FROM toneri t WHERE NOT EXISTS "
+         "(SELECT 1 FROM stampac_toneri st WHERE st.toner_id = t.id)",
+         (), "idx_stampac_toneri_toner"),
+        ("load_pregled: štampači bez radnika",
+         "SELECT s.model FROM stampaci s WHERE NOT EXISTS "
+         "(SELECT 1 FROM radnik_stampaci rs WHERE rs.stampac_id = s.id)",
+         (), "idx_radnik_stampaci_stampac"),
+        ("delete_toner: povezani štampači",
+         "SELECT s.model FROM stampaci s JOIN stampac_toneri st ON s.id = st.stampac_id WHERE st.toner_id = ?",
+         (0,), "idx_stampac_toneri_toner"),
+        ("delete_toner: brisanje veza",
+         "DELETE FROM stampac_toneri WHERE toner_id = ?",
+         (0,), "idx_stampac_toneri_toner"),
+        ("delete_toner: brisanje istorije",
+         "DELETE FROM istorija_narudzbi WHERE toner_id = ?",
+         (0,), "idx_istorija_narudzbi_toner_datum"),
+        ("delete_stampac: dodeljeni radnici",
+         "SELECT r.ime, r.prezime FROM radnici r JOIN radnik_stampaci rs ON r.id = rs.radnik_id WHERE rs.stampac_id = ?",
+         (0,), "idx_radnik_stampaci_stampac"),
+        ("load_istorija: period",
+         "SELECT i.id, i.datum, t.model, i.kolicina, i.napomena FROM istorija_narudzbi i "
+         "LEFT JOIN toneri t ON i.toner_id = t.id WHERE i.datum >= ? AND i.datum < ? ORDER BY i.datum DESC",
+         ("2024-01-01", "2025-01-01"), "idx_istorija_narudzbi_datum"),
+        ("istorija narudžbina po toneru",
+         "SELECT datum, kolicina FROM istorija_narudzbi WHERE toner_id = ? ORDER BY datum",
+         (0,), "idx_istorija_narudzbi_toner_datum"),
+        ("show_statistika: potrošnja za period",
+         "SELECT COALESCE(SUM(broj), 0) FROM potrosnja_dnevno WHERE datum >= ? AND datum < ?",
+         ("2024-01-01", "2025-01-01"), "PRIMARY KEY"),
+        ("istorija potrošnje po toneru",
+         "SELECT datum FROM istorija_potrosnje WHERE toner_id = ? ORDER BY datum",
+         (0,), "idx_istorija_potrosnje_toner_datum"),
+    )
+    
+    def __init__(self, db_name="toneri.db", slow_query_ms=None):
         self.db_name = db_name
+        # Opt-in: upiti sporiji od slow_query_ms idu u slow_queries.log (sa planom izvršavanja)
+        self.slow_query_log = SlowQueryLog(slow_query_ms) if slow_query_ms is not None else None
+        self._connections = {}  # id threada -> konekcija
+        self._lock = threading.Lock()
         self.init_database()
     
+    def _connect(self):
+        """Vraća dugotrajnu konekciju za tekući thread (otvara je samo prvi put)"""
+        # Po id-u threada, ne threading.local: PyQt pravi novo Python stanje threada za svaki
+        # QRunnable, pa bi threading.local u QThreadPool-u bio prazan pri svakom pokretanju
+        thread_id = threading.get_ident()
+        conn = self._connections.get(thread_id)
+        if conn is None:
+            conn = sqlite3.connect(self.db_name, check_same_thread=False, factory=TimedConnection)
+            conn.slow_query_log = self.slow_query_log
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            with self._lock:
+                self._connections[thread_id] = conn
+        return conn
+    
     def get_connection(self):
-        return sqlite3.connect(self.db_name)
+        return PooledConnection(self._connect())
     
-    def init_database(self):
-        """Kreira tabele ako ne postoje"""
-        conn = self.get_connection()
+    @contextmanager
+    def transaction(self):
+        """Context manager: commit na kraju bloka, rollback ako dođe do greške"""
+        conn = self._connect()
         cursor = conn.cursor()
-        
-        # Tabela TONERI
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS toneri (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                model TEXT NOT NULL UNIQUE,
-                opis TEXT,
-                minimalna_kolicina INTEGER DEFAULT 2,
-                trenutno_stanje INTEGER DEFAULT 0,
-                driver_link TEXT
-            )
-        ''')
-        
-        # Tabela ŠTAMPAČI
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS stampaci (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                model TEXT NOT NULL,
-                serijski_broj TEXT UNIQUE,
-                status TEXT DEFAULT 'Aktivan',
-                napomena TEXT,
-                kolicina INTEGER DEFAULT 1,
-                driver_link TEXT
-            )
-        ''')
-        
-        # Add kolicina column if it doesn't exist (for existing databases)
         try:
-            cursor.execute("ALTER TABLE stampaci ADD COLUMN kolicina INTEGER DEFAULT 1")
-        except:
-            pass
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    
+    @contextmanager
+    def snapshot(self):
+        """Kopija baze u privremenom fajlu (sqlite3 backup API): svi upiti u bloku vide isto stanje baze.
+        Baza je zaključana samo dok traje kopiranje, ne dok traje čitanje - bez WAL-a,
+        koji ne radi kada je baza na mrežnom disku."""
+        fd, path = tempfile.mkstemp(prefix='toneri_snapshot_', suffix='.db')
+        os.close(fd)
+        conn = None
+        try:
+            conn = sqlite3.connect(path, check_same_thread=False, factory=TimedConnection)
+            conn.slow_query_log = self.slow_query_log
+            self._connect().backup(conn)
+            yield conn
+        finally:
+            if conn is not None:
+                conn.close()
+            os.remove(path)
+    
+    def check_query_plans(self):
+        """Proverava EXPLAIN QUERY PLAN za HOT_QUERIES - vraća listu (naziv, indeks, koristi_indeks, plan)"""
+        conn = self._connect()
+        results = []
+        for name, query, params, index_name in self.HOT_QUERIES:
+            plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()]
+            uses_index = any(index_name in step for step in plan)
+            results.append((name, index_name, uses_index, plan))
+        return results
+    
+    def close(self):
+        """Zatvara sve otvorene konekcije (poziva se pri gašenju aplikacije)"""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+    
+    def init_database(self):
+        """Dovodi šemu na poslednju verziju - kada je šema aktuelna, košta samo jedan PRAGMA upit"""
+        conn = self._connect()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
         
-        # Add driver_link column if it doesn't exist (for existing databases)
+        for target_version, migration in MIGRATIONS:
+            if target_version <= version:
+                continue
+            # Svaka migracija ide u sopstvenoj transakciji zajedno sa podizanjem verzije
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {int(target_version)}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+            print(f"🛠️ Database schema migrated to version {target_version}")
+
+
+class QueryTaskSignals(QObject):
+    """Signali kojima pozadinski upit javlja rezultat GUI threadu"""
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    page = pyqtSignal(int, object, bool)  # request_id, stranica redova, prva stranica
+
+
+class QueryTask(QRunnable):
+    """Jedan zahtev za bazu koji se izvršava u QThreadPool-u"""
+    def __init__(self, request_id, fn, signals, paged=False):
+        super().__init__()
+        self.request_id = request_id
+        self.fn = fn
+        self.signals = signals
+        self.paged = paged  # fn() vraća iterator stranica - svaka se šalje čim je pročitana
+        self.cancelled = False
+    
+    def run(self):
+        if self.cancelled:
+            return  # Zastareo zahtev - nije ni počeo, preskoči upit
         try:
-            cursor.execute("ALTER TABLE stampaci ADD COLUMN driver_link TEXT")
-        except:
-            pass
+            result = self.run_pages() if self.paged else self.fn()
+        except Exception as e:
+            self.signals.failed.emit(self.request_id, str(e))
+        else:
+            self.signals.finished.emit(self.request_id, result)
+    
+    def run_pages(self):
+        """Šalje stranice redom; otkazan zahtev prestaje da čita - vraća ukupan broj redova"""
+        pages = self.fn()
+        total = 0
         try:
-            cursor.execute("ALTER TABLE stampaci ADD COLUMN kolicina INTEGER DEFAULT 1")
-        except:
-            pass  # Column already exists
-        
-        # Tabela RADNICI
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS radnici (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ime TEXT NOT NULL,
-                prezime TEXT NOT NULL,
-                odeljenje TEXT
-            )
-        ''')
-        
-        # Veza: Štampač koristi tonere (Many-to-Many)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS stampac_toneri (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                stampac_id INTEGER,
-                toner_id INTEGER,
-                FOREIGN KEY (stampac_id) REFERENCES stampaci(id),
-                FOREIGN KEY (toner_id) REFERENCES toneri(id),
-                UNIQUE(stampac_id, toner_id)
-            )
-        ''')
+            for page in pages:
+                if self.cancelled:
+                    break
+                self.signals.page.emit(self.request_id, page, total == 0)
+                total += len(page)
+        finally:
+            close = getattr(pages, 'close', None)
+            if close is not None:
+                close()  # generator zatvara svoju konekciju/kursor
+        return total
+
+
+class DatabaseWorker(QObject):
+    """Izvršava upite van GUI threada (request/response preko signala).
+    
+    Svaki zahtev ima ključ (npr. 'toneri'); novi zahtev sa istim ključem otkazuje prethodni,
+    pa rezultat zastarelog upita nikad ne stigne do tabele.
+    """
+    busy_changed = pyqtSignal(str, bool)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.pool.setExpiryTimeout(-1)  # Threadovi ostaju živi da bi zadržali svoje konekcije
+        self.signals = QueryTaskSignals()
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self.signals.page.connect(self._on_page)
+        self._ids = itertools.count(1)
+        self._latest = {}  # key -> QueryTask
+        self._callbacks = {}  # request_id -> (key, on_result, on_error, on_page)
+    
+    def submit(self, key, fn, on_result, on_error=None, on_page=None):
+        """Pokreće fn() u pozadini; on_result(rezultat) se poziva u GUI threadu.
         
-        # Veza: Radnik ima štampače (Many-to-Many)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS radnik_stampaci (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                radnik_id INTEGER,
-                stampac_id INTEGER,
-                datum_dodeljivanja DATE DEFAULT CURRENT_DATE,
-                FOREIGN KEY (radnik_id) REFERENCES radnici(id),
-                FOREIGN KEY (stampac_id) REFERENCES stampaci(id),
-                UNIQUE(radnik_id, stampac_id)
-            )
-        ''')
+        Sa on_page, fn() vraća iterator stranica redova: on_page(stranica, prva) se poziva za svaku
+        čim stigne, a on_result(ukupno redova) na kraju.
+        """
+        self.cancel(key)
+        request_id = next(self._ids)
+        task = QueryTask(request_id, fn, self.signals, paged=on_page is not None)
+        self._latest[key] = task
+        self._callbacks[request_id] = (key, on_result, on_error, on_page)
+        self.busy_changed.emit(key, True)
+        self.pool.start(task)
+        return request_id
+    
+    def cancel(self, key):
+        """Otkazuje zahtev sa datim ključem (ako još nije stigao odgovor)"""
+        task = self._latest.pop(key, None)
+        if task is not None:
+            task.cancelled = True
+            self._callbacks.pop(task.request_id, None)
+            self.busy_changed.emit(key, False)
+    
+    def is_busy(self, key):
+        return key in self._latest
+    
+    def is_idle(self):
+        """Nema nijednog zahteva na čekanju (koristi benchmark.py)"""
+        return not self._latest
+    
+    def shutdown(self):
+        """Odbacuje sve zahteve na čekanju i čeka da se aktivni završe"""
+        for key in list(self._latest):
+            self.cancel(key)
+        self.pool.clear()
+        self.pool.waitForDone(5000)
+    
+    def _pop(self, request_id):
+        entry = self._callbacks.pop(request_id, None)
+        if entry is not None:
+            key = entry[0]
+            self._latest.pop(key, None)
+            self.busy_changed.emit(key, False)
+        return entry
+    
+    def _on_finished(self, request_id, result):
+        entry = self._pop(request_id)
+        if entry is not None:
+            entry[1](result)
+    
+    def _on_page(self, request_id, page, first):
+        entry = self._callbacks.get(request_id)
+        if entry is not None:
+            entry[3](page, first)
+    
+    def _on_failed(self, request_id, message):
+        entry = self._pop(request_id)
+        if entry is None:
+            return
+        if entry[2] is not None:
+            entry[2](message)
+        else:
+            print(f"Database worker error ({entry[0]}): {message}")
+
+
+class ExportCancelled(Exception):
+    """Korisnik je otkazao posao izvoza (ExportQueue.cancel)"""
+
+
+class ExportJobSignals(QObject):
+    progress = pyqtSignal(int, int)  # job_id, broj obrađenih redova
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)  # job_id, izuzetak
+    cancelled = pyqtSignal(int)
+
+
+class ExportJob(QRunnable):
+    """Jedan izvoz (Excel fajl ili HTML preview) u pozadinskom threadu.
+    fn(job) radi posao i povremeno zove job.report(redovi) - tu se posao i prekida kad je otkazan."""
+    REPORT_INTERVAL = 0.1  # s - napredak ide u GUI najviše 10 puta u sekundi
+    
+    def __init__(self, job_id, label, fn, total, signals):
+        super().__init__()
+        self.job_id = job_id
+        self.label = label
+        self.fn = fn
+        self.total = total  # očekivan broj redova (0 = nepoznat)
+        self.signals = signals
+        self.rows = 0
+        self.cancelled = False
+        self.last_report = 0.0
+    
+    def run(self):
+        try:
+            self.check()
+            result = self.fn(self)
+        except ExportCancelled:
+            self.signals.cancelled.emit(self.job_id)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, e)
+        else:
+            self.signals.finished.emit(self.job_id, result)
+    
+    def check(self):
+        if self.cancelled:
+            raise ExportCancelled()
+    
+    def report(self, rows):
+        self.check()
+        now = time.perf_counter()
+        if now - self.last_report >= self.REPORT_INTERVAL:
+            self.last_report = now
+            self.signals.progress.emit(self.job_id, rows)
+
+
+class ExportQueue(QObject):
+    """Red poslova izvoza: poslovi se izvršavaju jedan po jedan, redom kojim su zadati, van GUI threada.
+    on_done(rezultat) i on_error(izuzetak) se pozivaju u GUI threadu; changed javlja status baru."""
+    changed = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.pool.setExpiryTimeout(-1)  # Isto kao DatabaseWorker: thread zadržava svoju konekciju (Database._connect)
+        self.signals = ExportJobSignals()
+        self.signals.progress.connect(self._on_progress)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self.signals.cancelled.connect(self._on_cancelled)
+        self._ids = itertools.count(1)
+        self._jobs = {}  # job_id -> (posao, on_done, on_error), redom zadavanja
+    
+    def submit(self, label, fn, on_done, on_error=None, total=0):
+        job = ExportJob(next(self._ids), label, fn, total, self.signals)
+        self._jobs[job.job_id] = (job, on_done, on_error)
+        self.pool.start(job)
+        self.changed.emit()
+        return job.job_id
+    
+    @property
+    def current(self):
+        """Posao koji se upravo izvršava (najstariji nezavršen) ili None"""
+        return next(iter(self._jobs.values()))[0] if self._jobs else None
+    
+    @property
+    def pending(self):
+        """Broj poslova na čekanju iza trenutnog"""
+        return max(len(self._jobs) - 1, 0)
+    
+    def is_idle(self):
+        return not self._jobs
+    
+    def cancel(self):
+        """Otkazuje trenutni posao - poslovi na čekanju nastavljaju"""
+        job = self.current
+        if job is not None:
+            job.cancelled = True
+    
+    def shutdown(self):
+        """Otkazuje sve poslove i čeka da se trenutni prekine"""
+        for job, _, _ in self._jobs.values():
+            job.cancelled = True
+        self.pool.waitForDone(5000)
+        self._jobs.clear()
+    
+    def _on_progress(self, job_id, rows):
+        entry = self._jobs.get(job_id)
+        if entry is not None:
+            entry[0].rows = rows
+            self.changed.emit()
+    
+    def _pop(self, job_id):
+        entry = self._jobs.pop(job_id, None)
+        if entry is not None:
+            self.changed.emit()
+        return entry
+    
+    def _on_finished(self, job_id, result):
+        entry = self._pop(job_id)
+        if entry is not None:
+            entry[1](result)
+    
+    def _on_failed(self, job_id, error):
+        entry = self._pop(job_id)
+        if entry is None:
+            return
+        if entry[2] is not None:
+            entry[2](error)
+        else:
+            print(f"Export job error ({entry[0].label}): {error}")
+    
+    def _on_cancelled(self, job_id):
+        entry = self._pop(job_id)
+        if entry is not None:
+            print(f"⏹️ Export cancelled: {entry[0].label}")
+
+
+class LoadingOverlay(QLabel):
+    """Poluprovidni natpis 'Učitavanje...' preko tabele dok podaci stižu"""
+    def __init__(self, table, text):
+        super().__init__(text, table.viewport())
+        self.setAlignment(Qt.AlignCenter)
+        self.setStyleSheet("background-color: rgba(255, 255, 255, 180); color: #34495E; font-size: 12pt; font-weight: bold;")
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        table.viewport().installEventFilter(self)
+        self.hide()
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Resize:
+            self.setGeometry(obj.rect())
+        return False
+    
+    def set_loading(self, loading):
+        if loading:
+            self.setGeometry(self.parent().rect())
+            self.raise_()
+            self.show()
+        else:
+            self.hide()
+
+
+class StartupSequencer(QObject):
+    """Meri faze pokretanja i odlaže održavanje za posle prvog iscrtavanja prozora.
+    
+    mark() beleži trajanje faze od prethodne oznake. Odloženi zadaci (defer) kreću tek kad se prozor
+    prvi put iscrta, jedan po jedan kroz event loop ili u DatabaseWorker-u (background=True).
+    """
+    finished = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.timings = []  # (faza, ms)
+        self.interactive_ms = None  # od početka do prvog iscrtavanja
+        self.deferred = []  # (faza, fn, on_result, background)
+        self.task_count = 0
+        self.pending = 0
+        self.worker = None
+        self.window = None
+    
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.timings.append((phase, (now - self.last) * 1000))
+        self.last = now
+    
+    def defer(self, phase, fn, on_result=None, background=False):
+        self.deferred.append((phase, fn, on_result, background))
+    
+    def start(self, window, worker=None):
+        """Poziva se posle window.show() - čeka prvi Paint događaj prozora"""
+        self.window = window
+        self.worker = worker
+        window.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.Paint:
+            self.window.removeEventFilter(self)
+            QTimer.singleShot(0, self.on_first_paint)  # posle ovog iscrtavanja
+        return False
+    
+    def on_first_paint(self):
+        self.mark('first paint')
+        self.interactive_ms = (self.last - self.started) * 1000
+        print(f"⏱️ Startup: {self.format_timings()} -> interactive in {self.interactive_ms:.0f} ms")
+        self.task_count = self.pending = len(self.deferred)
+        if self.deferred:
+            QTimer.singleShot(0, self.run_next)
+        else:
+            self.finished.emit()
+    
+    def run_next(self):
+        if not self.deferred:
+            return
+        phase, fn, on_result, background = self.deferred.pop(0)
+        started = time.perf_counter()
+        
+        def done(result):
+            self.timings.append((phase, (time.perf_counter() - started) * 1000))
+            if on_result:
+                on_result(result)
+            self.task_finished()
+        
+        def failed(message):
+            self.timings.append((f"{phase} (failed)", (time.perf_counter() - started) * 1000))
+            print(f"Startup task '{phase}' failed: {message}")
+            self.task_finished()
+        
+        if background and self.worker is not None:
+            self.worker.submit(f'startup:{phase}', fn, done, failed)
+        else:
+            try:
+                done(fn())
+            except Exception as e:
+                failed(str(e))
+    
+    def task_finished(self):
+        """Sledeći zadatak kreće tek kad se prethodni završi (npr. backup posle čišćenja istorije)"""
+        self.pending -= 1
+        if self.deferred:
+            QTimer.singleShot(0, self.run_next)
+        elif self.pending == 0:
+            print(f"⏱️ Deferred startup tasks: {self.format_timings(self.timings[-self.task_count:])}")
+            self.finished.emit()
+    
+    def format_timings(self, timings=None):
+        return ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in (timings or self.timings))
+
+
+class LazyTab(QWidget):
+    """Prazan tab koji pravi pravi sadržaj (factory) tek kad prvi put postane prikazan.
+    on_built se poziva odmah posle pravljenja - za upite i širine kolona."""
+    def __init__(self, factory, on_built=None, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.on_built = on_built
+        self.content = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+    
+    @property
+    def is_built(self):
+        return self.content is not None
+    
+    def build(self):
+        if self.content is None:
+            self.content = self.factory()
+            self.layout().addWidget(self.content)
+            if self.on_built:
+                self.on_built()
+        return self.content
+
+
+class InvalidationBus(QObject):
+    """Izmene objavljuju koje podatke su promenile ('toneri', 'stampaci', 'radnici', 'veze', 'istorija').
+
+    Tab koji zavisi od njih se odmah ponovo učitava samo ako je vidljiv (ili 'živ', npr. dok traje
+    pretraga); ostali se označe kao zastareli i učitavaju se tek kad korisnik pređe na njih.
+    """
+    def __init__(self, tabs, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.subscribers = []  # (widget taba, entiteti, reload)
+        self.dirty = set()
+        self.live = set()
+        tabs.currentChanged.connect(self.on_current_changed)
+
+    def register(self, widget, entities, reload):
+        self.subscribers.append((widget, frozenset(entities), reload))
+        self.dirty.add(widget)
+
+    def publish(self, *entities, handled=None):
+        """Javlja da su se entiteti promenili; handled = tab koji je izmenu već sam prikazao"""
+        for widget, depends_on, reload in self.subscribers:
+            if widget is handled or depends_on.isdisjoint(entities):
+                continue
+            self.dirty.add(widget)
+            if self.is_visible(widget):
+                self.refresh(widget)
+
+    def invalidate_all(self):
+        """Sve tabove označi zastarelim i učita samo one koji se vide"""
+        for widget, _, _ in self.subscribers:
+            self.dirty.add(widget)
+        for widget, _, _ in self.subscribers:
+            if self.is_visible(widget):
+                self.refresh(widget)
+
+    def set_live(self, widgets):
+        """Tabovi koji se drže ažurnim i kad nisu prikazani"""
+        self.live = set(widgets)
+        for widget in self.live:
+            self.refresh(widget)
+
+    def is_visible(self, widget):
+        return widget is self.tabs.currentWidget() or widget in self.live
+
+    def refresh(self, widget):
+        if widget not in self.dirty:
+            return
+        self.dirty.discard(widget)
+        for subscriber, _, reload in self.subscribers:
+            if subscriber is widget:
+                reload()
+
+    def on_current_changed(self, index):
+        self.refresh(self.tabs.widget(index))
+
+
+def status_labels(lang):
+    """Prevodi statusa štampača: vrednost iz baze -> prikazni naziv"""
+    return {
+        'Aktivan': T.get('status_active', lang),
+        'Na servisu': T.get('status_in_service', lang),
+        'Za rashod': T.get('status_for_disposal', lang)
+    }
+
+
+def load_app_config():
+    """Čita app_config.json (jezik i podešavanja) - prazan dict ako fajl ne postoji"""
+    try:
+        if os.path.exists(APP_CONFIG_FILE):
+            with open(APP_CONFIG_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Error reading {APP_CONFIG_FILE}: {e}")
+    return {}
+
+
+class SearchMatcher:
+    """Tekst globalne pretrage - jedan po prozoru, dele ga svi proxy modeli i delegati"""
+    def __init__(self):
+        self.pattern = ""
+    
+    def set_pattern(self, text):
+        self.pattern = text.lower()
+    
+    @property
+    def active(self):
+        return bool(self.pattern)
+    
+    def matches(self, text):
+        return bool(self.pattern) and self.pattern in text.lower()
+
+
+class SearchIndex:
+    """Upiti nad FTS5 tabelom 'pretraga' (vidi _migration_4_search_index) i veze štampač-toner za pretragu.
+    Za upite od MIN_LENGTH znakova pogotke i redosled po relevantnosti daje indeks - cena zavisi od broja
+    pogodaka, ne od veličine tabela. Tekst reda iz indeksa ide u search_key pronađenog reda."""
+    KINDS = {1: 'toner', 2: 'stampac', 3: 'radnik'}
+    MIN_LENGTH = 3  # trigram indeks ne može da traži kraće upite
+    
+    def __init__(self, db):
+        self.db = db
+        self.enabled = None  # None = još nije provereno da li tabela postoji
+    
+    def can_search(self, pattern):
+        if self.enabled is None:
+            conn = self.db.get_connection()
+            self.enabled = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pretraga'").fetchone() is not None
+            conn.close()
+        return self.enabled and len(pattern) >= self.MIN_LENGTH
+    
+    LINK_CHUNK = 500  # id-jeva štampača po upitu (limit parametara SQLite-a)
+    
+    @INSTRUMENTATION.timed('search.index')
+    def search(self, pattern, printer_ids=()):
+        """Vraća {vrsta: [(id, tekst), ...]} po relevantnosti (bm25, samo za upite od MIN_LENGTH znakova) i
+        'linked_toners': tonere pronađenih štampača - iz indeksa, a za kraće upite printer_ids iz memorije"""
+        found = {kind: [] for kind in self.KINDS.values()}
+        found['linked_toners'] = []
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            if self.can_search(pattern):
+                query = '"' + pattern.replace('"', '""') + '"'
+                cursor.execute("SELECT rowid, tekst FROM pretraga WHERE pretraga MATCH ? ORDER BY rank", (query,))
+                for rowid, tekst in cursor.fetchall():
+                    found[self.KINDS[rowid % 4]].append((rowid // 4, tekst))
+                printer_ids = [printer_id for printer_id, _ in found['stampac']]
+            
+            # Toneri koje koriste pronađeni štampači (npr. pretraga po napomeni štampača)
+            printer_ids = list(printer_ids)
+            for start in range(0, len(printer_ids), self.LINK_CHUNK):
+                chunk = printer_ids[start:start + self.LINK_CHUNK]
+                cursor.execute(f"""
+                    SELECT DISTINCT toner_id FROM stampac_toneri
+                    WHERE stampac_id IN ({','.join('?' * len(chunk))})
+                """, chunk)
+                found['linked_toners'].extend(toner_id for (toner_id,) in cursor.fetchall())
+        finally:
+            conn.close()
+        return found
+
+
+class ReportDataset:
+    """Jedno čitanje izveštaja: redovi (tuple) i zbir, na verziji podataka na kojoj su pročitani"""
+    __slots__ = ('name', 'version', 'rows', 'total')
+    
+    def __init__(self, name, version, rows, total=None):
+        self.name = name
+        self.version = version
+        self.rows = rows
+        self.total = total
+
+
+class ReportDatasets:
+    """Keš skupova redova po izveštaju, vezan za data_version iz tabele meta (vidi _migration_5_data_version).
+    Tab, preview, štampa i Excel istog izveštaja dele jedno čitanje dok se podaci ne promene.
+    Poziva se iz pozadinskih threadova - redovi su tuple i ne menjaju se posle čuvanja."""
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._datasets = {}  # naziv -> ReportDataset
+    
+    @staticmethod
+    def data_version(conn):
+        return conn.execute("SELECT vrednost FROM meta WHERE kljuc = 'data_version'").fetchone()[0]
+    
+    def lookup(self, name, version):
+        """Sačuvan skup ako je pročitan na datoj verziji, inače None"""
+        with self._lock:
+            dataset = self._datasets.get(name)
+        if dataset is None or dataset.version != version:
+            return None
+        INSTRUMENTATION.record(f'dataset.{name}.hit', 0.0, rows=len(dataset.rows))
+        return dataset
+    
+    def store(self, name, version, rows, total=None):
+        dataset = ReportDataset(name, version, rows, total)
+        with self._lock:
+            self._datasets[name] = dataset
+        return dataset
+    
+    def get(self, name, build):
+        """Vraća skup iz keša ili ga čita sa build(cursor) -> (redovi, zbir).
+        Verzija se čita pre podataka - izmena između dva čitanja samo poništava keš ranije."""
+        conn = self.db.get_connection()
+        try:
+            version = self.data_version(conn)
+            dataset = self.lookup(name, version)
+            if dataset is None:
+                rows, total = build(conn.cursor())
+                dataset = self.store(name, version, rows, total)
+            return dataset
+        finally:
+            conn.close()
+    
+    def clear(self):
+        with self._lock:
+            self._datasets.clear()
+
+
+class ReportCache:
+    """Folder gotovih HTML izveštaja. Ključ je (izveštaj, jezik, delovi) + današnji datum, pa
+    ponovljen preview na istoj verziji podataka samo otvara postojeći fajl.
+    Poslednje korišćenje je mtime fajla (lookup ga osvežava) - preko max_bytes/MAX_FILES
+    brišu se najduže nekorišćeni. Fajl od juče se više ne može pogoditi (datum je u ključu),
+    pa ga cleanup() na startu briše zajedno sa nedovršenim .tmp fajlovima."""
+    MAX_FILES = 100
+    
+    def __init__(self, directory, max_bytes=100 * 2**20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def key(report, lang, *parts):
+        """Ime fajla bez ekstenzije - delovi (verzija podataka, parametri) ulaze u hash sadržaja"""
+        digest = hashlib.sha1(repr((date.today().isoformat(), parts)).encode('utf-8')).hexdigest()[:16]
+        return f"{report}_{lang}_{digest}"
+    
+    def path(self, key):
+        return os.path.join(self.directory, key + '.html')
+    
+    def lookup(self, key):
+        """Putanja gotovog izveštaja (i osvežen mtime) ili None"""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        INSTRUMENTATION.record('report_cache.hit', 0.0)
+        return path
+    
+    def write(self, key, writer):
+        """writer(fajl) upisuje izveštaj u .tmp fajl koji se posle upisa preimenuje -
+        prekinut ili otkazan upis ne ostavlja pola izveštaja pod pravim imenom. Vraća putanju."""
+        path = self.path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as out:
+                writer(out)
+            os.replace(temp_path, path)
+        except BaseException:
+            self._remove(temp_path)
+            raise
+        self.evict(keep=path)
+        return path
+    
+    def entries(self):
+        """(mtime, veličina, putanja) gotovih izveštaja, najskorije korišćeni prvi"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.html'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort(reverse=True)
+        return entries
+    
+    def evict(self, keep=None):
+        """Briše najduže nekorišćene izveštaje preko MAX_FILES ili max_bytes - vraća broj obrisanih"""
+        removed = 0
+        with self._lock:
+            total = 0
+            for idx, (_, size, path) in enumerate(self.entries()):
+                total += size
+                if path != keep and (idx >= self.MAX_FILES or total > self.max_bytes):
+                    removed += self._remove(path)
+                    total -= size
+        return removed
+    
+    def cleanup(self):
+        """Na startu: briše .tmp ostatke i izveštaje korišćene pre današnjeg dana - vraća broj obrisanih"""
+        today = datetime.combine(date.today(), datetime.min.time()).timestamp()
+        removed = 0
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                try:
+                    stale = entry.name.endswith('.tmp') or entry.stat().st_mtime < today
+                except OSError:
+                    continue
+                if stale:
+                    removed += self._remove(entry.path)
+        return removed + self.evict()
+    
+    def clear(self):
+        """Briše sve izveštaje - posle restore-a baze verzije podataka kreću ispočetka"""
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                self._remove(entry.path)
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0  # npr. fajl je otvoren u drugom programu (Windows)
+
+
+class ExcelSheet:
+    """Raspored jednog Excel lista: naslov (spojen preko svih kolona), datum, zaglavlje u 4. redu,
+    redovi od 5. reda i podnožje posle jednog praznog reda.
+    rows je iterator tuple-ova; ćelija je vrednost (stil kolone iz styles) ili (vrednost, stil).
+    footer(broj_redova) vraća tekst podnožja - broj redova se zna tek posle prolaza kroz redove."""
+    def __init__(self, name, title, headers, rows, styles, title_style='title16', header_style='header',
+                 date_line=None, footer=None, footer_style='footer', width_pad=2, max_width=None):
+        self.name = name
+        self.title = title
+        self.headers = headers
+        self.rows = rows
+        self.styles = styles
+        self.title_style = title_style
+        self.header_style = header_style
+        self.date_line = date_line
+        self.footer = footer
+        self.footer_style = footer_style
+        self.width_pad = width_pad
+        self.max_width = max_width
+
+
+class SpooledSheet:
+    """List posle prvog prolaza (ExcelExporter.spool): redovi u privremenom fajlu, širine i broj redova"""
+    __slots__ = ('sheet', 'widths', 'count', 'file')
+    
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.widths = [len(str(header)) for header in sheet.headers]
+        self.count = 0
+        self.file = tempfile.TemporaryFile()
+
+
+class ExcelExporter:
+    """Excel izvoz preko openpyxl write-only radne sveske: NamedStyle-ovi se prave jednom po svesci,
+    ćelije su WriteOnlyCell, a širine kolona se računaju u istom prolazu kroz redove.
+    Write-only list upisuje širine pre redova, pa redovi do tada čekaju u privremenom fajlu
+    (blokovi od SPOOL_ROWS) - memorija ne raste sa veličinom izvoza.
+    Sa job (ExportJob) se posle svakog bloka javlja broj upisanih redova i proverava otkazivanje."""
+    SPOOL_ROWS = 1000
+    
+    # naziv -> (font, boja pozadine, horizontalno poravnanje, tanak okvir)
+    STYLES = {
+        'title18': ({'size': 18, 'bold': True}, None, 'center', False),
+        'title16': ({'size': 16, 'bold': True}, None, 'center', False),
+        'date': ({'size': 11}, None, None, False),
+        'header': ({'bold': True, 'color': 'FFFFFF'}, '34495E', 'center', False),
+        'header_border': ({'bold': True, 'color': 'FFFFFF', 'size': 12}, '34495E', 'center', True),
+        'center': (None, None, 'center', False),
+        'left': (None, None, 'left', False),
+        'center_border': (None, None, 'center', True),
+        'left_border': (None, None, 'left', True),
+        'red': ({'bold': True, 'color': 'C80000'}, 'FFB6B6', 'center', False),
+        'red_border': ({'bold': True, 'color': 'C80000'}, 'FFB6B6', 'center', True),
+        'green_border': ({'bold': True, 'color': '2E7D32'}, 'C8E6C9', 'center', True),
+        'pink_border': ({'bold': True, 'color': 'C62828'}, 'FFCDD2', 'center', True),
+        'yellow_border': ({'bold': True, 'color': 'F57F17'}, 'FFF9C4', 'center', True),
+        'footer': ({'italic': True}, None, None, False),
+        'footer11': ({'italic': True, 'size': 11}, None, None, False),
+    }
+    
+    def __init__(self, job=None):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        self.wb = Workbook(write_only=True)
+        self.new_cell = WriteOnlyCell
+        self.registered = set()
+        self.job = job
+        self.rows_written = 0  # svi listovi zajedno - za napredak posla
+    
+    @classmethod
+    def write(cls, path, *sheets, job=None):
+        """Upisuje listove u jedan .xlsx fajl - vraća broj redova podataka po listu"""
+        exporter = cls(job)
+        counts = [exporter.add_sheet(sheet) for sheet in sheets]
+        exporter.save(path)
+        return counts
+    
+    def style(self, name):
+        """Registruje NamedStyle u svesci pri prvoj upotrebi - ćelije ga posle dele po imenu"""
+        if name not in self.registered:
+            from openpyxl.styles import NamedStyle, Font, PatternFill, Alignment, Border, Side
+            font, fill, horizontal, border = self.STYLES[name]
+            named = NamedStyle(name=name)
+            if font:
+                named.font = Font(**font)
+            if fill:
+                named.fill = PatternFill(start_color=fill, end_color=fill, fill_type='solid')
+            if horizontal:
+                named.alignment = Alignment(horizontal=horizontal, vertical='center')
+            if border:
+                thin = Side(style='thin')
+                named.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            self.wb.add_named_style(named)
+            self.registered.add(name)
+        return name
+    
+    def cell(self, ws, value, style):
+        cell = self.new_cell(ws, value=value)
+        if style:
+            cell.style = self.style(style)
+        return cell
+    
+    def add_sheet(self, sheet):
+        """Jedan prolaz kroz sheet.rows (spool), zatim upis lista - vraća broj redova"""
+        return self.write_spooled(self.spool(sheet))
+    
+    def spool(self, sheet):
+        """Prvi korak: prolaz kroz sheet.rows - širine kolona i redovi u privremeni fajl.
+        Odvojen od upisa da bi čitanje iz baze (npr. u read transakciji) trajalo koliko i sam upit."""
+        spooled = SpooledSheet(sheet)
+        block = []
+        for values in sheet.rows:
+            cells = []
+            for col, value in enumerate(values):
+                style = sheet.styles[col]
+                if isinstance(value, tuple):
+                    value, style = value
+                if value is not None and value != '':
+                    spooled.widths[col] = max(spooled.widths[col], len(str(value)))
+                cells.append((value, style))
+            block.append(cells)
+            spooled.count += 1
+            if len(block) >= self.SPOOL_ROWS:
+                pickle.dump(block, spooled.file, pickle.HIGHEST_PROTOCOL)
+                block = []
+                if self.job is not None:
+                    self.job.check()
+        pickle.dump(block, spooled.file, pickle.HIGHEST_PROTOCOL)
+        return spooled
+    
+    def write_spooled(self, spooled):
+        """Drugi korak: širine kolona, naslov, zaglavlje, redovi iz spool fajla i podnožje - vraća broj redova"""
+        from openpyxl.utils import get_column_letter
+        sheet = spooled.sheet
+        ws = self.wb.create_sheet(sheet.name[:31])  # Excel limit 31 chars
+        for col, width in enumerate(spooled.widths, 1):
+            width += sheet.width_pad
+            ws.column_dimensions[get_column_letter(col)].width = min(width, sheet.max_width) if sheet.max_width else width
+        
+        ws.append([self.cell(ws, sheet.title, sheet.title_style)])
+        ws.merged_cells.add(f"A1:{get_column_letter(len(sheet.headers))}1")
+        ws.append([self.cell(ws, sheet.date_line, 'date')] if sheet.date_line else [])
+        ws.append([])
+        ws.append([self.cell(ws, header, sheet.header_style) for header in sheet.headers])
+        
+        with spooled.file:
+            spooled.file.seek(0)
+            while True:
+                try:
+                    block = pickle.load(spooled.file)
+                except EOFError:
+                    break
+                for cells in block:
+                    ws.append([self.cell(ws, value, style) for value, style in cells])
+                self.rows_written += len(block)
+                if self.job is not None:
+                    self.job.report(self.rows_written)
+        
+        if sheet.footer is not None:
+            ws.append([])
+            ws.append([self.cell(ws, sheet.footer(spooled.count), sheet.footer_style)])
+        return spooled.count
+    
+    def save(self, path):
+        self.wb.save(path)
+
+
+class HtmlTemplate:
+    """HTML šablon sa {polje} mestima: tekst se razlaže jednom (string.Formatter), render samo spaja delove.
+    Vrednosti polja su gotov HTML - escape radi pozivalac."""
+    __slots__ = ('parts',)
+    
+    def __init__(self, text):
+        self.parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(text)]
+    
+    def render(self, values):
+        out = []
+        for literal, field in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return ''.join(out)
+
+
+class HtmlReport:
+    """Sadržaj jednog HTML izveštaja: naslov, datum, zaglavlje tabele, redovi i podnožje.
+    rows je iterator tuple-ova; ćelija je vrednost ili (vrednost, css klasa) - vrednosti se escape-uju.
+    footer(broj_redova) vraća tekst podnožja; stylesheet je ključ u HtmlRenderer.STYLESHEETS."""
+    def __init__(self, stylesheet, title, heading, headers, rows, date_line='', footer=None,
+                 print_button=None, page='PAGE'):
+        self.stylesheet = stylesheet
+        self.title = title
+        self.heading = heading
+        self.headers = headers
+        self.rows = rows
+        self.date_line = date_line
+        self.footer = footer
+        self.print_button = print_button
+        self.page = page
+
+
+class HtmlRenderer:
+    """HTML izveštaji iz šablona koji se razlažu jednom po procesu (keš u _templates).
+    Redovi se skupljaju u blokove od FLUSH_ROWS (lista + join) i odmah upisuju u izlaz -
+    vreme je linearno u broju redova, a memorija ne raste sa veličinom izveštaja.
+    Sa job (ExportJob) se posle svakog bloka javlja broj redova i proverava otkazivanje."""
+    FLUSH_ROWS = 500
+    
+    # Stranica za browser (dugme za štampu) i za QTextDocument (direktna štampa)
+    PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <style>{css}</style>
+</head>
+<body>
+    <button class="print-button" onclick="window.print()">{print_button}</button>
+    
+    <h1>{heading}</h1>
+    <p class="datum">{date_line}</p>
+    <table>
+        <tr>{headers}</tr>
+"""
+    PRINT_PAGE = """<html>
+<head>
+    <meta charset="UTF-8">
+    <style>{css}</style>
+</head>
+<body>
+    <h1>{heading}</h1>
+    <p class="datum">{date_line}</p>
+    <table>
+        <tr>{headers}</tr>
+"""
+    PAGE_END = """    </table>
+    <p class="footer">{footer}</p>
+</body>
+</html>
+"""
+    
+    SCREEN_CSS = """
+        body { font-family: Arial, sans-serif; margin: 40px; max-width: 1200px; }
+        h1 { text-align: center; color: #2C3E50; margin-bottom: 10px; font-size: 24pt; }
+        .datum { text-align: left; margin-bottom: 30px; font-size: 12pt; }
+        table { border-collapse: collapse; width: 100%; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        th { background-color: #34495E; color: white; padding: 12px; border: 1px solid #2C3E50; font-size: 12pt; }
+        td { padding: 10px; border: 1px solid #BDC3C7; text-align: center; font-size: 11pt; }
+        tr:nth-child(even) { background-color: #ECF0F1; }
+        tr:hover { background-color: #D5DBDB; }
+        .red { background-color: #FFB6B6; color: #C80000; font-weight: bold; }
+        .footer { margin-top: 20px; font-style: italic; font-size: 11pt; text-align: center; }
+        .print-button {
+            background-color: #2196F3; color: white; padding: 15px 32px; text-align: center; font-size: 16px;
+            margin: 20px auto; cursor: pointer; border: none; border-radius: 4px; display: block;
+        }
+        .print-button:hover { background-color: #0b7dda; }
+        @media print {
+            .print-button { display: none; }
+            body { margin: 20px; }
+        }
+    """
+    # Izmene osnovnog CSS-a po izveštaju (kaskada - kasnije pravilo pobeđuje)
+    GREEN_BUTTON_CSS = """
+        .print-button { background-color: #4CAF50; display: inline-block; margin: 20px 0; }
+        .print-button:hover { background-color: #45a049; }
+        tr:nth-child(even) { background-color: #f2f2f2; }
+        tr:hover { background-color: #e8e8e8; }
+        .footer { text-align: left; }
+    """
+    STYLESHEETS = {
+        'toneri': SCREEN_CSS,
+        'stampaci': SCREEN_CSS + """
+        body { max-width: 1400px; }
+        th { font-size: 11pt; }
+        td { font-size: 10pt; }
+        .green { background-color: #C8E6C9; color: #2E7D32; font-weight: bold; }
+        .red { background-color: #FFCDD2; color: #C62828; font-weight: bold; }
+        .yellow { background-color: #FFF9C4; color: #F57F17; font-weight: bold; }
+        .left { text-align: left; }
+    """,
+        'narudzba': SCREEN_CSS + GREEN_BUTTON_CSS + """
+        body { max-width: 1000px; }
+        th { padding: 15px; border: 1px solid black; font-size: 14pt; }
+        td { padding: 12px; border: 1px solid black; font-size: 12pt; }
+        .red { font-size: 14pt; }
+    """,
+        'pregled': SCREEN_CSS + GREEN_BUTTON_CSS + """
+        body { margin: 30px; max-width: none; }
+        h1 { font-size: 22pt; }
+        .datum { margin-bottom: 25px; font-size: 11pt; }
+        th { border: 1px solid black; }
+        td { border: 1px solid black; text-align: left; }
+        .footer { margin-top: 15px; font-size: 10pt; }
+        @media print {
+            body { margin: 15px; }
+        }
+    """,
+        # QTextDocument podržava samo deo CSS-a - stilovi za direktnu štampu su zasebni
+        'print_narudzba': """
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        h1 { text-align: center; color: #2C3E50; margin-bottom: 5px; }
+        .datum { text-align: left; margin-bottom: 20px; }
+        table { border-collapse: collapse; width: 100%; }
+        th { background-color: #34495E; color: white; padding: 10px; border: 1px solid black; }
+        td { padding: 8px; border: 1px solid black; text-align: center; }
+        tr:nth-child(even) { background-color: #f2f2f2; }
+        .red { background-color: #FFB6B6; color: #C80000; font-weight: bold; }
+        .footer { margin-top: 15px; font-style: italic; }
+    """,
+        'print_pregled': """
+        body { font-family: Arial, sans-serif; margin: 15px; }
+        h1 { text-align: center; color: #2C3E50; margin-bottom: 5px; font-size: 18pt; }
+        .datum { text-align: left; margin-bottom: 15px; }
+        table { border-collapse: collapse; width: 100%; font-size: 9pt; }
+        th { background-color: #34495E; color: white; padding: 8px; border: 1px solid black; }
+        td { padding: 6px; border: 1px solid black; }
+        tr:nth-child(even) { background-color: #f2f2f2; }
+        .footer { margin-top: 10px; font-style: italic; }
+    """,
+    }
+    
+    _templates = {}  # ime šablona -> HtmlTemplate
+    
+    @classmethod
+    def template(cls, name):
+        """Razložen šablon iz keša - prvi poziv ga pravi (dupli rad iz dva threada je bezopasan)"""
+        template = cls._templates.get(name)
+        if template is None:
+            template = cls._templates[name] = HtmlTemplate(getattr(cls, name))
+        return template
+    
+    @classmethod
+    def write(cls, out, report, job=None):
+        """Upisuje izveštaj u tekstualni fajl out - vraća broj redova"""
+        out.write(cls.template(report.page).render({
+            'title': html_escape(report.title),
+            'css': cls.STYLESHEETS[report.stylesheet],
+            'print_button': html_escape(report.print_button or ''),
+            'heading': html_escape(report.heading),
+            'date_line': html_escape(report.date_line),
+            'headers': ''.join(f"<th>{html_escape(str(header))}</th>" for header in report.headers),
+        }))
+        
+        count = 0
+        block = []
+        for values in report.rows:
+            cells = []
+            for value in values:
+                if value.__class__ is tuple:
+                    value, css_class = value
+                    cells.append(f'<td class="{css_class}">{html_escape(str(value), False)}</td>')
+                else:
+                    cells.append(f'<td>{html_escape(str(value), False)}</td>')
+            block.append(f"        <tr>{''.join(cells)}</tr>\n")
+            count += 1
+            if count % cls.FLUSH_ROWS == 0:
+                out.write(''.join(block))
+                block.clear()
+                if job is not None:
+                    job.report(count)
+        out.write(''.join(block))
+        
+        out.write(cls.template('PAGE_END').render({
+            'footer': html_escape(report.footer(count)) if report.footer is not None else '',
+        }))
+        return count
+    
+    @classmethod
+    def render(cls, report):
+        """Ceo izveštaj kao string (za QTextDocument)"""
+        out = io.StringIO()
+        cls.write(out, report)
+        return out.getvalue()
+
+
+class RowTableModel(QAbstractTableModel):
+    """Osnova za tabele čiji su redovi tuple - tekst, boje i flagovi se računaju u data()/flags()"""
+    EDITABLE_COLUMNS = ()
+    
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.rows = []
+        self.search_keys = []
+        self.index_texts = {}  # id -> tekst reda iz indeksa pretrage (i skrivene kolone), vidi SearchIndex
+        self.id_rows = None  # id (kolona 0) -> red, pravi se po potrebi
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+    
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.search_keys = [None] * len(self.rows)
+        self.index_texts = {}
+        self.id_rows = None
+        self.endResetModel()
+    
+    def append_rows(self, rows):
+        """Dodaje redove na kraj (učitavanje po stranicama) bez resetovanja pogleda"""
+        rows = list(rows)
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.search_keys.extend([None] * len(rows))
+        self.id_rows = None
+        self.endInsertRows()
+    
+    def replace_row(self, row, values):
+        """Menja jedan red u mestu i javlja pogledu da ga ponovo iscrta"""
+        self.rows[row] = tuple(values)
+        self.search_keys[row] = None
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
+    
+    def update_row(self, values):
+        """Menja red sa istim id-jem (kolona 0) - vraća stari red ili None ako ga nema"""
+        row = self.row_for_id(values[0])
+        if row is None:
+            return None
+        old = self.rows[row]
+        self.replace_row(row, values)
+        return old
+    
+    def row_data(self, row):
+        return self.rows[row]
+    
+    def row_for_id(self, row_id):
+        if self.id_rows is None:
+            self.id_rows = {values[0]: row for row, values in enumerate(self.rows)}
+        return self.id_rows.get(row_id)
+    
+    def text(self, row, col):
+        """Tekst ćelije kakav se prikazuje u tabeli"""
+        value = self.rows[row][col]
+        return str(value) if value is not None else ""
+    
+    def search_key(self, row):
+        """Prikazni tekst celog reda (i tekst iz indeksa, ako je red pronađen preko njega) malim slovima -
+        računa se jednom po redu, za pretragu"""
+        key = self.search_keys[row]
+        if key is None:
+            key = "\n".join(self.text(row, col) for col in range(len(self.headers))).lower()
+            index_text = self.index_texts.get(self.rows[row][0])
+            if index_text:
+                key += "\n" + index_text.lower()
+            self.search_keys[row] = key
+        return key
+    
+    def set_index_text(self, row_id, text):
+        """Tekst reda iz indeksa pretrage - pogodak u koloni koja se ne prikazuje ostaje pogodak i posle
+        izmene reda, a važi i za red koji tek stiže sa sledećom stranicom"""
+        self.index_texts[row_id] = text
+        row = self.row_for_id(row_id)
+        if row is not None:
+            self.search_keys[row] = None
+    
+    # Boje i stil ćelija - podklase ih preklapaju
+    def cell_background(self, row, col):
+        return None
+    
+    def cell_foreground(self, row, col):
+        return None
+    
+    def cell_font(self, row, col):
+        return None
+    
+    def cell_tooltip(self, row, col):
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.text(row, col)
+        if role == Qt.BackgroundRole:
+            return self.cell_background(row, col)
+        if role == Qt.ForegroundRole:
+            return self.cell_foreground(row, col)
+        if role == Qt.FontRole:
+            return self.cell_font(row, col)
+        if role == Qt.ToolTipRole:
+            return self.cell_tooltip(row, col)
+        return None
+    
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() in self.EDITABLE_COLUMNS:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+
+class TonerTableModel(RowTableModel):
+    """Tabela tonera: (id, model, min. količina, stanje)"""
+    SELECT_SQL = "SELECT id, model, minimalna_kolicina, trenutno_stanje FROM toneri {where}"
+    BELOW_MIN_COLOR = QColor(255, 200, 200)
+    EDITABLE_COLUMNS = (1, 2, 3)  # SVE kolone osim ID
+    
+    toner_edited = pyqtSignal(int)
+    edit_failed = pyqtSignal(str)
+    
+    def __init__(self, db, lang, parent=None):
+        super().__init__([T.get("col_id", lang), T.get("col_model", lang),
+                          T.get("col_min_qty", lang), T.get("col_stock", lang)], parent)
+        self.db = db
+        self.lang = lang
+    
+    def is_below_min(self, row):
+        _, _, min_kol, stanje = self.rows[row]
+        return stanje is not None and min_kol is not None and stanje < min_kol
+    
+    def cell_background(self, row, col):
+        if col == 3 and self.is_below_min(row):
+            return self.BELOW_MIN_COLOR
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        """Upisuje izmenu ćelije direktno u bazu"""
+        if role != Qt.EditRole or not index.isValid() or index.column() not in self.EDITABLE_COLUMNS:
+            return False
         
-        # Istorija narudžbina
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS istorija_narudzbi (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                datum DATE DEFAULT CURRENT_DATE,
-                toner_id INTEGER,
-                kolicina INTEGER,
-                napomena TEXT,
-                FOREIGN KEY (toner_id) REFERENCES toneri(id)
-            )
-        ''')
+        row, col = index.row(), index.column()
+        toner_id = self.rows[row][0]
+        text = str(value).strip()
         
-        # Istorija potrošnje
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS istorija_potrosnje (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                datum DATE DEFAULT CURRENT_DATE,
-                toner_id INTEGER,
-                kolicina INTEGER DEFAULT 1,
-                FOREIGN KEY (toner_id) REFERENCES toneri(id)
-            )
-        ''')
+        try:
+            if col == 1:  # Model
+                if not text:
+                    self.edit_failed.emit("Model ne može biti prazan!")
+                    return False
+                new_value = text
+                sql = "UPDATE toneri SET model = ? WHERE id = ?"
+            elif col == 2:  # Min. količina
+                new_value = int(text)
+                if new_value < 0:
+                    self.edit_failed.emit("Minimalna količina ne može biti negativna!")
+                    return False
+                sql = "UPDATE toneri SET minimalna_kolicina = ? WHERE id = ?"
+            else:  # Stanje
+                new_value = int(text)
+                if new_value < 0:
+                    self.edit_failed.emit("Stanje ne može biti negativno!")
+                    return False
+                sql = "UPDATE toneri SET trenutno_stanje = ? WHERE id = ?"
+        except ValueError:
+            self.edit_failed.emit(T.get("error_must_be_number", self.lang))
+            return False
         
-        # Backup settings
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS backup_settings (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
-                enabled INTEGER DEFAULT 0,
-                day_of_month INTEGER DEFAULT 1,
-                last_backup_date DATE
-            )
-        ''')
+        if new_value == self.rows[row][col]:
+            return True
         
-        # Inicijalizuj backup settings ako ne postoji
-        cursor.execute("INSERT OR IGNORE INTO backup_settings (id) VALUES (1)")
+        try:
+            with self.db.transaction() as cursor:
+                cursor.execute(sql, (new_value, toner_id))
+        except sqlite3.Error as e:
+            self.edit_failed.emit(f"Greška prilikom čuvanja: {str(e)}")
+            return False
+        
+        # Prozor ponovo čita red iz baze (refresh_toner_row)
+        self.toner_edited.emit(toner_id)
+        return True
+
+
+class PrinterTableModel(RowTableModel):
+    """Tabela štampača: (id, model, količina, dodeljeno, status, napomena, driver link).
+    Slobodno se računa iz količine i dodeljenog, status se prikazuje preveden."""
+    SELECT_SQL = """
+        SELECT 
+            s.id, 
+            s.model, 
+            COALESCE(s.kolicina, 1) as kolicina,
+            COUNT(DISTINCT rs.radnik_id) as dodeljeno,
+            s.status, 
+            s.napomena,
+            s.driver_link
+        FROM stampaci s
+        LEFT JOIN radnik_stampaci rs ON s.id = rs.stampac_id
+        {where}
+        GROUP BY s.id
+    """
+    STATUSES = ('Aktivan', 'Na servisu', 'Za rashod')
+    AVAILABLE_COLOR = QColor(200, 255, 200)  # Light green
+    UNAVAILABLE_COLOR = QColor(255, 220, 220)  # Light red
+    STATUS_COLORS = {'Na servisu': QColor(255, 255, 200), 'Za rashod': QColor(255, 150, 150)}
+    LINK_COLOR = QColor(0, 0, 255)  # Blue
+    EDITABLE_COLUMNS = (1, 2, 5, 6, 7)  # Dodeljeno i Slobodno su izračunati
+    
+    def __init__(self, lang, commit_edit, parent=None):
+        super().__init__([T.get("col_id", lang), T.get("col_model", lang), T.get("col_quantity", lang),
+                          T.get("col_assigned", lang), T.get("col_available", lang), T.get("col_status", lang),
+                          T.get("col_notes", lang), T.get("col_driver_link", lang)], parent)
+        self.lang = lang
+        # commit_edit(stampac_id, kolona, vrednost) -> bool; dijaloge i upis u bazu radi prozor
+        self.commit_edit = commit_edit
+        self.status_labels = status_labels(lang)
+        self.status_values = {label: status for status, label in self.status_labels.items()}
+        self.link_font = QFont()
+        self.link_font.setUnderline(True)
+    
+    def text(self, row, col):
+        stampac_id, model, kolicina, dodeljeno, status, napomena, driver_link = self.rows[row]
+        if col == 3:
+            return str(dodeljeno)
+        if col == 4:
+            return str(kolicina - dodeljeno)
+        if col == 5:
+            return self.status_labels.get(status, status or "")
+        value = (stampac_id, model, kolicina, None, None, None, napomena, driver_link)[col]
+        return str(value) if value is not None else ""
+    
+    def status(self, row):
+        return self.rows[row][4]
+    
+    def driver_link(self, row):
+        return (self.rows[row][6] or "").strip()
+    
+    def cell_background(self, row, col):
+        if col == 4:
+            slobodno = self.rows[row][2] - self.rows[row][3]
+            if slobodno > 0:
+                return self.AVAILABLE_COLOR
+            if slobodno == 0:
+                return self.UNAVAILABLE_COLOR
+        elif col == 5:
+            return self.STATUS_COLORS.get(self.rows[row][4])
+        return None
+    
+    def cell_foreground(self, row, col):
+        if col == 7 and self.driver_link(row):
+            return self.LINK_COLOR
+        return None
+    
+    def cell_font(self, row, col):
+        if col == 7 and self.driver_link(row):
+            return self.link_font
+        return None
+    
+    def cell_tooltip(self, row, col):
+        if col == 7 and self.driver_link(row):
+            return T.get("tooltip_click_link", self.lang)
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() not in self.EDITABLE_COLUMNS:
+            return False
+        row, col = index.row(), index.column()
+        value = str(value).strip()
+        if col == 5:
+            value = self.status_values.get(value, value)
+            if value == self.rows[row][4]:
+                return True
+        elif value == self.text(row, col):
+            return True
+        return self.commit_edit(self.rows[row][0], col, value)
+
+
+class EmployeeTableModel(RowTableModel):
+    """Tabela radnika: (id, ime, prezime)"""
+    SELECT_SQL = "SELECT id, ime, prezime FROM radnici {where}"
+    EDITABLE_COLUMNS = (1, 2)
+    
+    def __init__(self, lang, commit_edit, parent=None):
+        super().__init__([T.get("col_id", lang), T.get("col_first_name", lang), T.get("col_last_name", lang)], parent)
+        # commit_edit(radnik_id, kolona, vrednost) -> bool
+        self.commit_edit = commit_edit
+    
+    def text(self, row, col):
+        value = self.rows[row][col]
+        return str(value) if value else ""
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() not in self.EDITABLE_COLUMNS:
+            return False
+        value = str(value).strip()
+        if value == self.text(index.row(), index.column()):
+            return True
+        return self.commit_edit(self.rows[index.row()][0], index.column(), value)
+
+
+class OverviewTableModel(RowTableModel):
+    """Pregled (samo za čitanje): (kategorija, radnik, štampač, status, toneri) - nepovezano je crveno.
+    Kategorija (prva vrednost, ne prikazuje se) govori šta redu nedostaje: 0 = radnik sa štampačem,
+    1 = radnik bez štampača, 2 = štampač bez radnika, 3 = toner bez štampača."""
+    MISSING_COLOR = QColor(255, 200, 200)
+    MISSING_COLUMNS = {1: (1, 2, 3), 2: (0,), 3: (0, 1, 2)}  # kategorija -> prikazne kolone bez veze
+    
+    # Jedan upit za ceo pregled - anti-join preko NOT EXISTS koristi indekse veza,
+    # a redosled (kategorija pa ključevi sortiranja) je isti kao kod ranija četiri upita
+    SELECT_SQL = '''
+        WITH toneri_stampaca AS (
+            SELECT st.stampac_id, GROUP_CONCAT(t.model, ', ') AS toneri
+            FROM stampac_toneri st
+            JOIN toneri t ON st.toner_id = t.id
+            GROUP BY st.stampac_id
+        )
+        SELECT kategorija, radnik, stampac, status, toneri FROM (
+            SELECT 0 AS kategorija, r.ime || ' ' || r.prezime AS radnik, s.model AS stampac,
+                   s.status AS status, ts.toneri AS toneri,
+                   r.prezime AS k1, r.ime AS k2, s.model AS k3
+            FROM radnik_stampaci rs
+            JOIN radnici r ON r.id = rs.radnik_id
+            JOIN stampaci s ON s.id = rs.stampac_id
+            LEFT JOIN toneri_stampaca ts ON ts.stampac_id = s.id
+            UNION ALL
+            SELECT 1, r.ime || ' ' || r.prezime, NULL, NULL, NULL, r.prezime, r.ime, NULL
+            FROM radnici r
+            WHERE NOT EXISTS (SELECT 1 FROM radnik_stampaci rs WHERE rs.radnik_id = r.id)
+            UNION ALL
+            SELECT 2, NULL, s.model, s.status, ts.toneri, s.model, NULL, NULL
+            FROM stampaci s
+            LEFT JOIN toneri_stampaca ts ON ts.stampac_id = s.id
+            WHERE NOT EXISTS (SELECT 1 FROM radnik_stampaci rs WHERE rs.stampac_id = s.id)
+            UNION ALL
+            SELECT 3, NULL, NULL, NULL, t.model, t.model, NULL, NULL
+            FROM toneri t
+            WHERE NOT EXISTS (SELECT 1 FROM stampac_toneri st WHERE st.toner_id = t.id)
+        )
+        ORDER BY kategorija, k1, k2, k3
+    '''
+    
+    def __init__(self, lang, parent=None):
+        super().__init__([T.get("col_employee", lang), T.get("col_printer", lang),
+                          T.get("col_status", lang), T.get("col_toners", lang)], parent)
+        self.status_labels = status_labels(lang)
+    
+    def value(self, row, col):
+        return self.rows[row][col + 1]  # kolona 0 u redu je kategorija
+    
+    def is_missing(self, row, col):
+        if col in self.MISSING_COLUMNS.get(self.rows[row][0], ()):
+            return True
+        value = self.value(row, col)
+        return value is None or value == ""
+    
+    def text(self, row, col):
+        if self.is_missing(row, col):
+            return "-"
+        value = self.value(row, col)
+        if col == 2:
+            return self.status_labels.get(value, value)
+        return str(value)
+    
+    def cell_background(self, row, col):
+        if self.is_missing(row, col):
+            return self.MISSING_COLOR
+        if col == 2:
+            return PrinterTableModel.STATUS_COLORS.get(self.value(row, col))
+        return None
+
+
+class SearchFilterProxyModel(QSortFilterProxyModel):
+    """Prikazuje samo redove koji sadrže tekst globalne pretrage.
+    SearchScheduler unapred izračuna pogotke (matches); bez njih se red proverava direktno.
+    linked su pogoci preko drugog entiteta (toneri pronađenih štampača) - ostaju i kad se red izmeni.
+    index_kind je vrsta u FTS indeksu ('toner', 'stampac', 'radnik') ili None."""
+    def __init__(self, matcher, parent=None, index_kind=None):
+        super().__init__(parent)
+        self.matcher = matcher
+        self.index_kind = index_kind
+        self.matches = None  # skup redova izvornog modela za trenutni tekst pretrage
+        self.ranks = None  # red -> mesto po relevantnosti (FTS indeks), None = redosled izvornog modela
+        self.linked = frozenset()
+        self.resets = 0  # broji ponovna učitavanja - zastarela pretraga se ponavlja
+    
+    def setSourceModel(self, model):
+        # Povezuje se pre QSortFilterProxyModel-a, da pogoci budu ažurni pre ponovnog filtriranja
+        model.modelAboutToBeReset.connect(self.on_source_reset)
+        model.dataChanged.connect(self.on_source_data_changed)
+        model.rowsInserted.connect(self.on_source_rows_inserted)
+        super().setSourceModel(model)
+    
+    def on_source_reset(self):
+        # Vrati redosled izvornog modela dok su stari redovi još važeći
+        if self.sortColumn() >= 0:
+            self.sort(-1)
+        self.matches = None
+        self.ranks = None
+        self.linked = frozenset()
+        self.resets += 1
+    
+    def on_source_data_changed(self, top_left, bottom_right, roles=()):
+        if self.matches is None:
+            return
+        model = self.sourceModel()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            if self.matcher.pattern in model.search_key(row):
+                self.matches.add(row)
+            elif row not in self.linked:
+                self.matches.discard(row)
+    
+    def on_source_rows_inserted(self, parent, first, last):
+        # Redovi koji stižu po stranicama (append_rows) - pogoci za aktivnu pretragu se dopunjuju
+        if self.matches is None:
+            return
+        model = self.sourceModel()
+        for row in range(first, last + 1):
+            if self.matcher.pattern in model.search_key(row):
+                self.matches.add(row)
+    
+    def set_matches(self, matches, ranks=None, linked=frozenset()):
+        self.matches = matches
+        self.ranks = ranks
+        self.linked = linked
+        self.invalidateFilter()
+        # Pogoci iz indeksa se ređaju po relevantnosti, inače redosled izvornog modela
+        self.sort(0 if ranks else -1)
+    
+    def lessThan(self, left, right):
+        if self.ranks:
+            return self.ranks.get(left.row(), len(self.ranks)) < self.ranks.get(right.row(), len(self.ranks))
+        return super().lessThan(left, right)
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.matcher.active:
+            return True
+        if self.matches is not None:
+            return source_row in self.matches
+        return self.matcher.pattern in self.sourceModel().search_key(source_row)
+
+
+class SearchScheduler(QObject):
+    """Pokreće globalnu pretragu tek kad korisnik zastane sa kucanjem.
+    Novi unos prekida pretragu u toku. Za upite od SearchIndex.MIN_LENGTH znakova pogotke tonera, štampača
+    i radnika daje FTS indeks u pozadini (sa redosledom po relevantnosti); kraći upiti, Pregled i SQLite bez
+    FTS5 traže po prikaznom tekstu u memoriji (duži upit pretražuje samo prethodne pogotke). Tekst reda
+    u indeksu sadrži i prikazni tekst (_migration_6_search_index_text), pa dužina upita ne menja pogotke.
+    Toneri pronađenih štampača se dodaju u oba slučaja."""
+    finished = pyqtSignal(str)
+    CHUNK_ROWS = 2000  # redova po koraku - između koraka event loop obrađuje unos
+    
+    def __init__(self, matcher, proxies, debounce_ms=200, index=None, worker=None, parent=None):
+        super().__init__(parent)
+        self.matcher = matcher
+        self.proxies = proxies
+        self.index = index
+        self.worker = worker
+        self.pending_text = ""
+        self.generation = 0
+        self.run_started = time.perf_counter()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.run)
+        for proxy in proxies:
+            proxy.sourceModel().modelReset.connect(self.on_source_reset)
+    
+    def on_source_reset(self):
+        # Tabela je ponovo učitana - ponovi aktivnu pretragu (pogoci indeksa su po id-u)
+        if self.pending_text and self.index is not None:
+            self.timer.start()
+    
+    def schedule(self, text):
+        self.pending_text = text
+        self.generation += 1  # prekida pretragu u toku
+        if text:
+            self.timer.start()
+        else:
+            # Brisanje pretrage odmah vraća sve redove
+            self.timer.stop()
+            self.run()
+    
+    def run(self):
+        self.generation += 1
+        generation = self.generation
+        self.run_started = time.perf_counter()
+        pattern = self.pending_text.lower()
+        if not pattern:
+            self.apply(pattern, {proxy: (None, None, frozenset()) for proxy in self.proxies})
+            return
         
-        conn.commit()
-        conn.close()
+        # Dopuna prethodnog upita može samo da suzi rezultat
+        narrowing = self.matcher.active and pattern.startswith(self.matcher.pattern)
+        use_index = self.index is not None and self.index.can_search(pattern)
+        jobs = []
+        for proxy in self.proxies:
+            if use_index and proxy.index_kind:
+                candidates = None  # pogotke daje indeks
+            elif narrowing and proxy.matches is not None:
+                candidates = sorted(proxy.matches)
+            else:
+                candidates = range(proxy.sourceModel().rowCount())
+            jobs.append((proxy, candidates, proxy.resets))
+        self.step(generation, self.match(generation, pattern, jobs, {}))
+    
+    def finish(self, generation, pattern, jobs, results):
+        """Pogoci iz memorije su gotovi - indeks daje pogotke ostalih tabela i tonere pronađenih štampača"""
+        printer_ids = []
+        for proxy, (found, _, _) in results.items():
+            if proxy.index_kind == 'stampac':
+                model = proxy.sourceModel()
+                printer_ids = [model.row_data(row)[0] for row in found]
+        if len(results) == len(jobs) and (self.index is None or not printer_ids):
+            self.apply(pattern, results)
+            return
+        self.worker.submit('search', lambda: self.index.search(pattern, printer_ids),
+                           lambda found: self.on_index_result(generation, pattern, jobs, results, found),
+                           lambda message: self.on_index_error(generation, pattern, jobs, results, message))
+    
+    def on_index_result(self, generation, pattern, jobs, results, found):
+        if generation != self.generation:
+            return
+        if any(proxy.resets != resets for proxy, _, resets in jobs):
+            QTimer.singleShot(0, self.run)  # tabela je ponovo učitana dok je indeks radio
+            return
+        for proxy, candidates, _ in jobs:
+            if not proxy.index_kind:
+                continue
+            model = proxy.sourceModel()
+            ranks = None
+            if candidates is None:
+                # Pogoci indeksa - tekst reda ide u search_key, da i pogodak u skrivenoj koloni
+                # (serijski broj, opis, odeljenje) prođe filter i ostane posle izmene reda
+                matches, ranks = set(), {}
+                for row_id, text in found[proxy.index_kind]:
+                    model.set_index_text(row_id, text)
+                    row = model.row_for_id(row_id)
+                    if row is None or row in matches:
+                        continue
+                    matches.add(row)
+                    ranks[row] = len(ranks)
+            else:
+                matches = results[proxy][0]
+            linked = set()
+            if proxy.index_kind == 'toner':
+                for toner_id in found['linked_toners']:
+                    row = model.row_for_id(toner_id)
+                    if row is not None and row not in matches:
+                        linked.add(row)
+                matches |= linked
+            results[proxy] = (matches, ranks or None, frozenset(linked))
+        self.apply(pattern, results)
+    
+    def on_index_error(self, generation, pattern, jobs, results, message):
+        print(f"Search index error, searching in memory: {message}")
+        self.index.enabled = False
+        if generation != self.generation:
+            return
+        if len(results) == len(jobs):
+            self.apply(pattern, results)
+        else:
+            QTimer.singleShot(0, self.run)  # indeks je isključen - ponovo, u memoriji
+    
+    def match(self, generation, pattern, jobs, results):
+        for proxy, candidates, resets in jobs:
+            if candidates is None:
+                continue
+            model = proxy.sourceModel()
+            found = set()
+            for start in range(0, len(candidates), self.CHUNK_ROWS):
+                if proxy.resets != resets:
+                    # Tabela je ponovo učitana usred pretrage - kreni iznova
+                    QTimer.singleShot(0, self.run)
+                    return
+                found.update(row for row in candidates[start:start + self.CHUNK_ROWS]
+                             if pattern in model.search_key(row))
+                yield
+            results[proxy] = (found, None, frozenset())
+        self.finish(generation, pattern, jobs, results)
+    
+    def step(self, generation, steps):
+        if generation != self.generation:
+            return  # stigao je novi unos
+        try:
+            next(steps)
+        except StopIteration:
+            return
+        QTimer.singleShot(0, lambda: self.step(generation, steps))
+    
+    def apply(self, pattern, results):
+        self.matcher.set_pattern(pattern)
+        for proxy, (matches, ranks, linked) in results.items():
+            proxy.set_matches(matches, ranks, linked)
+        # Od pokretanja pretrage (posle debounce-a) do filtriranih tabela
+        INSTRUMENTATION.record('search', (time.perf_counter() - self.run_started) * 1000,
+                               sum(proxy.rowCount() for proxy in results), pattern)
+        self.finished.emit(pattern)
+
+
+class StatusFilterProxyModel(SearchFilterProxyModel):
+    """Pretraga + filter štampača po statusu u memoriji (None = svi)"""
+    def __init__(self, matcher, parent=None, index_kind=None):
+        super().__init__(matcher, parent, index_kind)
+        self.status = None
+    
+    def set_status(self, status):
+        if status != self.status:
+            self.status = status
+            self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.status is not None and self.sourceModel().status(source_row) != self.status:
+            return False
+        return super().filterAcceptsRow(source_row, source_parent)
+
+
+class SearchHighlightDelegate(QStyledItemDelegate):
+    """Boji ćelije koje sadrže tekst pretrage - stanje modela se ne dira"""
+    HIGHLIGHT_COLOR = QColor(34, 139, 34)  # DARK GREEN
+    HIGHLIGHT_TEXT_COLOR = QColor(255, 255, 255)
+    
+    def __init__(self, matcher, parent=None):
+        super().__init__(parent)
+        self.matcher = matcher
+    
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        if self.matcher.matches(option.text):
+            option.backgroundBrush = QBrush(self.HIGHLIGHT_COLOR)
+            option.palette.setColor(QPalette.Text, self.HIGHLIGHT_TEXT_COLOR)
+            font = QFont(option.font)
+            font.setBold(True)
+            option.font = font
+
+
+class StatusComboDelegate(SearchHighlightDelegate):
+    """Padajući meni za kolonu Status - jedan editor samo dok traje izmena"""
+    def __init__(self, matcher, labels, parent=None):
+        super().__init__(matcher, parent)
+        self.labels = labels
+    
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.addItems(self.labels)
+        # Izbor odmah upisuje vrednost i zatvara editor
+        combo.activated.connect(lambda _: self.commit_and_close(combo))
+        QTimer.singleShot(0, combo.showPopup)
+        return combo
+    
+    def commit_and_close(self, combo):
+        self.commitData.emit(combo)
+        self.closeEditor.emit(combo)
+    
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.EditRole))
+    
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+
+def selected_row_data(view):
+    """Vraća tuple izabranog reda iz QTableView-a (kroz proxy modele ako postoje) ili None"""
+    indexes = view.selectionModel().selectedIndexes() if view.selectionModel() else []
+    if not indexes:
+        return None
+    index = indexes[0]
+    model = view.model()
+    while isinstance(model, QAbstractProxyModel):
+        index = model.mapToSource(index)
+        model = model.sourceModel()
+    return model.row_data(index.row())
 
 
 class TonerDialog(QDialog):
@@ -484,42 +2895,179 @@ class RadnikDialog(QDialog):
         return selected
 
 
+class DiagnosticsDialog(QDialog):
+    """Skriveni dijalog (Ctrl+Shift+D): p50/p95 po operaciji, najsporiji upiti i JSON izvoz merenja"""
+    def __init__(self, parent, instrumentation, startup=None):
+        super().__init__(parent)
+        self.instrumentation = instrumentation
+        self.startup = startup
+        self.lang = parent.lang if parent and hasattr(parent, 'lang') else 'sr'
+        self.setWindowTitle(T.get("diag_title", self.lang))
+        self.resize(900, 600)
+        self.init_ui()
+        self.refresh()
+    
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        
+        self.startup_label = QLabel()
+        self.startup_label.setWordWrap(True)
+        layout.addWidget(self.startup_label)
+        
+        self.operations_label = QLabel()
+        self.operations_label.setStyleSheet("font-weight: bold;")
+        layout.addWidget(self.operations_label)
+        self.operations_table = self.create_table([
+            T.get("diag_col_operation", self.lang), T.get("diag_col_calls", self.lang),
+            "p50 ms", "p95 ms", "max ms", T.get("diag_col_rows", self.lang)])
+        layout.addWidget(self.operations_table)
+        
+        slowest_label = QLabel(T.get("diag_slowest", self.lang))
+        slowest_label.setStyleSheet("font-weight: bold;")
+        layout.addWidget(slowest_label)
+        self.slowest_table = self.create_table([
+            "ms", T.get("diag_col_rows", self.lang), T.get("diag_col_time", self.lang), T.get("diag_col_sql", self.lang)])
+        layout.addWidget(self.slowest_table)
+        
+        btn_layout = QHBoxLayout()
+        refresh_btn = QPushButton(T.get("btn_refresh", self.lang))
+        refresh_btn.clicked.connect(self.refresh)
+        export_btn = QPushButton(T.get("btn_export_json", self.lang))
+        export_btn.clicked.connect(self.export_json)
+        clear_btn = QPushButton(T.get("btn_clear", self.lang))
+        clear_btn.clicked.connect(self.clear)
+        close_btn = QPushButton(T.get("btn_close", self.lang))
+        close_btn.clicked.connect(self.accept)
+        btn_layout.addWidget(refresh_btn)
+        btn_layout.addWidget(export_btn)
+        btn_layout.addWidget(clear_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+    
+    def create_table(self, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+    
+    def fill_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                text = f"{value:.1f}" if isinstance(value, float) else ("" if value is None else str(value))
+                item = QTableWidgetItem(text)
+                if not isinstance(value, str):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(i, j, item)
+    
+    def refresh(self):
+        if self.startup is not None:
+            text = T.get("diag_startup", self.lang) + " " + self.startup.format_timings()
+            if self.startup.interactive_ms is not None:
+                text += " - " + T.get("diag_interactive", self.lang).format(self.startup.interactive_ms)
+            self.startup_label.setText(text)
+        self.operations_label.setText(T.get("diag_operations", self.lang).format(len(self.instrumentation.records)))
+        self.fill_table(self.operations_table, self.instrumentation.summary())
+        self.fill_table(self.slowest_table, [
+            (record.ms, record.rows, datetime.fromtimestamp(record.when).strftime('%H:%M:%S'), record.detail)
+            for record in self.instrumentation.slowest()])
+    
+    def snapshot(self):
+        data = self.instrumentation.snapshot()
+        if self.startup is not None:
+            data['startup'] = {'phases': [{'phase': phase, 'ms': round(ms, 3)} for phase, ms in self.startup.timings],
+                               'interactive_ms': self.startup.interactive_ms}
+        return data
+    
+    def export_json(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, T.get("btn_export_json", self.lang),
+            f"diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", "JSON (*.json)")
+        if not file_path:
+            return
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
+            return
+        QMessageBox.information(self, T.get("success", self.lang),
+                                T.get("msg_diag_exported", self.lang) + "\n" + os.path.abspath(file_path))
+    
+    def clear(self):
+        self.instrumentation.clear()
+        self.refresh()
+
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    PREGLED_PAGE_ROWS = 500  # redova pregleda po stranici koju šalje pozadinski upit
+    
+    def __init__(self, startup=None):
         super().__init__()
+        self.startup = startup or StartupSequencer()
         self.settings = QSettings('TonerInventory', 'TonerApp')  # Pamćenje postavki
         self.lang = self.load_language_preference()  # Load saved language
-        self.search_active = False  # Flag to prevent load from overwriting search highlighting
-        self.db = Database()
+        self.search_matcher = SearchMatcher()  # Zajednička pretraga za sve tabove
+        self.db = Database(slow_query_ms=load_app_config().get('slow_query_ms'))
+        self.startup.mark('database')
+        self.datasets = ReportDatasets(self.db)  # Redovi koje dele tabovi i izveštaji
+        self.db_worker = DatabaseWorker(self)  # Upiti van GUI threada
+        self.db_worker.busy_changed.connect(self.on_worker_busy_changed)
+        self.export_jobs = ExportQueue(self)  # Excel i HTML izvozi van GUI threada, jedan po jedan
+        self.report_cache = ReportCache(REPORT_CACHE_DIR, int(load_app_config().get('report_cache_mb', 100)) * 2**20)
+        self.loading_overlays = {}  # ključ zahteva -> LoadingOverlay tabele
+        self.ukupno_tonera = 0  # poslednji prikazani zbirovi - menjaju se i za pojedinačne izmene
+        self.ukupno_stampaca = 0
         self.create_menu_bar()
+        # Skrivena dijagnostika performansi (nije u meniju)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.show_diagnostics)
         self.setWindowTitle(T.get('app_title', self.lang))
         self.setMinimumSize(1200, 700)
         self.init_ui()
+        self.init_export_status()
+        self.startup.mark('ui')
+        self.invalidation_bus = InvalidationBus(self.tabs, self)
+        self.invalidation_bus.register(self.toneri_tab, ('toneri',), self.load_toneri)
+        self.invalidation_bus.register(self.stampaci_tab, ('stampaci', 'veze'), self.load_stampaci)
+        self.invalidation_bus.register(self.radnici_tab, ('radnici',), self.load_radnici)
+        self.invalidation_bus.register(self.pregled_tab, ('toneri', 'stampaci', 'radnici', 'veze'), self.load_pregled)
+        self.invalidation_bus.register(self.istorija_tab, ('istorija', 'toneri'), self.load_istorija)
+        self.search_scheduler = SearchScheduler(
+            self.search_matcher,
+            [self.toneri_proxy, self.stampaci_proxy, self.radnici_proxy, self.pregled_proxy],
+            debounce_ms=int(load_app_config().get('search_debounce_ms', 200)),
+            index=SearchIndex(self.db), worker=self.db_worker, parent=self)
+        self.search_scheduler.finished.connect(self.on_search_finished)
         self.load_all_data()
         self.restore_column_widths()  # Učitaj sačuvane širine kolona
-        self.cleanup_old_history()  # Čisti istoriju starije od 2 godine
-        self.check_auto_backup()  # Proveri da li treba automatski backup
+        self.startup.mark('data')
+        # Održavanje ide posle prvog iscrtavanja, u pozadini
+        self.startup.defer('history cleanup', self.cleanup_old_history, self.on_history_cleaned, background=True)
+        self.startup.defer('auto backup', self.check_auto_backup, self.on_auto_backup_done, background=True)
+        self.startup.defer('report cache cleanup', self.report_cache.cleanup, background=True)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.startup.window is None:
+            self.startup.start(self, self.db_worker)
+    
+    def show_diagnostics(self):
+        DiagnosticsDialog(self, INSTRUMENTATION, self.startup).exec_()
     
     def load_language_preference(self):
         """Load saved language preference from config file"""
-        try:
-            import json
-            import os
-            config_file = 'app_config.json'
-            if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    return config.get('language', 'sr')
-        except:
-            pass
-        return 'sr'  # Default to Serbian
+        return load_app_config().get('language', 'sr')  # Default to Serbian
     
     def save_language_preference(self):
-        """Save language preference to config file"""
+        """Save language preference to config file (ostala podešavanja ostaju)"""
         try:
-            import json
-            config = {'language': self.lang}
-            with open('app_config.json', 'w', encoding='utf-8') as f:
+            config = load_app_config()
+            config['language'] = self.lang
+            with open(APP_CONFIG_FILE, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
         except Exception as e:
             print(f"Error saving language preference: {e}")
@@ -540,6 +3088,12 @@ class MainWindow(QMainWindow):
         en_action = QAction(T.get('menu_english', self.lang), self)
         en_action.triggered.connect(lambda: self.change_language('en'))
         lang_menu.addAction(en_action)
+        
+        # Export menu - cela baza u jedan Excel fajl
+        export_menu = menubar.addMenu(T.get('menu_export', self.lang))
+        full_export_action = QAction(T.get('menu_full_export', self.lang), self)
+        full_export_action.triggered.connect(self.export_full_excel)
+        export_menu.addAction(full_export_action)
     
     def change_language(self, new_lang):
         """Changes application language"""
@@ -608,7 +3162,6 @@ class MainWindow(QMainWindow):
                 font-size: 11pt;
             }
         """)
-        self.update_ukupno_tonera()  # Inicijalno postavi vrednost
         
         self.excel_toneri_btn = QPushButton("📊 " + T.get("btn_excel_export", self.lang))
         self.excel_toneri_btn.setStyleSheet("background-color: #FF9800; color: white; font-weight: bold;")
@@ -635,13 +3188,18 @@ class MainWindow(QMainWindow):
         toneri_btn_layout.addWidget(self.stampaj_tonere_btn)
         toneri_btn_layout.addWidget(self.narudzba_btn)
         
-        self.toneri_table = QTableWidget()
-        self.toneri_table.setColumnCount(4)
-        self.toneri_table.setHorizontalHeaderLabels([T.get("col_id", self.lang), T.get("col_model", self.lang), T.get("col_min_qty", self.lang), T.get("col_stock", self.lang)])
+        self.toneri_model = TonerTableModel(self.db, self.lang, self)
+        self.toneri_model.toner_edited.connect(self.on_toner_edited)
+        self.toneri_model.edit_failed.connect(self.on_table_edit_failed)
+        self.toneri_proxy = SearchFilterProxyModel(self.search_matcher, self, index_kind='toner')
+        self.toneri_proxy.setSourceModel(self.toneri_model)
+        self.toneri_table = QTableView()
+        self.toneri_table.setModel(self.toneri_proxy)
+        self.toneri_table.setItemDelegate(SearchHighlightDelegate(self.search_matcher, self.toneri_table))
         self.toneri_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.toneri_table.horizontalHeader().setStretchLastSection(True)
-        self.toneri_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.toneri_table.itemChanged.connect(self.on_toner_stanje_changed)
+        self.toneri_table.setSelectionBehavior(QTableView.SelectRows)
+        self.loading_overlays['toneri'] = LoadingOverlay(self.toneri_table, T.get("loading", self.lang))
         
         toneri_layout.addLayout(toneri_btn_layout)
         toneri_layout.addWidget(self.toneri_table)
@@ -657,7 +3215,7 @@ class MainWindow(QMainWindow):
         
         self.status_filter = QComboBox()
         self.status_filter.addItems([T.get("status_all", self.lang), T.get("status_active", self.lang), T.get("status_in_service", self.lang), T.get("status_for_disposal", self.lang)])
-        self.status_filter.currentTextChanged.connect(self.load_stampaci)
+        self.status_filter.currentIndexChanged.connect(self.apply_status_filter)
         
         # Label za ukupan broj štampača
         self.ukupno_stampaca_label = QLabel()
@@ -671,7 +3229,6 @@ class MainWindow(QMainWindow):
                 font-size: 11pt;
             }
         """)
-        self.update_ukupno_stampaca()  # Inicijalno postavi vrednost
         
         self.excel_stampaci_btn = QPushButton("📊 " + T.get("btn_excel_export", self.lang))
         self.excel_stampaci_btn.setStyleSheet("background-color: #FF9800; color: white; font-weight: bold;")
@@ -694,23 +3251,19 @@ class MainWindow(QMainWindow):
         stampaci_btn_layout.addWidget(self.excel_stampaci_btn)
         stampaci_btn_layout.addWidget(self.stampaj_stampace_btn)
         
-        self.stampaci_table = QTableWidget()
-        self.stampaci_table.setColumnCount(8)
-        self.stampaci_table.setHorizontalHeaderLabels([
-            T.get("col_id", self.lang), 
-            T.get("col_model", self.lang), 
-            T.get("col_quantity", self.lang),
-            T.get("col_assigned", self.lang),
-            T.get("col_available", self.lang),
-            T.get("col_status", self.lang), 
-            T.get("col_notes", self.lang),
-            T.get("col_driver_link", self.lang)
-        ])
+        self.stampaci_model = PrinterTableModel(self.lang, self.commit_stampac_edit, self)
+        self.stampaci_proxy = StatusFilterProxyModel(self.search_matcher, self, index_kind='stampac')
+        self.stampaci_proxy.setSourceModel(self.stampaci_model)
+        self.stampaci_table = QTableView()
+        self.stampaci_table.setModel(self.stampaci_proxy)
+        self.stampaci_table.setItemDelegate(SearchHighlightDelegate(self.search_matcher, self.stampaci_table))
+        self.stampaci_table.setItemDelegateForColumn(
+            5, StatusComboDelegate(self.search_matcher, list(self.stampaci_model.status_labels.values()), self.stampaci_table))
         self.stampaci_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.stampaci_table.horizontalHeader().setStretchLastSection(True)
-        self.stampaci_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.stampaci_table.cellClicked.connect(self.on_stampac_cell_clicked)
-        self.stampaci_table.itemChanged.connect(self.on_stampac_item_changed)
+        self.stampaci_table.setSelectionBehavior(QTableView.SelectRows)
+        self.stampaci_table.clicked.connect(self.on_stampac_cell_clicked)
+        self.loading_overlays['stampaci'] = LoadingOverlay(self.stampaci_table, T.get("loading", self.lang))
         
         stampaci_layout.addLayout(stampaci_btn_layout)
         stampaci_layout.addWidget(self.stampaci_table)
@@ -733,13 +3286,16 @@ class MainWindow(QMainWindow):
         radnici_btn_layout.addWidget(self.delete_radnik_btn)
         radnici_btn_layout.addStretch()
         
-        self.radnici_table = QTableWidget()
-        self.radnici_table.setColumnCount(3)
-        self.radnici_table.setHorizontalHeaderLabels([T.get("col_id", self.lang), T.get("col_first_name", self.lang), T.get("col_last_name", self.lang)])
+        self.radnici_model = EmployeeTableModel(self.lang, self.commit_radnik_edit, self)
+        self.radnici_proxy = SearchFilterProxyModel(self.search_matcher, self, index_kind='radnik')
+        self.radnici_proxy.setSourceModel(self.radnici_model)
+        self.radnici_table = QTableView()
+        self.radnici_table.setModel(self.radnici_proxy)
+        self.radnici_table.setItemDelegate(SearchHighlightDelegate(self.search_matcher, self.radnici_table))
         self.radnici_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.radnici_table.horizontalHeader().setStretchLastSection(True)
-        self.radnici_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.radnici_table.itemChanged.connect(self.on_radnik_item_changed)
+        self.radnici_table.setSelectionBehavior(QTableView.SelectRows)
+        self.loading_overlays['radnici'] = LoadingOverlay(self.radnici_table, T.get("loading", self.lang))
         
         radnici_layout.addLayout(radnici_btn_layout)
         radnici_layout.addWidget(self.radnici_table)
@@ -765,12 +3321,16 @@ class MainWindow(QMainWindow):
         pregled_btn_layout.addStretch()
         pregled_layout.addLayout(pregled_btn_layout)
         
-        self.pregled_table = QTableWidget()
-        self.pregled_table.setColumnCount(4)
-        self.pregled_table.setHorizontalHeaderLabels([T.get("col_employee", self.lang), T.get("col_printer", self.lang), T.get("col_status", self.lang), T.get("col_toners", self.lang)])
+        # PREGLED je read-only i bez isticanja - pretraga samo sakriva redove
+        self.pregled_model = OverviewTableModel(self.lang, self)
+        self.pregled_proxy = SearchFilterProxyModel(self.search_matcher, self)
+        self.pregled_proxy.setSourceModel(self.pregled_model)
+        self.pregled_table = QTableView()
+        self.pregled_table.setModel(self.pregled_proxy)
         self.pregled_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.pregled_table.horizontalHeader().setStretchLastSection(True)
-        self.pregled_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.pregled_table.setSelectionBehavior(QTableView.SelectRows)
+        self.loading_overlays['pregled'] = LoadingOverlay(self.pregled_table, T.get("loading", self.lang))
         
         pregled_layout.addWidget(self.pregled_table)
         
@@ -780,20 +3340,27 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.radnici_tab, T.get('tab_radnici', self.lang))
         self.tabs.addTab(self.pregled_tab, T.get('tab_pregled', self.lang))
         
-        # Tab 5: STATISTIKA
-        self.statistika_tab = self.create_statistika_tab()
+        # Tabovi 5-7 (STATISTIKA, ISTORIJA, BACKUP) se prave tek kad ih korisnik otvori
+        self.statistika_tab = LazyTab(self.create_statistika_tab)
         self.tabs.addTab(self.statistika_tab, T.get('tab_statistika', self.lang))
         
-        # Tab 6: ISTORIJA
-        self.istorija_tab = self.create_istorija_tab()
+        self.istorija_tab = LazyTab(self.create_istorija_tab,
+                                    lambda: self.restore_table_widths(self.istorija_table, 'istorija'))
         self.tabs.addTab(self.istorija_tab, T.get('tab_istorija', self.lang))
         
-        # Tab 7: BACKUP
-        self.backup_tab = self.create_backup_tab()
+        self.backup_tab = LazyTab(self.create_backup_tab, self.load_backup_settings)
         self.tabs.addTab(self.backup_tab, T.get('tab_backup', self.lang))
         
+        # Povezano pre InvalidationBus-a - tab mora postojati pre nego što se učita
+        self.tabs.currentChanged.connect(self.build_lazy_tab)
+        
         main_layout.addWidget(self.tabs)
     
+    def build_lazy_tab(self, index):
+        widget = self.tabs.widget(index)
+        if isinstance(widget, LazyTab):
+            widget.build()
+    
     def create_statistika_tab(self):
         """Kreira tab sa statistikom"""
         tab = QWidget()
@@ -812,7 +3379,6 @@ class MainWindow(QMainWindow):
         # Year dropdown
         year_label = QLabel(T.get('stats_year', self.lang))
         self.stats_year_combo = QComboBox()
-        from datetime import datetime
         current_year = datetime.now().year
         years = [T.get('stats_all_time', self.lang)] + [str(y) for y in range(2020, current_year + 2)]
         self.stats_year_combo.addItems(years)
@@ -863,7 +3429,6 @@ class MainWindow(QMainWindow):
         # Godina dropdown
         filter_layout.addWidget(QLabel(T.get("stats_year", self.lang)))
         self.history_year_combo = QComboBox()
-        from datetime import datetime
         current_year = datetime.now().year
         years = [T.get("stats_all_time", self.lang)] + [str(y) for y in range(current_year, current_year - 3, -1)]
         self.history_year_combo.addItems(years)
@@ -898,6 +3463,7 @@ class MainWindow(QMainWindow):
         self.istorija_table.setHorizontalHeaderLabels([T.get("col_id", self.lang), T.get("col_date", self.lang), T.get("col_toner", self.lang), T.get("col_quantity", self.lang), T.get("col_notes", self.lang)])
         self.istorija_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.istorija_table.horizontalHeader().setStretchLastSection(True)
+        self.loading_overlays['istorija'] = LoadingOverlay(self.istorija_table, T.get("loading", self.lang))
         layout.addWidget(self.istorija_table)
         
         return tab
@@ -962,35 +3528,45 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(auto_group)
         
-        # Učitaj trenutne settings
-        self.load_backup_settings()
-        
         layout.addStretch()
         return tab
     
     def show_statistika(self):
         """Prikazuje statistiku potrošnje za izabrani period"""
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
             # Get selected period
             selected_year = self.stats_year_combo.currentText()
             selected_month_idx = self.stats_month_combo.currentIndex()
             
             # Build date filter
-            date_filter = ""
+            period_year = None
+            period_month = None
             period_text = T.get('stats_all_time', self.lang)
             
             if selected_year != T.get('stats_all_time', self.lang):
+                period_year = int(selected_year)
                 if selected_month_idx == 0:  # Whole year
-                    date_filter = f"AND strftime('%Y', datum) = '{selected_year}'"
                     period_text = selected_year
                 else:  # Specific month
-                    month_num = str(selected_month_idx).zfill(2)
-                    date_filter = f"AND strftime('%Y-%m', datum) = '{selected_year}-{month_num}'"
+                    period_month = selected_month_idx
                     period_text = f"{T.get(f'month_{selected_month_idx}', self.lang)} {selected_year}"
-            
+            date_filter, date_params = build_period_filter("datum", period_year, period_month)
+        except Exception as e:
+            QMessageBox.critical(self, T.get('error', self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
+            return
+        
+        self.db_worker.submit(
+            'statistika',
+            lambda: self._fetch_statistika(date_filter, date_params),
+            lambda result: self._apply_statistika(result, period_text),
+            self._on_report_error
+        )
+    
+    @INSTRUMENTATION.timed('load_statistika.fetch')
+    def _fetch_statistika(self, date_filter, date_params):
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
             # Ukupan broj tonera
             cursor.execute("SELECT COUNT(*) FROM toneri")
             ukupno_tonera = cursor.fetchone()[0]
@@ -1012,13 +3588,20 @@ class MainWindow(QMainWindow):
             """)
             top_toneri = cursor.fetchall()
             
-            # Potrošnja za izabrani period
-            query = f"SELECT COUNT(*) FROM istorija_potrosnje WHERE 1=1 {date_filter}"
-            cursor.execute(query)
+            # Potrošnja za izabrani period (iz dnevnog zbira - broj redova zavisi od broja dana, ne događaja)
+            query = "SELECT COALESCE(SUM(broj), 0) FROM potrosnja_dnevno"
+            if date_filter:
+                query += " WHERE " + date_filter
+            cursor.execute(query, date_params)
             potrosnja_period = cursor.fetchone()[0]
-            
+        finally:
             conn.close()
-            
+        return ukupno_tonera, ispod_minimuma, ukupno_stanje, top_toneri, potrosnja_period
+    
+    @INSTRUMENTATION.timed('load_statistika.apply')
+    def _apply_statistika(self, result, period_text):
+        ukupno_tonera, ispod_minimuma, ukupno_stanje, top_toneri, potrosnja_period = result
+        try:
             # Formatiraj prikaz
             stats_text = f"""
 <h2>{T.get('stats_general', self.lang)}</h2>
@@ -1045,9 +3628,6 @@ class MainWindow(QMainWindow):
     
     def load_istorija(self):
         """Učitava istorija narudžbina sa filterom po periodu"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
         # Get selected period
         selected_year = self.history_year_combo.currentText()
         selected_month = self.history_month_combo.currentIndex()
@@ -1064,28 +3644,30 @@ class MainWindow(QMainWindow):
             LEFT JOIN toneri t ON i.toner_id = t.id
         """
         
-        params = []
-        where_clauses = []
-        
-        # Year filter
-        if selected_year != T.get("stats_all_time", self.lang):
-            where_clauses.append("strftime('%Y', i.datum) = ?")
-            params.append(selected_year)
-        
-        # Month filter
-        if selected_month > 0:  # 0 is "All Time"
-            where_clauses.append("strftime('%m', i.datum) = ?")
-            params.append(f"{selected_month:02d}")
-        
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
+        # Period filter (0 is "All Time")
+        date_filter, params = build_period_filter(
+            "i.datum",
+            int(selected_year) if selected_year != T.get("stats_all_time", self.lang) else None,
+            selected_month if selected_month > 0 else None
+        )
+        if date_filter:
+            query += " WHERE " + date_filter
         
         query += " ORDER BY i.datum DESC"
         
+        self.db_worker.submit('istorija', lambda: self._fetch_istorija(query, params), self._apply_istorija)
+    
+    @INSTRUMENTATION.timed('load_istorija.fetch')
+    def _fetch_istorija(self, query, params):
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
         cursor.execute(query, params)
         rows = cursor.fetchall()
         conn.close()
-        
+        return rows
+    
+    @INSTRUMENTATION.timed('load_istorija.apply')
+    def _apply_istorija(self, rows):
         self.istorija_table.setRowCount(len(rows))
         for i, row in enumerate(rows):
             for j, value in enumerate(row):
@@ -1121,7 +3703,6 @@ class MainWindow(QMainWindow):
                 return
             
             # Dodaj svaki toner u istoriju
-            from datetime import datetime
             datum = datetime.now().strftime('%Y-%m-%d')
             
             for toner_id, model, kolicina in rows:
@@ -1133,7 +3714,7 @@ class MainWindow(QMainWindow):
             conn.commit()
             conn.close()
             
-            self.load_istorija()
+            self.invalidation_bus.publish('istorija')
             QMessageBox.information(self, T.get("success", self.lang), f"Dodato {len(rows)} stavki u istoriju narudžbina!")
             
         except Exception as e:
@@ -1145,7 +3726,6 @@ class MainWindow(QMainWindow):
             conn = self.db.get_connection()
             cursor = conn.cursor()
             
-            from datetime import datetime
             datum = datetime.now().strftime('%Y-%m-%d')
             
             # Konvertuj rows u format (toner_id, model, kolicina)
@@ -1164,7 +3744,7 @@ class MainWindow(QMainWindow):
             conn.commit()
             conn.close()
             
-            self.load_istorija()
+            self.invalidation_bus.publish('istorija')
             QMessageBox.information(self, T.get("success", self.lang), T.get("msg_added_to_history", self.lang).format(len(rows)))
             dialog.close()
             
@@ -1172,7 +3752,9 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, T.get("error", self.lang), f"Greška:\n{str(e)}")
     
     def load_backup_settings(self):
-        """Učitava backup settings iz baze"""
+        """Učitava backup settings iz baze (u backup tab, ako je napravljen)"""
+        if not self.backup_tab.is_built:
+            return  # učitaće se kad se tab napravi
         conn = self.db.get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT enabled, day_of_month, last_backup_date FROM backup_settings WHERE id = 1")
@@ -1192,119 +3774,126 @@ class MainWindow(QMainWindow):
     
     def save_backup_settings(self):
         """Čuva backup settings"""
+        with self.db.transaction() as cursor:
+            cursor.execute("""
+                UPDATE backup_settings 
+                SET enabled = ?, day_of_month = ?
+                WHERE id = 1
+            """, (1 if self.auto_backup_checkbox.isChecked() else 0, self.backup_day_spin.value()))
+    
+    def cleanup_old_history(self):
+        """Automatski briše zapise iz istorije starije od 2 godine - bez UI-a, radi u pozadini.
+        Vraća broj obrisanih zapisa."""
         conn = self.db.get_connection()
         cursor = conn.cursor()
+        
+        # Obriši zapise starije od 2 godine
         cursor.execute("""
-            UPDATE backup_settings 
-            SET enabled = ?, day_of_month = ?
-            WHERE id = 1
-        """, (1 if self.auto_backup_checkbox.isChecked() else 0, self.backup_day_spin.value()))
+            DELETE FROM istorija_narudzbi 
+            WHERE datum < date('now', '-2 years')
+        """)
+        
+        deleted_count = cursor.rowcount
         conn.commit()
         conn.close()
+        
+        if deleted_count > 0:
+            print(f"🧹 Cleaned up {deleted_count} old history records (older than 2 years)")
+        return deleted_count
     
-    def cleanup_old_history(self):
-        """Automatski briše zapise iz istorije starije od 2 godine"""
-        try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            # Obriši zapise starije od 2 godine
-            cursor.execute("""
-                DELETE FROM istorija_narudzbi 
-                WHERE datum < date('now', '-2 years')
-            """)
-            
-            deleted_count = cursor.rowcount
-            conn.commit()
-            conn.close()
-            
-            if deleted_count > 0:
-                print(f"🧹 Cleaned up {deleted_count} old history records (older than 2 years)")
-        except Exception as e:
-            print(f"Cleanup error: {e}")
+    def on_history_cleaned(self, deleted_count):
+        if deleted_count > 0:
+            self.invalidation_bus.publish('istorija')
     
     def check_auto_backup(self):
-        """Proverava da li treba izvršiti automatski backup"""
+        """Proverava da li treba izvršiti automatski backup i radi ga - bez UI-a, radi u pozadini.
+        Vraća putanju backup-a ili None."""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT enabled, day_of_month, last_backup_date FROM backup_settings WHERE id = 1")
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row or not row[0]:
+            return None  # Nije omogućeno
+        
+        enabled, target_day, last_backup = row
+        
+        today = datetime.now()
+        
+        # Proveri da li je prošao ciljni dan ovog meseca
+        if today.day < target_day:
+            return None
+        
+        # Proveri da li je već backup urađen ovog meseca
+        if last_backup:
+            last_backup_date = datetime.strptime(last_backup, '%Y-%m-%d')
+            if last_backup_date.month == today.month and last_backup_date.year == today.year:
+                return None  # Već urađen ovog meseca
+        
+        # Uradi backup (prvi put ovog meseca posle ciljnog dana)
+        return self.write_backup_file()
+    
+    def on_auto_backup_done(self, backup_path):
+        if backup_path:
+            print(f"💾 Automatic backup created: {backup_path}")
+            self.load_backup_settings()
+    
+    def write_backup_file(self):
+        """Kopira bazu u backups/ i beleži datum backup-a - vraća putanju backup-a.
+        Kopija ide preko SQLite backup API-ja: fajl baze se ne kopira dok neko upisuje u njega."""
+        db_path = self.db.db_name
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        
+        # Kreiraj backup folder ako ne postoji
+        backup_folder = "backups"
+        os.makedirs(backup_folder, exist_ok=True)
+        
+        # Ime backup fajla
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        backup_path = os.path.join(backup_folder, f"toneri_backup_{timestamp}.db")
+        
+        # Kopiraj bazu - konzistentan presek, i kad drugi thread upisuje
+        conn = self.db.get_connection()
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT enabled, day_of_month, last_backup_date FROM backup_settings WHERE id = 1")
-            row = cursor.fetchone()
+            target = sqlite3.connect(backup_path)
+            try:
+                conn.backup(target)
+            finally:
+                target.close()
+        except Exception:
+            if os.path.exists(backup_path):
+                os.remove(backup_path)
+            raise
+        finally:
             conn.close()
-            
-            if not row or not row[0]:
-                return  # Nije omogućeno
-            
-            enabled, target_day, last_backup = row
-            
-            from datetime import datetime
-            today = datetime.now()
-            
-            # Proveri da li je prošao ciljni dan ovog meseca
-            if today.day >= target_day:
-                # Proveri da li je već backup urađen ovog meseca
-                if last_backup:
-                    last_backup_date = datetime.strptime(last_backup, '%Y-%m-%d')
-                    if last_backup_date.month == today.month and last_backup_date.year == today.year:
-                        return  # Već urađen ovog meseca
-                
-                # Uradi backup (prvi put ovog meseca posle ciljnog dana)
-                self.create_backup(auto=True)
-        except Exception as e:
-            print(f"Auto backup error: {e}")
+        
+        # Ažuriraj last_backup_date
+        with self.db.transaction() as cursor:
+            cursor.execute("UPDATE backup_settings SET last_backup_date = date('now') WHERE id = 1")
+        return backup_path
     
-    def create_backup(self, auto=False):
-        """Kreira backup baze podataka"""
+    def create_backup(self):
+        """Kreira backup baze podataka (dugme u Backup tabu)"""
         try:
-            import shutil
-            from datetime import datetime
-            import os
-            
-            # Zatvori konekciju pre backup-a
-            db_path = "toneri.db"
-            
-            if not os.path.exists(db_path):
-                QMessageBox.warning(self, T.get("error", self.lang), T.get("error_db_not_found", self.lang))
-                return
-            
-            # Kreiraj backup folder ako ne postoji
-            backup_folder = "backups"
-            os.makedirs(backup_folder, exist_ok=True)
-            
-            # Ime backup fajla
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_name = f"toneri_backup_{timestamp}.db"
-            backup_path = os.path.join(backup_folder, backup_name)
-            
-            # Kopiraj bazu
-            shutil.copy2(db_path, backup_path)
-            
-            # Ažuriraj last_backup_date
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE backup_settings SET last_backup_date = date('now') WHERE id = 1")
-            conn.commit()
-            conn.close()
-            
-            self.load_backup_settings()
-            
-            if not auto:
-                QMessageBox.information(self, T.get("success", self.lang), 
-                    T.get("msg_backup_created", self.lang) + "\n\n" + 
-                    T.get("msg_file", self.lang) + " " + backup_name + "\n" + 
-                    T.get("msg_location", self.lang) + " " + os.path.abspath(backup_path))
-            
+            backup_path = self.write_backup_file()
+        except FileNotFoundError:
+            QMessageBox.warning(self, T.get("error", self.lang), T.get("error_db_not_found", self.lang))
+            return
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom backup-a:\n{str(e)}")
+            return
+        
+        self.load_backup_settings()
+        QMessageBox.information(self, T.get("success", self.lang), 
+            T.get("msg_backup_created", self.lang) + "\n\n" + 
+            T.get("msg_file", self.lang) + " " + os.path.basename(backup_path) + "\n" + 
+            T.get("msg_location", self.lang) + " " + os.path.abspath(backup_path))
     
     def restore_backup(self):
         """Restoruje bazu iz backup-a"""
         try:
-            import os
-            import shutil
-            from datetime import datetime
-            from PyQt5.QtWidgets import QFileDialog
-            
             # Otvori file dialog
             file_path, _ = QFileDialog.getOpenFileName(
                 self, 
@@ -1324,8 +3913,11 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.Yes:
-                # Zatvori sve konekcije
+                # Zaustavi izvoze i pozadinske upite pa zatvori sve konekcije (isti red kao closeEvent)
                 db_path = "toneri.db"
+                self.export_jobs.shutdown()
+                self.db_worker.shutdown()
+                self.db.close()
                 
                 # Backup trenutne baze pre restore-a
                 backup_current = f"toneri_pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
@@ -1333,6 +3925,8 @@ class MainWindow(QMainWindow):
                 
                 # Restore
                 shutil.copy2(file_path, db_path)
+                # Vraćena baza ponovo broji data_version od svoje vrednosti - stari preview-i ne važe
+                self.report_cache.clear()
                 
                 QMessageBox.information(self, T.get("success", self.lang), T.get("msg_db_restored", self.lang))
                 
@@ -1344,37 +3938,27 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom restore-a:\n{str(e)}")
 
     def load_all_data(self):
-        # Privremeno blokiraj search signal da ne bi došlo do rekurzije
-        try:
-            self.search_input.blockSignals(True)
-            self.load_toneri()
-            self.load_stampaci()
-            self.load_radnici()
-            self.load_pregled()
-            self.load_istorija()
-            # Re-apply search if active
-            if hasattr(self, 'search_input') and self.search_input.text():
-                self.search_all()
-        finally:
-            self.search_input.blockSignals(False)
+        """Označava sve tabove zastarelim - odmah se učitava samo prikazani tab,
+        ostali kad korisnik pređe na njih (ili kad ih zatraži pretraga)"""
+        self.invalidation_bus.invalidate_all()
     
     def save_column_widths(self):
         """Čuva širine kolona svih tabela"""
         try:
             # Toneri
-            for i in range(self.toneri_table.columnCount()):
+            for i in range(self.toneri_model.columnCount()):
                 self.settings.setValue(f'toneri_col_{i}_width', self.toneri_table.columnWidth(i))
             
             # Štampači
-            for i in range(self.stampaci_table.columnCount()):
+            for i in range(self.stampaci_model.columnCount()):
                 self.settings.setValue(f'stampaci_col_{i}_width', self.stampaci_table.columnWidth(i))
             
             # Radnici
-            for i in range(self.radnici_table.columnCount()):
+            for i in range(self.radnici_model.columnCount()):
                 self.settings.setValue(f'radnici_col_{i}_width', self.radnici_table.columnWidth(i))
             
             # Pregled
-            for i in range(self.pregled_table.columnCount()):
+            for i in range(self.pregled_model.columnCount()):
                 self.settings.setValue(f'pregled_col_{i}_width', self.pregled_table.columnWidth(i))
             
             # Istorija
@@ -1385,55 +3969,104 @@ class MainWindow(QMainWindow):
             print(f"Error saving column widths: {e}")
     
     def restore_column_widths(self):
-        """Učitava sačuvane širine kolona"""
+        """Učitava sačuvane širine kolona (istorija kad se njen tab napravi)"""
+        self.restore_table_widths(self.toneri_table, 'toneri')
+        self.restore_table_widths(self.stampaci_table, 'stampaci')
+        self.restore_table_widths(self.radnici_table, 'radnici')
+        self.restore_table_widths(self.pregled_table, 'pregled')
+        if hasattr(self, 'istorija_table'):
+            self.restore_table_widths(self.istorija_table, 'istorija')
+    
+    def restore_table_widths(self, table, prefix):
+        """Učitava sačuvane širine kolona jedne tabele"""
         try:
-            # Toneri
-            for i in range(self.toneri_table.columnCount()):
-                width = self.settings.value(f'toneri_col_{i}_width', None)
-                if width:
-                    self.toneri_table.setColumnWidth(i, int(width))
-            
-            # Štampači
-            for i in range(self.stampaci_table.columnCount()):
-                width = self.settings.value(f'stampaci_col_{i}_width', None)
+            for i in range(table.model().columnCount()):
+                width = self.settings.value(f'{prefix}_col_{i}_width', None)
                 if width:
-                    self.stampaci_table.setColumnWidth(i, int(width))
-            
-            # Radnici
-            for i in range(self.radnici_table.columnCount()):
-                width = self.settings.value(f'radnici_col_{i}_width', None)
-                if width:
-                    self.radnici_table.setColumnWidth(i, int(width))
-            
-            # Pregled
-            for i in range(self.pregled_table.columnCount()):
-                width = self.settings.value(f'pregled_col_{i}_width', None)
-                if width:
-                    self.pregled_table.setColumnWidth(i, int(width))
-            
-            # Istorija
-            if hasattr(self, 'istorija_table'):
-                for i in range(self.istorija_table.columnCount()):
-                    width = self.settings.value(f'istorija_col_{i}_width', None)
-                    if width:
-                        self.istorija_table.setColumnWidth(i, int(width))
+                    table.setColumnWidth(i, int(width))
         except Exception as e:
             print(f"Error restoring column widths: {e}")
     
+    def on_worker_busy_changed(self, key, busy):
+        """Prikazuje/skriva 'Učitavanje...' preko tabele dok pozadinski upit traje"""
+        overlay = self.loading_overlays.get(key)
+        if overlay is not None:
+            overlay.set_loading(busy)
+        elif key == 'statistika' and busy:
+            self.statistika_text.setText(T.get("loading", self.lang))
+    
+    def init_export_status(self):
+        """Status bar: naziv posla izvoza, napredak (redova) i dugme za otkazivanje - vidljivo samo tokom izvoza"""
+        self.export_label = QLabel()
+        self.export_progress = QProgressBar()
+        self.export_progress.setMaximumWidth(220)
+        self.export_cancel_btn = QPushButton(T.get('btn_cancel', self.lang))
+        self.export_cancel_btn.clicked.connect(self.export_jobs.cancel)
+        for widget in (self.export_label, self.export_progress, self.export_cancel_btn):
+            self.statusBar().addPermanentWidget(widget)
+            widget.hide()
+        self.export_jobs.changed.connect(self.update_export_status)
+    
+    def update_export_status(self):
+        job = self.export_jobs.current
+        for widget in (self.export_label, self.export_progress, self.export_cancel_btn):
+            widget.setVisible(job is not None)
+        if job is None:
+            return
+        text = T.get('export_running', self.lang).format(job.label)
+        if not job.total and job.rows:
+            text += " - " + T.get('export_rows', self.lang).format(job.rows)
+        if self.export_jobs.pending:
+            text += " " + T.get('export_queued', self.lang).format(self.export_jobs.pending)
+        self.export_label.setText(text)
+        if job.total:
+            self.export_progress.setRange(0, job.total)
+            self.export_progress.setValue(min(job.rows, job.total))
+            self.export_progress.setFormat("%v / %m")
+        else:
+            self.export_progress.setRange(0, 0)  # nepoznat broj redova - animacija zauzetosti
+    
+    def _on_export_error(self, error):
+        if isinstance(error, ImportError):
+            QMessageBox.warning(self, T.get("error", self.lang), T.get("error_install_openpyxl", self.lang))
+        else:
+            QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom kreiranja Excel-a:\n{str(error)}")
+    
+    def _on_preview_error(self, error):
+        QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom preview-a:\n{str(error)}")
+    
+    def open_preview(self, path):
+        """HTML preview je napravljen u pozadini - otvara ga u browseru"""
+        QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+    
+    def open_file(self, filepath):
+        """Otvara fajl podrazumevanim programom (ne čeka da se program zatvori)"""
+        if platform.system() == 'Windows':
+            os.startfile(filepath)
+        elif platform.system() == 'Darwin':
+            subprocess.Popen(['open', filepath])
+        else:
+            subprocess.Popen(['xdg-open', filepath])
+    
     def closeEvent(self, event):
         """Override closeEvent da sačuva širine kolona pri zatvaranju"""
         self.save_column_widths()
+        self.export_jobs.shutdown()
+        self.db_worker.shutdown()
+        self.db.close()
         event.accept()
     
-    def update_ukupno_tonera(self):
+    def update_ukupno_tonera(self, ukupno=None):
         """Računa i prikazuje ukupan zbir svih tonera u realnom vremenu"""
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT COALESCE(SUM(trenutno_stanje), 0) FROM toneri")
-            ukupno = cursor.fetchone()[0]
-            conn.close()
+            if ukupno is None:
+                conn = self.db.get_connection()
+                cursor = conn.cursor()
+                cursor.execute("SELECT COALESCE(SUM(trenutno_stanje), 0) FROM toneri")
+                ukupno = cursor.fetchone()[0]
+                conn.close()
             
+            self.ukupno_tonera = ukupno
             if self.lang == 'sr':
                 self.ukupno_tonera_label.setText(f"📦 Ukupno tonera: {ukupno}")
             else:
@@ -1442,225 +4075,110 @@ class MainWindow(QMainWindow):
             print(f"Error updating total toners: {e}")
             self.ukupno_tonera_label.setText("📦 Ukupno: 0")
     
-    def update_ukupno_stampaca(self):
+    def update_ukupno_stampaca(self, ukupno=None):
         """Računa i prikazuje ukupan broj svih štampača u realnom vremenu"""
         try:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT COALESCE(SUM(kolicina), 0) FROM stampaci")
-            ukupno = cursor.fetchone()[0]
-            conn.close()
+            if ukupno is None:
+                conn = self.db.get_connection()
+                cursor = conn.cursor()
+                cursor.execute("SELECT COALESCE(SUM(kolicina), 0) FROM stampaci")
+                ukupno = cursor.fetchone()[0]
+                conn.close()
             
+            self.ukupno_stampaca = ukupno
             if self.lang == 'sr':
                 self.ukupno_stampaca_label.setText(f"🖨️ Ukupno štampača: {ukupno}")
-            else:
-                self.ukupno_stampaca_label.setText(f"🖨️ Total printers: {ukupno}")
-        except Exception as e:
-            print(f"Error updating total printers: {e}")
-            self.ukupno_stampaca_label.setText("🖨️ Ukupno: 0")
-    
-    def load_pregled(self):
-        """Učitava kompletan pregled: SVE radnike, štampače i tonere - označava nepovezane crveno"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        all_rows = []
-        
-        # 1. Sve veze radnik-stampac-toneri (kompletno povezani)
-        cursor.execute('''
-            SELECT 
-                r.ime || ' ' || r.prezime as radnik,
-                s.model as stampac_model,
-                s.status,
-                GROUP_CONCAT(t.model, ', ') as toneri
-            FROM radnici r
-            JOIN radnik_stampaci rs ON r.id = rs.radnik_id
-            JOIN stampaci s ON rs.stampac_id = s.id
-            LEFT JOIN stampac_toneri st ON s.id = st.stampac_id
-            LEFT JOIN toneri t ON st.toner_id = t.id
-            GROUP BY r.id, s.id
-            ORDER BY r.prezime, r.ime, s.model
-        ''')
-        all_rows.extend(cursor.fetchall())
-        
-        # 2. Radnici BEZ štampača
-        cursor.execute('''
-            SELECT 
-                r.ime || ' ' || r.prezime as radnik,
-                NULL as stampac_model,
-                NULL as status,
-                NULL as toneri
-            FROM radnici r
-            WHERE r.id NOT IN (SELECT DISTINCT radnik_id FROM radnik_stampaci)
-            ORDER BY r.prezime, r.ime
-        ''')
-        all_rows.extend(cursor.fetchall())
-        
-        # 3. Štampači BEZ radnika (ali možda sa tonerima)
-        cursor.execute('''
-            SELECT 
-                NULL as radnik,
-                s.model as stampac_model,
-                s.status,
-                GROUP_CONCAT(t.model, ', ') as toneri
-            FROM stampaci s
-            LEFT JOIN stampac_toneri st ON s.id = st.stampac_id
-            LEFT JOIN toneri t ON st.toner_id = t.id
-            WHERE s.id NOT IN (SELECT DISTINCT stampac_id FROM radnik_stampaci WHERE stampac_id IS NOT NULL)
-            GROUP BY s.id
-            ORDER BY s.model
-        ''')
-        all_rows.extend(cursor.fetchall())
-        
-        # 4. Toneri BEZ štampača
-        cursor.execute('''
-            SELECT 
-                NULL as radnik,
-                NULL as stampac_model,
-                NULL as status,
-                t.model as toneri
-            FROM toneri t
-            WHERE t.id NOT IN (SELECT DISTINCT toner_id FROM stampac_toneri WHERE toner_id IS NOT NULL)
-            ORDER BY t.model
-        ''')
-        all_rows.extend(cursor.fetchall())
-        
-        conn.close()
-        
-        self.pregled_table.setRowCount(len(all_rows))
-        for i, row in enumerate(all_rows):
-            for j, value in enumerate(row):
-                # Determine if this field is missing (NULL or None)
-                is_missing = value is None or value == "" or value == "None"
-                
-                # Translate status column (j==2)
-                if j == 2 and value and not is_missing:
-                    status_map = {
-                        'Aktivan': T.get('status_active', self.lang),
-                        'Na servisu': T.get('status_in_service', self.lang),
-                        'Za rashod': T.get('status_for_disposal', self.lang)
-                    }
-                    display_value = status_map.get(value, value)
-                    item = QTableWidgetItem(display_value)
-                else:
-                    item = QTableWidgetItem(str(value) if value and not is_missing else "-")
-                
-                # Color logic
-                if is_missing:
-                    # MISSING data - RED background
-                    item.setBackground(QColor(255, 200, 200))
-                    item.setForeground(QColor(0, 0, 0))  # Black text
-                elif j == 2:  # Status column with data
-                    # Check against database values for coloring
-                    if value == "Na servisu":
-                        item.setBackground(QColor(255, 255, 200))
-                    elif value == "Za rashod":
-                        item.setBackground(QColor(255, 150, 150))
-                    else:
-                        item.setBackground(QColor(255, 255, 255))  # White for normal status
-                    item.setForeground(QColor(0, 0, 0))  # Black text
-                else:
-                    # Normal data - white background
-                    item.setBackground(QColor(255, 255, 255))
-                    item.setForeground(QColor(0, 0, 0))  # Black text
-                
-                # Zaključaj sve ćelije - PREGLED je read-only
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                
-                self.pregled_table.setItem(i, j, item)
-    
-        # Re-apply search highlighting
-        if hasattr(self, "search_input") and self.search_input.text():
-            self.apply_search_highlighting()
-
-    def on_toner_stanje_changed(self, item):
-        """Kada korisnik promeni vrednost u bilo kojoj koloni tonera"""
-        col = item.column()
-        
-        if col == 0:  # ID - ne menjaj
-            return
-        
-        row = item.row()
-        toner_id = int(self.toneri_table.item(row, 0).text())
-        
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            if col == 1:  # Model
-                new_value = item.text().strip()
-                if not new_value:
-                    QMessageBox.warning(self, T.get("error", self.lang), "Model ne može biti prazan!")
-                    self.load_toneri()
-                    return
-                cursor.execute("UPDATE toneri SET model = ? WHERE id = ?", (new_value, toner_id))
-            
-            elif col == 2:  # Min. količina
-                new_value = int(item.text())
-                if new_value < 0:
-                    QMessageBox.warning(self, T.get("error", self.lang), "Minimalna količina ne može biti negativna!")
-                    self.load_toneri()
-                    return
-                cursor.execute("UPDATE toneri SET minimalna_kolicina = ? WHERE id = ?", (new_value, toner_id))
-            
-            elif col == 3:  # Stanje
-                new_value = int(item.text())
-                if new_value < 0:
-                    QMessageBox.warning(self, T.get("error", self.lang), "Stanje ne može biti negativno!")
-                    self.load_toneri()
-                    return
-                cursor.execute("UPDATE toneri SET trenutno_stanje = ? WHERE id = ?", (new_value, toner_id))
-            
-            conn.commit()
-            conn.close()
-            
-            # Osvježi prikaz
-            try:
-                self.toneri_table.itemChanged.disconnect(self.on_toner_stanje_changed)
-            except:
-                pass
-            self.load_toneri()
-            
-        except ValueError:
-            QMessageBox.warning(self, T.get("error", self.lang), T.get("error_must_be_number", self.lang))
-            conn.close()
-            self.load_toneri()
+            else:
+                self.ukupno_stampaca_label.setText(f"🖨️ Total printers: {ukupno}")
         except Exception as e:
-            QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom čuvanja: {str(e)}")
+            print(f"Error updating total printers: {e}")
+            self.ukupno_stampaca_label.setText("🖨️ Ukupno: 0")
+    
+    def load_pregled(self):
+        """Učitava kompletan pregled: SVE radnike, štampače i tonere - označava nepovezane crveno.
+        Redovi stižu po stranicama, pa se prva stranica prikazuje pre nego što se pročita ceo upit."""
+        self.db_worker.submit('pregled', self._fetch_pregled, self._apply_pregled,
+                              on_page=self._apply_pregled_page)
+    
+    def _fetch_pregled(self):
+        """Generator stranica pregleda - čita se u pozadinskom threadu (DatabaseWorker).
+        Ceo pročitan pregled ide u skup 'pregled'; dok je važeći, stranice se seku iz njega."""
+        conn = self.db.get_connection()
+        try:
+            version = self.datasets.data_version(conn)
+            dataset = self.datasets.lookup('pregled', version)
+            if dataset is not None:
+                for start in range(0, len(dataset.rows), self.PREGLED_PAGE_ROWS):
+                    yield dataset.rows[start:start + self.PREGLED_PAGE_ROWS]
+                return
+            with INSTRUMENTATION.measure('load_pregled.fetch'):
+                cursor = conn.execute(OverviewTableModel.SELECT_SQL)
+                page = cursor.fetchmany(self.PREGLED_PAGE_ROWS)
+            received = []
+            while page:
+                received.extend(page)
+                yield page
+                page = cursor.fetchmany(self.PREGLED_PAGE_ROWS)
+            self.datasets.store('pregled', version, received)  # otkazano čitanje se ne čuva
+        finally:
             conn.close()
-            self.load_toneri()
     
-    def on_stampac_item_changed(self, item):
-        """Kada korisnik promeni vrednost u bilo kojoj koloni štampača"""
-        col = item.column()
-        
-        if col == 0:  # ID - ne menjaj
-            return
-        
-        if col in [3, 4]:  # Dodeljeno, Slobodno - calculated, ne menjaj
-            return
-        
-        if col == 5:  # Status - ima poseban dropdown, preskači
-            return
-        
-        row = item.row()
-        stampac_id = int(self.stampaci_table.item(row, 0).text())
+    @staticmethod
+    def _query_pregled(cursor):
+        cursor.execute(OverviewTableModel.SELECT_SQL)
+        return cursor.fetchall(), None
+    
+    @INSTRUMENTATION.timed('load_pregled.page')
+    def _apply_pregled_page(self, page, first):
+        if first:
+            self.pregled_model.set_rows(page)
+            self.loading_overlays['pregled'].set_loading(False)  # ostatak stiže dok se tabela već vidi
+        else:
+            self.pregled_model.append_rows(page)
+    
+    def _apply_pregled(self, count):
+        if count == 0:
+            self.pregled_model.set_rows([])  # Prazna baza - nijedna stranica nije stigla
+    
+    def on_toner_edited(self, toner_id):
+        """Model je upisao izmenu tonera - osvježi samo taj red"""
+        self.refresh_toner_row(toner_id)
+        self.invalidation_bus.publish('toneri', handled=self.toneri_tab)
+    
+    def on_table_edit_failed(self, message):
+        QMessageBox.warning(self, T.get("error", self.lang), message)
+    
+    def commit_stampac_edit(self, stampac_id, col, value):
+        """Upisuje izmenu ćelije štampača (poziva PrinterTableModel.setData) - vraća True ako je sačuvano"""
+        if col == 5:  # Status - vrednost je već srpski naziv za bazu
+            reply = QMessageBox.question(self, T.get("confirm", self.lang), 
+                                        T.get("confirm_change_status", self.lang).format(self.stampaci_model.status_labels.get(value, value)),
+                                        QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return False
+            with self.db.transaction() as cursor:
+                cursor.execute("UPDATE stampaci SET status = ? WHERE id = ?", (value, stampac_id))
+            self.refresh_stampac_row(stampac_id)
+            self.invalidation_bus.publish('stampaci', handled=self.stampaci_tab)
+            QMessageBox.information(self, T.get("success", self.lang), T.get("msg_status_changed", self.lang))
+            return True
         
         conn = self.db.get_connection()
         cursor = conn.cursor()
+        pregled_changed = col == 1  # Pregled prikazuje model štampača i dodele
         
         try:
             if col == 1:  # Model
-                new_value = item.text().strip()
+                new_value = value
                 if not new_value:
                     QMessageBox.warning(self, T.get("error", self.lang), "Model ne može biti prazan!")
-                    self.load_stampaci()
-                    return
+                    conn.close()
+                    return False
                 cursor.execute("UPDATE stampaci SET model = ? WHERE id = ?", (new_value, stampac_id))
             
             elif col == 2:  # Količina
                 try:
-                    new_value = int(item.text().strip())
+                    new_value = int(value)
                     if new_value < 0:
                         raise ValueError("Količina mora biti pozitivna")
                     
@@ -1713,9 +4231,8 @@ class MainWindow(QMainWindow):
                                 cursor.execute("UPDATE stampaci SET kolicina = ? WHERE id = ?", (new_value, stampac_id))
                                 conn.commit()
                                 conn.close()
-                                self.load_stampaci()
-                                self.load_pregled()
-                                return
+                                self.refresh_stampac_row(stampac_id)
+                                return True
                             
                             # User wants to unassign - continue to selection dialog
                             unassign_count = None  # User can choose how many
@@ -1766,18 +4283,17 @@ class MainWindow(QMainWindow):
                             if mandatory and len(selected_ids) != unassign_count:
                                 QMessageBox.warning(self, T.get("error", self.lang), 
                                     T.get("must_select_exactly", self.lang).format(unassign_count))
-                                self.load_stampaci()
                                 conn.close()
-                                return
+                                return False
                             
                             if not mandatory and len(selected_ids) == 0:
                                 QMessageBox.warning(self, T.get("error", self.lang), 
                                     T.get("must_select_at_least_one", self.lang))
-                                self.load_stampaci()
                                 conn.close()
-                                return
+                                return False
                             
                             # Unassign selected employees
+                            pregled_changed = True
                             for emp_id in selected_ids:
                                 cursor.execute("DELETE FROM radnik_stampaci WHERE radnik_id = ? AND stampac_id = ?", 
                                              (emp_id, stampac_id))
@@ -1785,167 +4301,65 @@ class MainWindow(QMainWindow):
                             # Now update quantity
                             cursor.execute("UPDATE stampaci SET kolicina = ? WHERE id = ?", (new_value, stampac_id))
                         else:
-                            self.load_stampaci()
                             conn.close()
-                            return
+                            return False
                     else:
                         # No employees assigned OR increasing quantity - just update
                         cursor.execute("UPDATE stampaci SET kolicina = ? WHERE id = ?", (new_value, stampac_id))
                 except ValueError:
                     QMessageBox.warning(self, T.get("error", self.lang), "Količina mora biti broj!")
-                    self.load_stampaci()
-                    return
+                    conn.close()
+                    return False
             
             elif col == 6:  # Napomena
-                new_value = item.text().strip()
-                cursor.execute("UPDATE stampaci SET napomena = ? WHERE id = ?", (new_value, stampac_id))
+                cursor.execute("UPDATE stampaci SET napomena = ? WHERE id = ?", (value, stampac_id))
             
             elif col == 7:  # Driver Link
-                new_value = item.text().strip()
-                cursor.execute("UPDATE stampaci SET driver_link = ? WHERE id = ?", (new_value, stampac_id))
+                cursor.execute("UPDATE stampaci SET driver_link = ? WHERE id = ?", (value, stampac_id))
             
             conn.commit()
             conn.close()
             
-            # Osvježi prikaz
-            try:
-                self.stampaci_table.itemChanged.disconnect(self.on_stampac_item_changed)
-            except:
-                pass
-            self.load_stampaci()
-            self.load_pregled()
+            # Osvježi prikaz - samo izmenjeni red
+            self.refresh_stampac_row(stampac_id)
+            if pregled_changed:
+                self.invalidation_bus.publish('stampaci', 'veze', handled=self.stampaci_tab)
+            return True
             
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom čuvanja: {str(e)}")
             conn.close()
-            self.load_stampaci()
+            return False
     
-    def on_radnik_item_changed(self, item):
-        """Kada korisnik promeni vrednost u bilo kojoj koloni radnika"""
-        col = item.column()
-        
-        if col == 0:  # ID - ne menjaj
-            return
-        
-        row = item.row()
-        radnik_id = int(self.radnici_table.item(row, 0).text())
-        
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
+    def commit_radnik_edit(self, radnik_id, col, value):
+        """Upisuje izmenu imena/prezimena radnika (poziva EmployeeTableModel.setData)"""
+        if not value:
+            message = "Ime ne može biti prazno!" if col == 1 else "Prezime ne može biti prazno!"
+            QMessageBox.warning(self, T.get("error", self.lang), message)
+            return False
+        
+        column = "ime" if col == 1 else "prezime"
         try:
-            if col == 1:  # Ime
-                new_value = item.text().strip()
-                if not new_value:
-                    QMessageBox.warning(self, T.get("error", self.lang), "Ime ne može biti prazno!")
-                    self.load_radnici()
-                    return
-                cursor.execute("UPDATE radnici SET ime = ? WHERE id = ?", (new_value, radnik_id))
-            
-            elif col == 2:  # Prezime
-                new_value = item.text().strip()
-                if not new_value:
-                    QMessageBox.warning(self, T.get("error", self.lang), "Prezime ne može biti prazno!")
-                    self.load_radnici()
-                    return
-                cursor.execute("UPDATE radnici SET prezime = ? WHERE id = ?", (new_value, radnik_id))
-            
-            conn.commit()
-            conn.close()
-            
-            # Osvježi prikaz
-            try:
-                self.radnici_table.itemChanged.disconnect(self.on_radnik_item_changed)
-            except:
-                pass
-            self.load_radnici()
-            self.load_pregled()
-            
+            with self.db.transaction() as cursor:
+                cursor.execute(f"UPDATE radnici SET {column} = ? WHERE id = ?", (value, radnik_id))
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom čuvanja: {str(e)}")
-            conn.close()
-            self.load_radnici()
+            return False
+        
+        # Osvježi prikaz - samo izmenjeni red
+        self.refresh_model_row(self.radnici_model, "WHERE id = ?", radnik_id)
+        self.invalidation_bus.publish('radnici', handled=self.radnici_tab)
+        return True
     
-    def on_stampac_cell_clicked(self, row, column):
+    def on_stampac_cell_clicked(self, index):
         """Kada se klikne na kolonu Status (5) ili Driver Link (7)"""
-        if column == 5:  # Status kolona (sada na poziciji 5)
-            # Prvo proveri da li već postoji combo box u ovoj ćeliji
-            existing_widget = self.stampaci_table.cellWidget(row, column)
-            if existing_widget:
-                # Ako već postoji widget, ukloni ga i ne radi ništa
-                self.stampaci_table.removeCellWidget(row, column)
-                return
-            
-            stampac_id = int(self.stampaci_table.item(row, 0).text())
-            current_status = self.stampaci_table.item(row, 5).text()
-            
-            # Kreiraj combo box
-            combo = QComboBox()
-            combo.addItems([T.get("status_active", self.lang), T.get("status_in_service", self.lang), T.get("status_for_disposal", self.lang)])
-            combo.setCurrentText(current_status)
-            
-            # Postavi combo u ćeliju
-            self.stampaci_table.setCellWidget(row, column, combo)
-            combo.showPopup()
-            
-            # Kada se izabere nova vrednost (koristeći activated umesto currentTextChanged)
-            def on_status_activated(index):
-                new_status = combo.itemText(index)
-                
-                # Prvo ukloni combo iz tabele
-                self.stampaci_table.removeCellWidget(row, column)
-                
-                if new_status != current_status:
-                    reply = QMessageBox.question(self, T.get("confirm", self.lang), 
-                                                T.get("confirm_change_status", self.lang).format(new_status),
-                                                QMessageBox.Yes | QMessageBox.No)
-                    if reply == QMessageBox.Yes:
-                        # Konvertuj prevedeni status nazad u srpski za bazu
-                        reverse_status_map = {
-                            T.get('status_active', self.lang): 'Aktivan',
-                            T.get('status_in_service', self.lang): 'Na servisu',
-                            T.get('status_for_disposal', self.lang): 'Za rashod'
-                        }
-                        db_status = reverse_status_map.get(new_status, new_status)
-                        
-                        # Sačuvaj u bazu
-                        conn = self.db.get_connection()
-                        cursor = conn.cursor()
-                        cursor.execute("UPDATE stampaci SET status = ? WHERE id = ?", 
-                                     (db_status, stampac_id))
-                        conn.commit()
-                        conn.close()
-                        
-                        # Osvježi tabelu
-                        self.load_stampaci()
-                        self.load_pregled()
-                        QMessageBox.information(self, T.get("success", self.lang), T.get("msg_status_changed", self.lang))
-                    else:
-                        # Samo reload bez promene
-                        self.load_stampaci()
-                # Ako je isti status, ne radi ništa - combo je već uklonjen
-            
-            # Koristi activated signal umesto currentTextChanged
-            combo.activated.connect(on_status_activated)
-            
-            # Dodaj i handler za zatvaranje popup-a bez izbora
-            def on_popup_hidden():
-                # Ukloni combo ako popup bude zatvoren bez izbora
-                if self.stampaci_table.cellWidget(row, column) == combo:
-                    self.stampaci_table.removeCellWidget(row, column)
-            
-            # Ovo nije idealno, ali možemo koristiti timer
-            combo.hidePopup_original = combo.hidePopup
-            def hidePopup_wrapped():
-                combo.hidePopup_original()
-                # Odloži uklanjanje da signal 'activated' može da se izvrši prvo
-                QTimer.singleShot(100, on_popup_hidden)
-            combo.hidePopup = hidePopup_wrapped
+        column = index.column()
+        if column == 5:  # Status - delegat otvara padajući meni
+            self.stampaci_table.edit(index)
         
         elif column == 7:  # Driver Link kolona
-            item = self.stampaci_table.item(row, 7)
-            if item and item.text().strip():
-                link = item.text().strip()
+            link = index.data(Qt.DisplayRole).strip()
+            if link:
                 
                 # Ako link ne počinje sa http:// ili https://, dodaj https://
                 if not link.startswith('http://') and not link.startswith('https://'):
@@ -1964,633 +4378,117 @@ class MainWindow(QMainWindow):
                 QTimer.singleShot(100, open_link)  # Odloži 100ms
     
     def load_toneri(self):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, model, minimalna_kolicina, trenutno_stanje FROM toneri ORDER BY model")
+        self.db_worker.submit('toneri', self._fetch_toneri, self._apply_toneri)
+    
+    @INSTRUMENTATION.timed('load_toneri.fetch')
+    def _fetch_toneri(self):
+        """Pozadinski deo load_toneri - skup 'toneri' (redovi, ukupno komada)"""
+        return self.datasets.get('toneri', self._query_toneri)
+    
+    @staticmethod
+    def _query_toneri(cursor):
+        cursor.execute(TonerTableModel.SELECT_SQL.format(where="") + " ORDER BY model")
         rows = cursor.fetchall()
-        conn.close()
-        
-        # Privremeno onemogući signal
-        try:
-            self.toneri_table.itemChanged.disconnect(self.on_toner_stanje_changed)
-        except:
-            pass
-        
-        self.toneri_table.setRowCount(len(rows))
-        for i, row in enumerate(rows):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value) if value is not None else "")
-                
-                # SVE kolone osim ID (0) su editabilne
-                if j == 0:
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                else:
-                    item.setFlags(item.flags() | Qt.ItemIsEditable)
-                
-                # Oboji red ako je ispod minimuma - min_kol je j=2, stanje je j=3
-                if j == 3 and row[3] < row[2] and not self.search_active:  # stanje < min_količina
-                    item.setBackground(QColor(255, 200, 200))
-                self.toneri_table.setItem(i, j, item)
-        
-        # Ponovo omogući signal
-        try:
-            self.toneri_table.itemChanged.disconnect(self.on_toner_stanje_changed)
-        except:
-            pass
-        self.toneri_table.itemChanged.connect(self.on_toner_stanje_changed)
+        cursor.execute("SELECT COALESCE(SUM(trenutno_stanje), 0) FROM toneri")
+        return rows, cursor.fetchone()[0]
+    
+    @INSTRUMENTATION.timed('load_toneri.apply')
+    def _apply_toneri(self, dataset):
+        self.toneri_model.set_rows(dataset.rows)
         
         # Ažuriraj ukupan zbir tonera
-        self.update_ukupno_tonera()
-        
-        # Re-apply search highlighting if search is active
-        if hasattr(self, 'search_input') and self.search_input and self.search_input.text():
-            self.apply_search_highlighting()
+        self.update_ukupno_tonera(dataset.total)
     
-    def load_stampaci(self):
+    def refresh_model_row(self, model, where, row_id):
+        """Ponovo čita jedan red po id-u i menja ga u modelu - vraća (stari, novi) red"""
         conn = self.db.get_connection()
         cursor = conn.cursor()
-        
-        status_filter = self.status_filter.currentText()
-        
-        # Konvertuj prevedeni status nazad u srpski za upit
-        reverse_status_map = {
-            T.get('status_all', self.lang): 'Svi',
-            T.get('status_active', self.lang): 'Aktivan',
-            T.get('status_in_service', self.lang): 'Na servisu',
-            T.get('status_for_disposal', self.lang): 'Za rashod'
-        }
-        db_status_filter = reverse_status_map.get(status_filter, status_filter)
-        
-        # Query with calculated dodeljeno count
-        if db_status_filter == 'Svi' or status_filter == T.get("status_all", self.lang):
-            cursor.execute("""
-                SELECT 
-                    s.id, 
-                    s.model, 
-                    COALESCE(s.kolicina, 1) as kolicina,
-                    COUNT(DISTINCT rs.radnik_id) as dodeljeno,
-                    s.status, 
-                    s.napomena,
-                    s.driver_link
-                FROM stampaci s
-                LEFT JOIN radnik_stampaci rs ON s.id = rs.stampac_id
-                GROUP BY s.id
-                ORDER BY s.model
-            """)
-        else:
-            cursor.execute("""
-                SELECT 
-                    s.id, 
-                    s.model, 
-                    COALESCE(s.kolicina, 1) as kolicina,
-                    COUNT(DISTINCT rs.radnik_id) as dodeljeno,
-                    s.status, 
-                    s.napomena,
-                    s.driver_link
-                FROM stampaci s
-                LEFT JOIN radnik_stampaci rs ON s.id = rs.stampac_id
-                WHERE s.status = ?
-                GROUP BY s.id
-                ORDER BY s.model
-            """, (db_status_filter,))
-        
-        rows = cursor.fetchall()
+        cursor.execute(model.SELECT_SQL.format(where=where), (row_id,))
+        new = cursor.fetchone()
         conn.close()
-        
-        # Privremeno onemogući signal
-        try:
-            self.stampaci_table.itemChanged.disconnect(self.on_stampac_item_changed)
-        except:
-            pass
-        
-        self.stampaci_table.setRowCount(len(rows))
-        for i, row in enumerate(rows):
-            stampac_id, model, kolicina, dodeljeno, status, napomena, driver_link = row
-            slobodno = kolicina - dodeljeno
-            
-            # Column 0: ID
-            item_id = QTableWidgetItem(str(stampac_id))
-            item_id.setFlags(item_id.flags() & ~Qt.ItemIsEditable)
-            self.stampaci_table.setItem(i, 0, item_id)
-            
-            # Column 1: Model
-            item_model = QTableWidgetItem(model)
-            item_model.setFlags(item_model.flags() | Qt.ItemIsEditable)
-            self.stampaci_table.setItem(i, 1, item_model)
-            
-            # Column 2: Količina (editable)
-            item_kol = QTableWidgetItem(str(kolicina))
-            item_kol.setFlags(item_kol.flags() | Qt.ItemIsEditable)
-            self.stampaci_table.setItem(i, 2, item_kol)
-            
-            # Column 3: Dodeljeno (NOT editable)
-            item_dod = QTableWidgetItem(str(dodeljeno))
-            item_dod.setFlags(item_dod.flags() & ~Qt.ItemIsEditable)
-            self.stampaci_table.setItem(i, 3, item_dod)
-            
-            # Column 4: Slobodno (NOT editable)
-            item_slob = QTableWidgetItem(str(slobodno))
-            item_slob.setFlags(item_slob.flags() & ~Qt.ItemIsEditable)
-            # Color code: green if available, red if none
-            if slobodno > 0:
-                item_slob.setBackground(QColor(200, 255, 200))  # Light green
-            elif slobodno == 0:
-                item_slob.setBackground(QColor(255, 220, 220))  # Light red
-            self.stampaci_table.setItem(i, 4, item_slob)
-            
-            # Column 5: Status (editable, with translation)
-            status_map = {
-                'Aktivan': T.get('status_active', self.lang),
-                'Na servisu': T.get('status_in_service', self.lang),
-                'Za rashod': T.get('status_for_disposal', self.lang)
-            }
-            display_status = status_map.get(status, status)
-            item_status = QTableWidgetItem(display_status)
-            item_status.setFlags(item_status.flags() | Qt.ItemIsEditable)
-            if status == "Na servisu":
-                item_status.setBackground(QColor(255, 255, 200))
-            elif status == "Za rashod":
-                item_status.setBackground(QColor(255, 150, 150))
-            self.stampaci_table.setItem(i, 5, item_status)
-            
-            # Column 6: Napomena (editable)
-            item_nap = QTableWidgetItem(napomena if napomena else "")
-            item_nap.setFlags(item_nap.flags() | Qt.ItemIsEditable)
-            self.stampaci_table.setItem(i, 6, item_nap)
-            
-            # Column 7: Driver Link (editable)
-            item_driver = QTableWidgetItem(driver_link if driver_link else "")
-            item_driver.setFlags(item_driver.flags() | Qt.ItemIsEditable)
-            # Style as link if has value
-            if driver_link and driver_link.strip() and not self.search_active:
-                item_driver.setForeground(QColor(0, 0, 255))  # Blue
-                font = item_driver.font()
-                font.setUnderline(True)
-                item_driver.setFont(font)
-                item_driver.setToolTip(T.get("tooltip_click_link", self.lang))
-            self.stampaci_table.setItem(i, 7, item_driver)
-        
-        # Ponovo omogući signal
-        try:
-            self.stampaci_table.itemChanged.disconnect(self.on_stampac_item_changed)
-        except:
-            pass
-        self.stampaci_table.itemChanged.connect(self.on_stampac_item_changed)
+        old = model.update_row(new) if new else None
+        return old, new
+    
+    def refresh_toner_row(self, toner_id):
+        """Posle izmene jednog tonera: jedan upit po id-u umesto celog load_toneri"""
+        old, new = self.refresh_model_row(self.toneri_model, "WHERE id = ?", toner_id)
+        if old and new:
+            self.update_ukupno_tonera(self.ukupno_tonera + (new[3] or 0) - (old[3] or 0))
+    
+    def refresh_stampac_row(self, stampac_id):
+        """Posle izmene jednog štampača: red sa dodeljenim brojem + Ukupno"""
+        old, new = self.refresh_model_row(self.stampaci_model, "WHERE s.id = ?", stampac_id)
+        if old and new:
+            self.update_ukupno_stampaca(self.ukupno_stampaca + new[2] - old[2])
+    
+    def load_stampaci(self):
+        self.db_worker.submit('stampaci', self._fetch_stampaci, self._apply_stampaci)
+    
+    @INSTRUMENTATION.timed('load_stampaci.fetch')
+    def _fetch_stampaci(self):
+        """Pozadinski deo load_stampaci - skup 'stampaci' (redovi, ukupno komada)"""
+        return self.datasets.get('stampaci', self._query_stampaci)
+    
+    @staticmethod
+    def _query_stampaci(cursor):
+        # Query with calculated dodeljeno count - filter po statusu radi proxy model
+        cursor.execute(PrinterTableModel.SELECT_SQL.format(where="") + " ORDER BY s.model")
+        rows = cursor.fetchall()
+        cursor.execute("SELECT COALESCE(SUM(kolicina), 0) FROM stampaci")
+        return rows, cursor.fetchone()[0]
+    
+    @INSTRUMENTATION.timed('load_stampaci.apply')
+    def _apply_stampaci(self, dataset):
+        self.stampaci_model.set_rows(dataset.rows)
         
         # Ažuriraj ukupan broj štampača
-        self.update_ukupno_stampaca()
-        
-        # Re-apply search highlighting if search is active
-        if self.search_active:
-            self.apply_search_highlighting()
+        self.update_ukupno_stampaca(dataset.total)
+    
+    def apply_status_filter(self, index):
+        """Filtrira štampače po statusu bez novog upita (0 = svi)"""
+        self.stampaci_proxy.set_status(((None,) + PrinterTableModel.STATUSES)[index])
     
     def load_radnici(self):
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, ime, prezime FROM radnici ORDER BY prezime, ime")
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # Privremeno onemogući signal
-        try:
-            self.radnici_table.itemChanged.disconnect(self.on_radnik_item_changed)
-        except:
-            pass
-        
-        self.radnici_table.setRowCount(len(rows))
-        for i, row in enumerate(rows):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value) if value else "")
-                
-                # SVE kolone osim ID (0) su editabilne
-                if j == 0:
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                else:
-                    item.setFlags(item.flags() | Qt.ItemIsEditable)
-                
-                self.radnici_table.setItem(i, j, item)
-        
-        # Ponovo omogući signal
-        try:
-            self.radnici_table.itemChanged.disconnect(self.on_radnik_item_changed)
-        except:
-            pass
-        self.radnici_table.itemChanged.connect(self.on_radnik_item_changed)
+        self.db_worker.submit('radnici', self._fetch_radnici, self._apply_radnici)
     
-        # Re-apply search highlighting
-        if hasattr(self, "search_input") and self.search_input.text():
-            self.apply_search_highlighting()
-
-    def search_all(self):
-        """Pretražuje sve tabele po unetom tekstu"""
-        try:
-            search_text = self.search_input.text().lower()
-            
-            # Ako je search prazan, jednostavno prikaži sve redove
-            if not search_text:
-                self.search_active = False  # Clear search flag
-                
-                # Reset tab styles
-                try:
-                    for i in range(self.tabs.count()):
-                        self.tabs.tabBar().setTabTextColor(i, QColor(0, 0, 0))  # Black
-                except:
-                    pass
-                
-                # Privremeno blokiraj search signal da ne bi došlo do rekurzije
-                try:
-                    self.search_input.blockSignals(True)
-                    
-                    # Pokaži sve redove u svim tabelama
-                    if hasattr(self, 'toneri_table'):
-                        for i in range(self.toneri_table.rowCount()):
-                            self.toneri_table.setRowHidden(i, False)
-                    if hasattr(self, 'stampaci_table'):
-                        for i in range(self.stampaci_table.rowCount()):
-                            self.stampaci_table.setRowHidden(i, False)
-                    if hasattr(self, 'radnici_table'):
-                        for i in range(self.radnici_table.rowCount()):
-                            self.radnici_table.setRowHidden(i, False)
-                    if hasattr(self, 'pregled_table'):
-                        for i in range(self.pregled_table.rowCount()):
-                            self.pregled_table.setRowHidden(i, False)
-                    
-                    # Resetuj boje tako što ćemo ponovo učitati tabele
-                    QTimer.singleShot(100, self.delayed_reload_tables)
-                    
-                except Exception as e:
-                    print(f"Error in search reset: {e}")
-                finally:
-                    try:
-                        self.search_input.blockSignals(False)
-                    except:
-                        pass
-                return
-            
-            # Disconnect all itemChanged signals to prevent triggering during search
-            try:
-                self.toneri_table.itemChanged.disconnect(self.on_toner_stanje_changed)
-            except:
-                pass
-            try:
-                self.stampaci_table.itemChanged.disconnect(self.on_stampac_item_changed)
-            except:
-                pass
-            try:
-                self.radnici_table.itemChanged.disconnect(self.on_radnik_item_changed)
-            except:
-                pass
-            
-            # Define highlight color
-            self.search_active = True  # Set flag to preserve highlighting
-            highlight_color = QColor(34, 139, 34)  # DARK GREEN
-            default_color = QColor(255, 255, 255)    # White
-            
-            # Pretraži tonere
-            if hasattr(self, 'toneri_table'):
-                for i in range(self.toneri_table.rowCount()):
-                    # Check if this toner is below minimum
-                    min_qty_item = self.toneri_table.item(i, 2)  # Column 2: Min. količina
-                    stock_item = self.toneri_table.item(i, 3)    # Column 3: Stanje
-                    is_below_min = False
-                    if min_qty_item and stock_item:
-                        try:
-                            min_qty = int(min_qty_item.text())
-                            stock = int(stock_item.text())
-                            is_below_min = stock < min_qty
-                        except:
-                            pass
-                    
-                    row_has_match = False
-                    for j in range(self.toneri_table.columnCount()):
-                        item = self.toneri_table.item(i, j)
-                        if item:
-                            cell_has_match = search_text in item.text().lower()
-                            if cell_has_match:
-                                row_has_match = True
-                            
-                            # Reset formatting first
-                            try:
-                                font = item.font()
-                                font.setBold(False)
-                                item.setFont(font)
-                                item.setForeground(QColor(0, 0, 0))  # Black text
-                            except RuntimeError:
-                                pass
-                            
-                            # Apply appropriate background
-                            try:
-                                if cell_has_match:
-                                    # This specific cell matches - GREEN highlight
-                                    item.setBackground(highlight_color)
-                                    font = item.font()
-                                    font.setBold(True)
-                                    item.setFont(font)
-                                    item.setForeground(QColor(255, 255, 255))  # White text for visibility
-                                else:
-                                    # No match in this cell - preserve original color
-                                    if is_below_min:
-                                        item.setBackground(QColor(255, 200, 200))  # Red - below minimum
-                                    else:
-                                        item.setBackground(default_color)  # White
-                            except RuntimeError:
-                                pass
-                    
-                    self.toneri_table.setRowHidden(i, not row_has_match)
-            
-            # Pretraži štampače
-            if hasattr(self, 'stampaci_table'):
-                for i in range(self.stampaci_table.rowCount()):
-                    # Get Slobodno value for this row (column 4)
-                    slobodno_item = self.stampaci_table.item(i, 4)
-                    slobodno_value = 0
-                    if slobodno_item:
-                        try:
-                            slobodno_value = int(slobodno_item.text())
-                        except:
-                            pass
-                    
-                    row_has_match = False
-                    for j in range(self.stampaci_table.columnCount()):
-                        item = self.stampaci_table.item(i, j)
-                        if item:
-                            cell_has_match = search_text in item.text().lower()
-                            if cell_has_match:
-                                row_has_match = True
-                            
-                            # Reset formatting first
-                            try:
-                                font = item.font()
-                                font.setBold(False)
-                                item.setFont(font)
-                                item.setForeground(QColor(0, 0, 0))  # Black text
-                            except RuntimeError:
-                                pass
-                            
-                            # Apply appropriate background
-                            try:
-                                if cell_has_match:
-                                    # This specific cell matches - GREEN highlight
-                                    item.setBackground(highlight_color)
-                                    font = item.font()
-                                    font.setBold(True)
-                                    item.setFont(font)
-                                    item.setForeground(QColor(255, 255, 255))  # White text for visibility
-                                else:
-                                    # No match in this cell - preserve original colors
-                                    if j == 4:  # Slobodno column
-                                        if slobodno_value > 0:
-                                            item.setBackground(QColor(200, 255, 200))  # Green
-                                        elif slobodno_value == 0:
-                                            item.setBackground(QColor(255, 220, 220))  # Red
-                                        else:
-                                            item.setBackground(default_color)
-                                    elif j == 5:  # Status column
-                                        status_text = item.text()
-                                        if T.get("status_in_service", self.lang) in status_text or "Na servisu" in status_text:
-                                            item.setBackground(QColor(255, 255, 200))  # Yellow
-                                        elif T.get("status_for_disposal", self.lang) in status_text or "Za rashod" in status_text:
-                                            item.setBackground(QColor(255, 150, 150))  # Red
-                                        else:
-                                            item.setBackground(default_color)
-                                    else:
-                                        item.setBackground(default_color)
-                            except RuntimeError:
-                                pass
-                    
-                    self.stampaci_table.setRowHidden(i, not row_has_match)
-            
-            # Pretraži radnike
-            if hasattr(self, 'radnici_table'):
-                for i in range(self.radnici_table.rowCount()):
-                    row_has_match = False
-                    for j in range(self.radnici_table.columnCount()):
-                        item = self.radnici_table.item(i, j)
-                        if item:
-                            cell_has_match = search_text in item.text().lower()
-                            if cell_has_match:
-                                row_has_match = True
-                            
-                            # Reset formatting first
-                            try:
-                                font = item.font()
-                                font.setBold(False)
-                                item.setFont(font)
-                                item.setForeground(QColor(0, 0, 0))  # Black text
-                            except RuntimeError:
-                                pass
-                            
-                            # Apply appropriate background
-                            try:
-                                if cell_has_match:
-                                    # This specific cell matches - GREEN highlight
-                                    item.setBackground(highlight_color)
-                                    font = item.font()
-                                    font.setBold(True)
-                                    item.setFont(font)
-                                    item.setForeground(QColor(255, 255, 255))  # White text for visibility
-                                else:
-                                    # No match in this cell
-                                    item.setBackground(default_color)
-                            except RuntimeError:
-                                pass
-                    self.radnici_table.setRowHidden(i, not row_has_match)
-            
-            # Pretraži pregled (NO HIGHLIGHTING - just hide/show)
-            if hasattr(self, 'pregled_table'):
-                for i in range(self.pregled_table.rowCount()):
-                    match = False
-                    for j in range(self.pregled_table.columnCount()):
-                        item = self.pregled_table.item(i, j)
-                        if item and search_text in item.text().lower():
-                            match = True
-                            break
-                    self.pregled_table.setRowHidden(i, not match)
-
-            # Highlight tabs that have matches
-            # Check each table for matches
-            toneri_has_match = False
-            stampaci_has_match = False
-            radnici_has_match = False
-            
-            if hasattr(self, 'toneri_table'):
-                toneri_has_match = any(not self.toneri_table.isRowHidden(i) for i in range(self.toneri_table.rowCount()))
-            
-            if hasattr(self, 'stampaci_table'):
-                stampaci_has_match = any(not self.stampaci_table.isRowHidden(i) for i in range(self.stampaci_table.rowCount()))
-            
-            if hasattr(self, 'radnici_table'):
-                radnici_has_match = any(not self.radnici_table.isRowHidden(i) for i in range(self.radnici_table.rowCount()))
-            
-            # Highlight tab buttons (indices: 0=Toneri, 1=Stampaci, 2=Radnici)
-            try:
-                if toneri_has_match:
-                    self.tabs.tabBar().setTabTextColor(0, QColor(34, 139, 34))  # DARK GREEN
-                else:
-                    self.tabs.tabBar().setTabTextColor(0, QColor(0, 0, 0))  # Black
-                
-                if stampaci_has_match:
-                    self.tabs.tabBar().setTabTextColor(1, QColor(34, 139, 34))  # DARK GREEN
-                else:
-                    self.tabs.tabBar().setTabTextColor(1, QColor(0, 0, 0))  # Black
-                
-                if radnici_has_match:
-                    self.tabs.tabBar().setTabTextColor(2, QColor(34, 139, 34))  # DARK GREEN
-                else:
-                    self.tabs.tabBar().setTabTextColor(2, QColor(0, 0, 0))  # Black
-            except:
-                pass
-            
-            # Reconnect signals
-            try:
-                self.toneri_table.itemChanged.connect(self.on_toner_stanje_changed)
-            except:
-                pass
-            try:
-                self.stampaci_table.itemChanged.connect(self.on_stampac_item_changed)
-            except:
-                pass
-            try:
-                self.radnici_table.itemChanged.connect(self.on_radnik_item_changed)
-            except:
-                pass
-            
-        except Exception as e:
-            print(f"Critical error in search_all: {e}")
-            # Reset everything if there's a critical error
-            self.search_active = False
-            QTimer.singleShot(100, self.delayed_reload_tables)
+    @INSTRUMENTATION.timed('load_radnici.fetch')
+    def _fetch_radnici(self):
+        return self.datasets.get('radnici', self._query_radnici)
     
-    def delayed_reload_tables(self):
-        """Reload tables with a delay to prevent UI freezing"""
-        try:
-            # Disconnect signals temporarily
-            try:
-                self.toneri_table.itemChanged.disconnect(self.on_toner_stanje_changed)
-            except:
-                pass
-            try:
-                self.stampaci_table.itemChanged.disconnect(self.on_stampac_item_changed)
-            except:
-                pass
-            try:
-                self.radnici_table.itemChanged.disconnect(self.on_radnik_item_changed)
-            except:
-                pass
-            
-            # Reload tables
-            self.load_toneri()
-            self.load_stampaci()
-            self.load_radnici()
-            self.load_pregled()
-            
-            # Reconnect signals
-            try:
-                self.toneri_table.itemChanged.connect(self.on_toner_stanje_changed)
-            except:
-                pass
-            try:
-                self.stampaci_table.itemChanged.connect(self.on_stampac_item_changed)
-            except:
-                pass
-            try:
-                self.radnici_table.itemChanged.connect(self.on_radnik_item_changed)
-            except:
-                pass
-            
-        except Exception as e:
-            print(f"Error in delayed_reload_tables: {e}")
+    @staticmethod
+    def _query_radnici(cursor):
+        cursor.execute(EmployeeTableModel.SELECT_SQL.format(where="") + " ORDER BY prezime, ime")
+        return cursor.fetchall(), None
     
-
-    def apply_search_highlighting(self):
-        """Apply highlighting to search results in ALL tables"""
-        try:
-            search_text = self.search_input.text().lower()
-            if not search_text:
-                return
-            
-            # DISCONNECT all itemChanged signals to prevent recursion
-            try:
-                self.toneri_table.itemChanged.disconnect(self.on_toner_stanje_changed)
-            except:
-                pass
-            try:
-                self.stampaci_table.itemChanged.disconnect(self.on_stampac_item_changed)
-            except:
-                pass
-            try:
-                self.radnici_table.itemChanged.disconnect(self.on_radnik_item_changed)
-            except:
-                pass
-            
-            highlight_color = QColor(34, 139, 34)  # DARK GREEN
-            
-            # Highlight in TONERI table
-            if hasattr(self, 'toneri_table'):
-                for i in range(self.toneri_table.rowCount()):
-                    if not self.toneri_table.isRowHidden(i):
-                        for j in range(self.toneri_table.columnCount()):
-                            item = self.toneri_table.item(i, j)
-                            if item and search_text in item.text().lower():
-                                try:
-                                    item.setBackground(highlight_color)
-                                    font = item.font()
-                                    font.setBold(True)
-                                    item.setFont(font)
-                                    item.setForeground(QColor(255, 255, 255))  # White text
-                                except RuntimeError:
-                                    pass
-            
-            # Highlight in STAMPACI table
-            if hasattr(self, 'stampaci_table'):
-                for i in range(self.stampaci_table.rowCount()):
-                    if not self.stampaci_table.isRowHidden(i):
-                        for j in range(self.stampaci_table.columnCount()):
-                            item = self.stampaci_table.item(i, j)
-                            if item and search_text in item.text().lower():
-                                try:
-                                    item.setBackground(highlight_color)
-                                    font = item.font()
-                                    font.setBold(True)
-                                    item.setFont(font)
-                                    item.setForeground(QColor(255, 255, 255))  # White text
-                                except RuntimeError:
-                                    pass
-            
-            # Highlight in RADNICI table
-            if hasattr(self, 'radnici_table'):
-                for i in range(self.radnici_table.rowCount()):
-                    if not self.radnici_table.isRowHidden(i):
-                        for j in range(self.radnici_table.columnCount()):
-                            item = self.radnici_table.item(i, j)
-                            if item and search_text in item.text().lower():
-                                try:
-                                    item.setBackground(highlight_color)
-                                    font = item.font()
-                                    font.setBold(True)
-                                    item.setFont(font)
-                                    item.setForeground(QColor(255, 255, 255))  # White text
-                                except RuntimeError:
-                                    pass
-            
-            # PREGLED table - NO highlighting, just hide/show handled by search_all
-            
-            # RECONNECT all signals
-            try:
-                self.toneri_table.itemChanged.connect(self.on_toner_stanje_changed)
-            except:
-                pass
-            try:
-                self.stampaci_table.itemChanged.connect(self.on_stampac_item_changed)
-            except:
-                pass
-            try:
-                self.radnici_table.itemChanged.connect(self.on_radnik_item_changed)
-            except:
-                pass
-            
-        except Exception as e:
-            print(f"Error in apply_search_highlighting: {e}")
+    @INSTRUMENTATION.timed('load_radnici.apply')
+    def _apply_radnici(self, dataset):
+        self.radnici_model.set_rows(dataset.rows)
+    
+    def search_all(self):
+        """Pretražuje sve tabele po unetom tekstu - pokreće se tek kad korisnik zastane"""
+        text = self.search_input.text()
+        # Dok je pretraga aktivna, pretraživani tabovi moraju biti ažurni i kad se ne vide
+        self.invalidation_bus.set_live(
+            (self.toneri_tab, self.stampaci_tab, self.radnici_tab, self.pregled_tab) if text else ())
+        self.search_scheduler.schedule(text)
+    
+    def on_search_finished(self, search_text):
+        """Pretraga je primenjena na proxy modele - osveži isticanje i boje tabova"""
+        for table in (self.toneri_table, self.stampaci_table, self.radnici_table):
+            table.viewport().update()
+        
+        if not search_text:
+            # Reset tab styles
+            for i in range(self.tabs.count()):
+                self.tabs.tabBar().setTabTextColor(i, QColor(0, 0, 0))  # Black
+            return
+        
+        # Highlight tab buttons (indices: 0=Toneri, 1=Stampaci, 2=Radnici)
+        for tab_index, proxy in ((0, self.toneri_proxy), (1, self.stampaci_proxy), (2, self.radnici_proxy)):
+            if proxy.rowCount() > 0:
+                self.tabs.tabBar().setTabTextColor(tab_index, QColor(34, 139, 34))  # DARK GREEN
+            else:
+                self.tabs.tabBar().setTabTextColor(tab_index, QColor(0, 0, 0))  # Black
     
     def add_toner(self):
         dialog = TonerDialog(self)
@@ -2610,19 +4508,18 @@ class MainWindow(QMainWindow):
                       data['trenutno_stanje']))
                 conn.commit()
                 conn.close()
-                self.load_toneri()
+                self.invalidation_bus.publish('toneri')
                 QMessageBox.information(self, T.get("success", self.lang), T.get("msg_toner_added", self.lang))
             except sqlite3.IntegrityError:
                 QMessageBox.warning(self, T.get("error", self.lang), T.get("error_model_exists", self.lang))
     
     def edit_toner(self):
-        selected = self.toneri_table.selectedItems()
+        selected = selected_row_data(self.toneri_table)
         if not selected:
             QMessageBox.warning(self, T.get("error", self.lang), T.get("error_select_toner", self.lang))
             return
         
-        row = selected[0].row()
-        toner_id = int(self.toneri_table.item(row, 0).text())
+        toner_id = selected[0]
         
         conn = self.db.get_connection()
         cursor = conn.cursor()
@@ -2643,20 +4540,18 @@ class MainWindow(QMainWindow):
                       data['trenutno_stanje'], toner_id))
                 conn.commit()
                 conn.close()
-                self.load_toneri()
+                self.invalidation_bus.publish('toneri')
                 QMessageBox.information(self, T.get("success", self.lang), T.get("msg_toner_edited", self.lang))
             except sqlite3.IntegrityError:
                 QMessageBox.warning(self, T.get("error", self.lang), "Model već postoji!")
     
     def delete_toner(self):
-        selected = self.toneri_table.selectedItems()
+        selected = selected_row_data(self.toneri_table)
         if not selected:
             QMessageBox.warning(self, T.get("error", self.lang), T.get("error_select_toner_delete", self.lang))
             return
         
-        row = selected[0].row()
-        toner_id = int(self.toneri_table.item(row, 0).text())
-        model = self.toneri_table.item(row, 1).text()
+        toner_id, model = selected[0], selected[1]
         
         # Check if toner is linked to any printers
         conn = self.db.get_connection()
@@ -2697,9 +4592,7 @@ class MainWindow(QMainWindow):
         conn.commit()
         conn.close()
         
-        self.load_toneri()
-        self.load_stampaci()  # Refresh printer list too
-        self.load_pregled()  # Refresh overview
+        self.invalidation_bus.publish('toneri', 'veze', 'istorija')
         QMessageBox.information(self, T.get("success", self.lang), T.get("toner_deleted", self.lang))
     
     def add_stampac(self):
@@ -2730,20 +4623,18 @@ class MainWindow(QMainWindow):
                 
                 conn.commit()
                 conn.close()
-                self.load_stampaci()
-                self.load_pregled()  # Osvježi pregled tab
+                self.invalidation_bus.publish('stampaci', 'veze')
                 QMessageBox.information(self, T.get("success", self.lang), T.get("msg_printer_added", self.lang))
             except sqlite3.IntegrityError:
                 QMessageBox.warning(self, T.get("error", self.lang), "Serijski broj već postoji!")
     
     def edit_stampac(self):
-        selected = self.stampaci_table.selectedItems()
+        selected = selected_row_data(self.stampaci_table)
         if not selected:
             QMessageBox.warning(self, T.get("error", self.lang), T.get("error_select_printer", self.lang))
             return
         
-        row = selected[0].row()
-        stampac_id = int(self.stampaci_table.item(row, 0).text())
+        stampac_id = selected[0]
         
         conn = self.db.get_connection()
         cursor = conn.cursor()
@@ -2774,21 +4665,18 @@ class MainWindow(QMainWindow):
                 
                 conn.commit()
                 conn.close()
-                self.load_stampaci()
-                self.load_pregled()  # Osvježi pregled tab
+                self.invalidation_bus.publish('stampaci', 'veze')
                 QMessageBox.information(self, T.get("success", self.lang), T.get("msg_printer_edited", self.lang))
             except sqlite3.IntegrityError:
                 QMessageBox.warning(self, T.get("error", self.lang), "Serijski broj već postoji!")
     
     def delete_stampac(self):
-        selected = self.stampaci_table.selectedItems()
+        selected = selected_row_data(self.stampaci_table)
         if not selected:
             QMessageBox.warning(self, T.get("error", self.lang), T.get("error_select_printer_delete", self.lang))
             return
         
-        row = selected[0].row()
-        stampac_id = int(self.stampaci_table.item(row, 0).text())
-        model = self.stampaci_table.item(row, 1).text()
+        stampac_id, model = selected[0], selected[1]
         
         # Check if printer is assigned to any employee
         conn = self.db.get_connection()
@@ -2859,9 +4747,7 @@ class MainWindow(QMainWindow):
         conn.commit()
         conn.close()
         
-        self.load_stampaci()
-        self.load_radnici()  # Refresh employee list too
-        self.load_pregled()  # Refresh overview
+        self.invalidation_bus.publish('stampaci', 'veze')
         QMessageBox.information(self, T.get("success", self.lang), T.get("printer_deleted", self.lang))
     
     def add_radnik(self):
@@ -2918,18 +4804,16 @@ class MainWindow(QMainWindow):
             
             conn.commit()
             conn.close()
-            self.load_radnici()
-            self.load_pregled()  # Osvježi pregled tab
+            self.invalidation_bus.publish('radnici', 'veze')
             QMessageBox.information(self, T.get("success", self.lang), T.get("msg_employee_added", self.lang))
     
     def edit_radnik(self):
-        selected = self.radnici_table.selectedItems()
+        selected = selected_row_data(self.radnici_table)
         if not selected:
             QMessageBox.warning(self, T.get("error", self.lang), T.get("error_select_employee", self.lang))
             return
         
-        row = selected[0].row()
-        radnik_id = int(self.radnici_table.item(row, 0).text())
+        radnik_id = selected[0]
         
         conn = self.db.get_connection()
         cursor = conn.cursor()
@@ -2989,39 +4873,33 @@ class MainWindow(QMainWindow):
             
             conn.commit()
             conn.close()
-            self.load_radnici()
-            self.load_pregled()  # Osvježi pregled tab
+            self.invalidation_bus.publish('radnici', 'veze')
             QMessageBox.information(self, T.get("success", self.lang), T.get("msg_employee_edited", self.lang))
     
     def delete_radnik(self):
-        selected = self.radnici_table.selectedItems()
+        selected = selected_row_data(self.radnici_table)
         if not selected:
             QMessageBox.warning(self, T.get("error", self.lang), T.get("error_select_employee_delete", self.lang))
             return
         
-        row = selected[0].row()
-        radnik_id = int(self.radnici_table.item(row, 0).text())
+        radnik_id = selected[0]
         
         reply = QMessageBox.question(self, T.get("confirm", self.lang), T.get("confirm_delete_employee", self.lang),
                                      QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM radnici WHERE id = ?", (radnik_id,))
-            conn.commit()
-            conn.close()
-            self.load_radnici()
+            with self.db.transaction() as cursor:
+                cursor.execute("DELETE FROM radnici WHERE id = ?", (radnik_id,))
+            self.invalidation_bus.publish('radnici', 'veze')
     
     def evidentira_potrosnju(self):
         """Dialog za evidentiranje potrošnje tonera"""
-        selected = self.toneri_table.selectedItems()
+        selected = selected_row_data(self.toneri_table)
         if not selected:
             QMessageBox.warning(self, T.get("error", self.lang), T.get("error_select_toner_consumption", self.lang))
             return
         
-        row = selected[0].row()
-        toner_id = int(self.toneri_table.item(row, 0).text())
-        trenutno_stanje = int(self.toneri_table.item(row, 3).text())  # Kolona 3 je Stanje (bez Opisa)
+        toner_id = selected[0]
+        trenutno_stanje = selected[3] or 0  # Kolona 3 je Stanje
         
         if trenutno_stanje <= 0:
             QMessageBox.warning(self, T.get("error", self.lang), T.get("error_no_stock", self.lang))
@@ -3031,16 +4909,13 @@ class MainWindow(QMainWindow):
                                      T.get("confirm_reduce_stock", self.lang).format(trenutno_stanje),
                                      QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE toneri SET trenutno_stanje = trenutno_stanje - 1 WHERE id = ?", (toner_id,))
-            
-            # Dodaj u istoriju potrošnje
-            cursor.execute("INSERT INTO istorija_potrosnje (toner_id) VALUES (?)", (toner_id,))
+            with self.db.transaction() as cursor:
+                cursor.execute("UPDATE toneri SET trenutno_stanje = trenutno_stanje - 1 WHERE id = ?", (toner_id,))
+                
+                # Dodaj u istoriju potrošnje
+                cursor.execute("INSERT INTO istorija_potrosnje (toner_id) VALUES (?)", (toner_id,))
             
-            conn.commit()
-            conn.close()
-            self.load_toneri()
+            self.invalidation_bus.publish('toneri')
             QMessageBox.information(self, T.get("success", self.lang), T.get("msg_consumption_recorded", self.lang))
     
     def prikazi_narudzbu(self):
@@ -3056,14 +4931,16 @@ class MainWindow(QMainWindow):
             model, min_kol, stanje = row
             debug_info.append(f"{model}: min={min_kol} (tip: {type(min_kol)}), stanje={stanje} (tip: {type(stanje)})")
         
-        cursor.execute('''
-            SELECT model, minimalna_kolicina, trenutno_stanje, 
-                   (minimalna_kolicina - trenutno_stanje) as za_narucivanje
-            FROM toneri 
-            WHERE CAST(trenutno_stanje AS INTEGER) < CAST(minimalna_kolicina AS INTEGER)
-            ORDER BY za_narucivanje DESC
-        ''')
-        rows = cursor.fetchall()
+        with INSTRUMENTATION.measure('narudzba.fetch') as record:
+            cursor.execute('''
+                SELECT model, minimalna_kolicina, trenutno_stanje, 
+                       (minimalna_kolicina - trenutno_stanje) as za_narucivanje
+                FROM toneri 
+                WHERE CAST(trenutno_stanje AS INTEGER) < CAST(minimalna_kolicina AS INTEGER)
+                ORDER BY za_narucivanje DESC
+            ''')
+            rows = cursor.fetchall()
+            record.rows = len(rows)
         conn.close()
         
         if not rows:
@@ -3126,282 +5003,110 @@ class MainWindow(QMainWindow):
         
         dialog.exec_()
     
-    def stampaj_tonere(self):
-        """Prikazuje preview svih tonera u browseru sa mogućnošću štampanja"""
+    @INSTRUMENTATION.timed('report_toneri.fetch')
+    def _fetch_toneri_report(self):
+        """Toneri za izveštaje (preview/Excel) - vraća (redovi, ukupan zbir), iz skupa 'toneri'"""
+        dataset = self.datasets.get('toneri', self._query_toneri)
+        # (model, minimalna_kolicina, trenutno_stanje) - bez id kolone
+        return [row[1:4] for row in dataset.rows], dataset.total
+    
+    @INSTRUMENTATION.timed('report_stampaci.fetch')
+    def _fetch_stampaci_report(self):
+        """Štampači za izveštaje (preview/Excel) - vraća (redovi, ukupan broj), iz skupa 'stampaci'"""
+        dataset = self.datasets.get('stampaci', self._query_stampaci)
+        # (model, kolicina, dodeljeno, status, napomena) - bez id i driver_link kolona
+        return [row[1:6] for row in dataset.rows], dataset.total
+    
+    @INSTRUMENTATION.timed('report_pregled.fetch')
+    def _fetch_pregled_report(self):
+        """Pregled radnik-štampač-toneri za izveštaje (preview/štampa/Excel) - povezani redovi skupa 'pregled'"""
+        dataset = self.datasets.get('pregled', self._query_pregled)
+        return [row[1:] for row in dataset.rows if row[0] == 0]
+    
+    def _fetch_preview(self, report, fetch):
+        """Za preview (u DatabaseWorker-u): (ključ, putanja, None) ako je izveštaj za trenutnu verziju
+        podataka već u kešu, inače (ključ, None, fetch()). Verzija se čita pre podataka -
+        izmena između dva čitanja daje fajl noviji od ključa, a ključ se posle više ne traži."""
+        conn = self.db.get_connection()
         try:
-            from datetime import datetime
-            import tempfile
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT model, minimalna_kolicina, trenutno_stanje 
-                FROM toneri 
-                ORDER BY model
-            """)
-            rows = cursor.fetchall()
-            
-            # Izračunaj ukupan zbir svih tonera
-            cursor.execute("SELECT COALESCE(SUM(trenutno_stanje), 0) FROM toneri")
-            ukupan_zbir = cursor.fetchone()[0]
-            
+            version = self.datasets.data_version(conn)
+        finally:
             conn.close()
-            
+        # Keš je u zajedničkom temp folderu - apsolutna putanja razdvaja instalacije i kopije baze
+        key = self.report_cache.key(report, self.lang, os.path.abspath(self.db.db_name), version)
+        path = self.report_cache.lookup(key)
+        return key, path, None if path else fetch()
+    
+    def _on_report_error(self, message):
+        QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{message}")
+    
+    def stampaj_tonere(self):
+        """Prikazuje preview svih tonera u browseru sa mogućnošću štampanja"""
+        self.db_worker.submit('report_toneri', lambda: self._fetch_preview('toneri', self._fetch_toneri_report),
+                              self._show_toneri_preview, self._on_report_error)
+    
+    def _show_toneri_preview(self, result):
+        key, path, data = result
+        if path:
+            self.open_preview(path)
+            return
+        rows, ukupan_zbir = data
+        try:
             if not rows:
                 QMessageBox.information(self, T.get("info", self.lang), "Nema tonera u bazi.")
                 return
             
-            # Kreiraj HTML
-            html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>{T.get('col_toners', self.lang) if self.lang == 'sr' else 'Toners'}</title>
-                <style>
-                    body {{ 
-                        font-family: Arial, sans-serif; 
-                        margin: 40px;
-                        max-width: 1200px;
-                    }}
-                    h1 {{ 
-                        text-align: center; 
-                        color: #2C3E50; 
-                        margin-bottom: 10px;
-                        font-size: 24pt;
-                    }}
-                    .datum {{ 
-                        text-align: left; 
-                        margin-bottom: 30px;
-                        font-size: 12pt;
-                    }}
-                    table {{ 
-                        border-collapse: collapse; 
-                        width: 100%;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    }}
-                    th {{ 
-                        background-color: #34495E; 
-                        color: white; 
-                        padding: 12px; 
-                        border: 1px solid #2C3E50;
-                        font-size: 12pt;
-                    }}
-                    td {{ 
-                        padding: 10px; 
-                        border: 1px solid #BDC3C7; 
-                        text-align: center;
-                        font-size: 11pt;
-                    }}
-                    tr:nth-child(even) {{ 
-                        background-color: #ECF0F1; 
-                    }}
-                    tr:hover {{
-                        background-color: #D5DBDB;
-                    }}
-                    .red {{ 
-                        background-color: #FFB6B6; 
-                        color: #C80000; 
-                        font-weight: bold;
-                    }}
-                    .footer {{ 
-                        margin-top: 20px; 
-                        font-style: italic;
-                        font-size: 11pt;
-                        text-align: center;
-                    }}
-                    .print-button {{
-                        background-color: #2196F3;
-                        color: white;
-                        padding: 15px 32px;
-                        text-align: center;
-                        font-size: 16px;
-                        margin: 20px 0;
-                        cursor: pointer;
-                        border: none;
-                        border-radius: 4px;
-                        display: block;
-                        margin-left: auto;
-                        margin-right: auto;
-                    }}
-                    .print-button:hover {{
-                        background-color: #0b7dda;
-                    }}
-                    @media print {{
-                        .print-button {{ display: none; }}
-                        body {{ margin: 20px; }}
-                    }}
-                </style>
-            </head>
-            <body>
-                <button class="print-button" onclick="window.print()">🖨️ {T.get('preview_print_btn', self.lang)}</button>
-                
-                <h1>{'LISTA TONERA' if self.lang == 'sr' else 'TONER LIST'}</h1>
-                <p class="datum">{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}</p>
-                <table>
-                    <tr>
-                        <th>{'Redni broj' if self.lang == 'sr' else 'No.'}</th>
-                        <th>{T.get('col_model', self.lang)}</th>
-                        <th>{T.get('col_min_qty', self.lang)}</th>
-                        <th>{T.get('col_stock', self.lang)}</th>
-                    </tr>
-            """
-            
-            for idx, row in enumerate(rows, 1):
-                model, min_kol, trenutno = row
-                # Proveri da li je ispod minimuma
-                is_below_min = trenutno < min_kol if trenutno is not None and min_kol is not None else False
-                stanje_class = 'class="red"' if is_below_min else ''
-                
-                html += f"""
-                    <tr>
-                        <td>{idx}</td>
-                        <td>{model}</td>
-                        <td>{min_kol if min_kol is not None else '-'}</td>
-                        <td {stanje_class}>{trenutno if trenutno is not None else '0'}</td>
-                    </tr>
-                """
-            
-            html += f"""
-                </table>
-                <p class="footer">
-                    {'Različitih tonera:' if self.lang == 'sr' else 'Different toners:'} {len(rows)} | 
-                    {'Ukupno komada:' if self.lang == 'sr' else 'Total pieces:'} {ukupan_zbir}
-                </p>
-            </body>
-            </html>
-            """
-            
-            # Sačuvaj u temp fajl i otvori u browseru
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8')
-            temp_file.write(html)
-            temp_file.close()
-            
-            QDesktopServices.openUrl(QUrl.fromLocalFile(temp_file.name))
+            self.export_jobs.submit(T.get('export_preview_job', self.lang),
+                                    lambda job: self.write_preview(key, self._toneri_html(rows, ukupan_zbir), job),
+                                    self.open_preview, self._on_preview_error, total=len(rows))
             
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
     
+    def _toneri_html(self, rows, ukupan_zbir):
+        """HTML izveštaj 'Lista tonera' - stanje ispod minimuma je crveno"""
+        def cells():
+            for idx, (model, min_kol, trenutno) in enumerate(rows, 1):
+                # Proveri da li je ispod minimuma
+                is_below_min = trenutno < min_kol if trenutno is not None and min_kol is not None else False
+                stanje = trenutno if trenutno is not None else '0'
+                yield (idx, model, min_kol if min_kol is not None else '-',
+                       (stanje, 'red') if is_below_min else stanje)
+        
+        def footer(count):
+            if self.lang == 'sr':
+                return f"Različitih tonera: {count} | Ukupno komada: {ukupan_zbir}"
+            return f"Different toners: {count} | Total pieces: {ukupan_zbir}"
+        
+        return HtmlReport(
+            'toneri',
+            T.get('col_toners', self.lang) if self.lang == 'sr' else 'Toners',
+            'LISTA TONERA' if self.lang == 'sr' else 'TONER LIST',
+            ['Redni broj' if self.lang == 'sr' else 'No.', T.get('col_model', self.lang),
+             T.get('col_min_qty', self.lang), T.get('col_stock', self.lang)],
+            cells(),
+            date_line=f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=footer, print_button=T.get('preview_print_btn', self.lang))
+    
+    def write_preview(self, key, report, job):
+        """HTML preview se piše direktno u keš izveštaja pod ključem key (u ExportJob-u) - vraća putanju.
+        U browseru ga otvara open_preview (GUI thread); otkazan preview ne ostavlja fajl."""
+        with INSTRUMENTATION.measure(f'report_{report.stylesheet}.preview') as record:
+            def write(out):
+                record.rows = HtmlRenderer.write(out, report, job)
+            return self.report_cache.write(key, write)
+    
     def export_tonere_excel(self):
         """Eksportuje sve tonere u Excel"""
+        self.db_worker.submit('export_toneri', self._fetch_toneri_report, self._write_toneri_excel, self._on_report_error)
+    
+    def _write_toneri_excel(self, result):
+        rows, ukupan_zbir = result
         try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            from datetime import datetime
-            import os
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT model, minimalna_kolicina, trenutno_stanje 
-                FROM toneri 
-                ORDER BY model
-            """)
-            rows = cursor.fetchall()
-            
-            # Izračunaj ukupan zbir svih tonera
-            cursor.execute("SELECT COALESCE(SUM(trenutno_stanje), 0) FROM toneri")
-            ukupan_zbir = cursor.fetchone()[0]
-            
-            conn.close()
-            
             if not rows:
                 QMessageBox.information(self, T.get("info", self.lang), "Nema tonera u bazi.")
                 return
             
-            wb = Workbook()
-            ws = wb.active
-            ws.title = 'Lista tonera'[:31]  # Excel limit 31 chars
-            
-            # Naslov
-            ws['A1'] = 'LISTA TONERA' if self.lang == 'sr' else 'TONER LIST'
-            ws['A1'].font = Font(size=18, bold=True)
-            ws['A1'].alignment = Alignment(horizontal='center')
-            ws.merge_cells('A1:D1')
-            
-            # Datum
-            ws['A2'] = f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}"
-            ws['A2'].font = Font(size=11)
-            ws['A2'].alignment = Alignment(horizontal='left')
-            
-            # Header
-            headers = [
-                'Br.' if self.lang == 'sr' else 'No.',
-                T.get('col_model', self.lang), 
-                T.get('col_min_qty', self.lang), 
-                T.get('col_stock', self.lang)
-            ]
-            
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=4, column=col)
-                cell.value = header
-                cell.font = Font(bold=True, color='FFFFFF', size=12)
-                cell.fill = PatternFill(start_color='34495E', end_color='34495E', fill_type='solid')
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = thin_border
-            
-            # Data
-            for idx, row_data in enumerate(rows, 1):
-                model, min_kol, trenutno = row_data
-                
-                # Proveri da li je ispod minimuma
-                is_below_min = trenutno < min_kol if trenutno is not None and min_kol is not None else False
-                
-                # Redni broj
-                cell = ws.cell(row=idx+4, column=1)
-                cell.value = idx
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = thin_border
-                
-                # Model
-                cell = ws.cell(row=idx+4, column=2)
-                cell.value = model
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = thin_border
-                
-                # Minimalna količina
-                cell = ws.cell(row=idx+4, column=3)
-                cell.value = min_kol if min_kol is not None else '-'
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = thin_border
-                
-                # Trenutno stanje
-                cell = ws.cell(row=idx+4, column=4)
-                cell.value = trenutno if trenutno is not None else 0
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = thin_border
-                
-                # Highlight ako je ispod minimuma
-                if is_below_min:
-                    cell.fill = PatternFill(start_color='FFB6B6', end_color='FFB6B6', fill_type='solid')
-                    cell.font = Font(bold=True, color='C80000')
-            
-            # Auto width
-            for col_idx in range(1, 5):  # 4 kolone
-                max_length = 0
-                for row in ws.iter_rows(min_row=4, min_col=col_idx, max_col=col_idx):
-                    for cell in row:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                from openpyxl.utils import get_column_letter
-                ws.column_dimensions[get_column_letter(col_idx)].width = max_length + 3
-            
-            # Footer
-            footer_row = len(rows) + 6
-            if self.lang == 'sr':
-                footer_text = f"Različitih tonera: {len(rows)} | Ukupno komada: {ukupan_zbir}"
-            else:
-                footer_text = f"Different toners: {len(rows)} | Total pieces: {ukupan_zbir}"
-            ws.cell(row=footer_row, column=1).value = footer_text
-            ws.cell(row=footer_row, column=1).font = Font(italic=True, size=11)
-            
             # Save dialog
             file_path, _ = QFileDialog.getSaveFileName(
                 self, 
@@ -3411,380 +5116,135 @@ class MainWindow(QMainWindow):
             )
             
             if file_path:
-                wb.save(file_path)
-                QMessageBox.information(self, T.get("success", self.lang), 
-                    f"{'Fajl je sačuvan:' if self.lang == 'sr' else 'File saved:'}\n{file_path}")
-                
-                # Pitaj korisnika da li želi da otvori fajl
-                reply = QMessageBox.question(self, 
-                    T.get("success", self.lang),
-                    T.get("msg_open_file", self.lang) if self.lang == 'sr' else "Open file?",
-                    QMessageBox.Yes | QMessageBox.No)
-                
-                if reply == QMessageBox.Yes:
-                    QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
+                self.submit_excel('toneri', file_path, self._toneri_sheet(rows, ukupan_zbir), len(rows), self._on_excel_saved)
             
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
     
+    def submit_excel(self, report, file_path, sheet, total, on_saved):
+        """Upis Excel fajla ide u red izvoza - on_saved(putanja) kad je fajl sačuvan.
+        Upis se meri u poslu izvoza kao 'report_<report>.excel'."""
+        def write(job):
+            with INSTRUMENTATION.measure(f'report_{report}.excel') as record:
+                counts = ExcelExporter.write(file_path, sheet, job=job)
+                record.rows = sum(counts)
+            return counts
+        self.export_jobs.submit(os.path.basename(file_path), write,
+                                lambda counts: on_saved(file_path), self._on_export_error, total=total)
+    
+    def _on_excel_saved(self, file_path):
+        QMessageBox.information(self, T.get("success", self.lang), 
+            f"{'Fajl je sačuvan:' if self.lang == 'sr' else 'File saved:'}\n{file_path}")
+        
+        # Pitaj korisnika da li želi da otvori fajl
+        reply = QMessageBox.question(self, 
+            T.get("success", self.lang),
+            T.get("msg_open_file", self.lang) if self.lang == 'sr' else "Open file?",
+            QMessageBox.Yes | QMessageBox.No)
+        
+        if reply == QMessageBox.Yes:
+            QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
+    
+    def _on_excel_created(self, filepath):
+        """Fajl sačuvan u radni folder - javlja ime i otvara ga"""
+        QMessageBox.information(self, T.get("success", self.lang), T.get("msg_excel_created", self.lang) + "\n\n" + T.get("msg_file", self.lang) + " " + os.path.basename(filepath))
+        try:
+            self.open_file(filepath)
+        except Exception as e:
+            QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
+    
+    def _toneri_sheet(self, rows, ukupan_zbir):
+        """Excel list 'Lista tonera' - stanje ispod minimuma je crveno"""
+        def cells():
+            for idx, (model, min_kol, trenutno) in enumerate(rows, 1):
+                stanje = trenutno if trenutno is not None else 0
+                is_below_min = trenutno < min_kol if trenutno is not None and min_kol is not None else False
+                yield (idx, model, min_kol if min_kol is not None else '-',
+                       (stanje, 'red_border') if is_below_min else stanje)
+        
+        def footer(count):
+            if self.lang == 'sr':
+                return f"Različitih tonera: {count} | Ukupno komada: {ukupan_zbir}"
+            return f"Different toners: {count} | Total pieces: {ukupan_zbir}"
+        
+        return ExcelSheet(
+            'Lista tonera',
+            'LISTA TONERA' if self.lang == 'sr' else 'TONER LIST',
+            ['Br.' if self.lang == 'sr' else 'No.', T.get('col_model', self.lang),
+             T.get('col_min_qty', self.lang), T.get('col_stock', self.lang)],
+            cells(), ('center_border',) * 4,
+            title_style='title18', header_style='header_border',
+            date_line=f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=footer, footer_style='footer11', width_pad=3)
+    
     def stampaj_stampace(self):
         """Prikazuje preview svih štampača u browseru sa mogućnošću štampanja"""
+        self.db_worker.submit('report_stampaci', lambda: self._fetch_preview('stampaci', self._fetch_stampaci_report),
+                              self._show_stampaci_preview, self._on_report_error)
+    
+    def _show_stampaci_preview(self, result):
+        key, path, data = result
+        if path:
+            self.open_preview(path)
+            return
+        rows, ukupan_broj = data
         try:
-            from datetime import datetime
-            import tempfile
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    s.model, 
-                    COALESCE(s.kolicina, 1) as kolicina,
-                    COUNT(DISTINCT rs.radnik_id) as dodeljeno,
-                    s.status,
-                    s.napomena
-                FROM stampaci s
-                LEFT JOIN radnik_stampaci rs ON s.id = rs.stampac_id
-                GROUP BY s.id
-                ORDER BY s.model
-            """)
-            rows = cursor.fetchall()
-            
-            # Izračunaj ukupan broj štampača
-            cursor.execute("SELECT COALESCE(SUM(kolicina), 0) FROM stampaci")
-            ukupan_broj = cursor.fetchone()[0]
-            
-            conn.close()
-            
             if not rows:
                 QMessageBox.information(self, T.get("info", self.lang), "Nema štampača u bazi.")
                 return
             
-            # Kreiraj HTML
-            html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>{'LISTA ŠTAMPAČA' if self.lang == 'sr' else 'PRINTER LIST'}</title>
-                <style>
-                    body {{ 
-                        font-family: Arial, sans-serif; 
-                        margin: 40px;
-                        max-width: 1400px;
-                    }}
-                    h1 {{ 
-                        text-align: center; 
-                        color: #2C3E50; 
-                        margin-bottom: 10px;
-                        font-size: 24pt;
-                    }}
-                    .datum {{ 
-                        text-align: left; 
-                        margin-bottom: 30px;
-                        font-size: 12pt;
-                    }}
-                    table {{ 
-                        border-collapse: collapse; 
-                        width: 100%;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    }}
-                    th {{ 
-                        background-color: #34495E; 
-                        color: white; 
-                        padding: 12px; 
-                        border: 1px solid #2C3E50;
-                        font-size: 11pt;
-                    }}
-                    td {{ 
-                        padding: 10px; 
-                        border: 1px solid #BDC3C7; 
-                        text-align: center;
-                        font-size: 10pt;
-                    }}
-                    tr:nth-child(even) {{ 
-                        background-color: #ECF0F1; 
-                    }}
-                    tr:hover {{
-                        background-color: #D5DBDB;
-                    }}
-                    .green {{ 
-                        background-color: #C8E6C9; 
-                        color: #2E7D32; 
-                        font-weight: bold;
-                    }}
-                    .red {{ 
-                        background-color: #FFCDD2; 
-                        color: #C62828; 
-                        font-weight: bold;
-                    }}
-                    .yellow {{ 
-                        background-color: #FFF9C4; 
-                        color: #F57F17; 
-                        font-weight: bold;
-                    }}
-                    .footer {{ 
-                        margin-top: 20px; 
-                        font-style: italic;
-                        font-size: 11pt;
-                        text-align: center;
-                    }}
-                    .print-button {{
-                        background-color: #2196F3;
-                        color: white;
-                        padding: 15px 32px;
-                        text-align: center;
-                        font-size: 16px;
-                        margin: 20px 0;
-                        cursor: pointer;
-                        border: none;
-                        border-radius: 4px;
-                        display: block;
-                        margin-left: auto;
-                        margin-right: auto;
-                    }}
-                    .print-button:hover {{
-                        background-color: #0b7dda;
-                    }}
-                    @media print {{
-                        .print-button {{ display: none; }}
-                        body {{ margin: 20px; }}
-                    }}
-                </style>
-            </head>
-            <body>
-                <button class="print-button" onclick="window.print()">🖨️ {T.get('preview_print_btn', self.lang)}</button>
-                
-                <h1>{'LISTA ŠTAMPAČA' if self.lang == 'sr' else 'PRINTER LIST'}</h1>
-                <p class="datum">{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}</p>
-                <table>
-                    <tr>
-                        <th>{'Br.' if self.lang == 'sr' else 'No.'}</th>
-                        <th>{T.get('col_model', self.lang)}</th>
-                        <th>{T.get('col_quantity', self.lang)}</th>
-                        <th>{T.get('col_assigned', self.lang)}</th>
-                        <th>{T.get('col_available', self.lang)}</th>
-                        <th>{T.get('col_status', self.lang)}</th>
-                        <th>{T.get('col_notes', self.lang)}</th>
-                    </tr>
-            """
+            self.export_jobs.submit(T.get('export_preview_job', self.lang),
+                                    lambda job: self.write_preview(key, self._stampaci_html(rows, ukupan_broj), job),
+                                    self.open_preview, self._on_preview_error, total=len(rows))
             
-            for idx, row in enumerate(rows, 1):
-                model, kolicina, dodeljeno, status, napomena = row
+        except Exception as e:
+            QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
+    
+    def _stampaci_html(self, rows, ukupan_broj):
+        """HTML izveštaj 'Lista štampača' - slobodni komadi zeleno/crveno, status servis/rashod obojen"""
+        status_map = status_labels(self.lang)
+        status_classes = {'Na servisu': 'yellow', 'Za rashod': 'red'}
+        
+        def cells():
+            for idx, (model, kolicina, dodeljeno, status, napomena) in enumerate(rows, 1):
                 slobodno = kolicina - dodeljeno
-                
-                # Status translation
-                status_map = {
-                    'Aktivan': T.get('status_active', self.lang),
-                    'Na servisu': T.get('status_in_service', self.lang),
-                    'Za rashod': T.get('status_for_disposal', self.lang)
-                }
-                display_status = status_map.get(status, status)
-                
-                # Color for Slobodno
-                slobodno_class = ''
                 if slobodno > 0:
-                    slobodno_class = 'class="green"'
+                    slobodno = (slobodno, 'green')
                 elif slobodno == 0:
-                    slobodno_class = 'class="red"'
-                
-                # Color for Status
-                status_class = ''
-                if status == "Na servisu":
-                    status_class = 'class="yellow"'
-                elif status == "Za rashod":
-                    status_class = 'class="red"'
-                
-                html += f"""
-                    <tr>
-                        <td>{idx}</td>
-                        <td>{model}</td>
-                        <td>{kolicina}</td>
-                        <td>{dodeljeno}</td>
-                        <td {slobodno_class}>{slobodno}</td>
-                        <td {status_class}>{display_status}</td>
-                        <td style="text-align: left;">{napomena if napomena else '-'}</td>
-                    </tr>
-                """
-            
-            html += f"""
-                </table>
-                <p class="footer">
-                    {'Različitih štampača:' if self.lang == 'sr' else 'Different printers:'} {len(rows)} | 
-                    {'Ukupno komada:' if self.lang == 'sr' else 'Total pieces:'} {ukupan_broj}
-                </p>
-            </body>
-            </html>
-            """
-            
-            # Sačuvaj u temp fajl i otvori u browseru
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8')
-            temp_file.write(html)
-            temp_file.close()
-            
-            QDesktopServices.openUrl(QUrl.fromLocalFile(temp_file.name))
-            
-        except Exception as e:
-            QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
+                    slobodno = (slobodno, 'red')
+                display_status = status_map.get(status, status)
+                if status in status_classes:
+                    display_status = (display_status, status_classes[status])
+                yield (idx, model, kolicina, dodeljeno, slobodno, display_status,
+                       (napomena if napomena else '-', 'left'))
+        
+        def footer(count):
+            if self.lang == 'sr':
+                return f"Različitih štampača: {count} | Ukupno komada: {ukupan_broj}"
+            return f"Different printers: {count} | Total pieces: {ukupan_broj}"
+        
+        return HtmlReport(
+            'stampaci',
+            'LISTA ŠTAMPAČA' if self.lang == 'sr' else 'PRINTER LIST',
+            'LISTA ŠTAMPAČA' if self.lang == 'sr' else 'PRINTER LIST',
+            ['Br.' if self.lang == 'sr' else 'No.', T.get('col_model', self.lang),
+             T.get('col_quantity', self.lang), T.get('col_assigned', self.lang),
+             T.get('col_available', self.lang), T.get('col_status', self.lang), T.get('col_notes', self.lang)],
+            cells(),
+            date_line=f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=footer, print_button=T.get('preview_print_btn', self.lang))
     
     def export_stampace_excel(self):
         """Eksportuje sve štampače u Excel"""
+        self.db_worker.submit('export_stampaci', self._fetch_stampaci_report, self._write_stampaci_excel, self._on_report_error)
+    
+    def _write_stampaci_excel(self, result):
+        rows, ukupan_broj = result
         try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            from datetime import datetime
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    s.model, 
-                    COALESCE(s.kolicina, 1) as kolicina,
-                    COUNT(DISTINCT rs.radnik_id) as dodeljeno,
-                    s.status,
-                    s.napomena
-                FROM stampaci s
-                LEFT JOIN radnik_stampaci rs ON s.id = rs.stampac_id
-                GROUP BY s.id
-                ORDER BY s.model
-            """)
-            rows = cursor.fetchall()
-            
-            # Izračunaj ukupan broj štampača
-            cursor.execute("SELECT COALESCE(SUM(kolicina), 0) FROM stampaci")
-            ukupan_broj = cursor.fetchone()[0]
-            
-            conn.close()
-            
             if not rows:
                 QMessageBox.information(self, T.get("info", self.lang), "Nema štampača u bazi.")
                 return
             
-            wb = Workbook()
-            ws = wb.active
-            ws.title = 'Lista štampača'[:31]
-            
-            # Naslov
-            ws['A1'] = 'LISTA ŠTAMPAČA' if self.lang == 'sr' else 'PRINTER LIST'
-            ws['A1'].font = Font(size=18, bold=True)
-            ws['A1'].alignment = Alignment(horizontal='center')
-            ws.merge_cells('A1:G1')
-            
-            # Datum
-            ws['A2'] = f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}"
-            ws['A2'].font = Font(size=11)
-            
-            # Headers
-            headers = [
-                'Br.' if self.lang == 'sr' else 'No.',
-                T.get('col_model', self.lang),
-                T.get('col_quantity', self.lang),
-                T.get('col_assigned', self.lang),
-                T.get('col_available', self.lang),
-                T.get('col_status', self.lang),
-                T.get('col_notes', self.lang)
-            ]
-            
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=4, column=col)
-                cell.value = header
-                cell.font = Font(bold=True, color='FFFFFF', size=12)
-                cell.fill = PatternFill(start_color='34495E', end_color='34495E', fill_type='solid')
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-                cell.border = thin_border
-            
-            # Data
-            for idx, row_data in enumerate(rows, 1):
-                model, kolicina, dodeljeno, status, napomena = row_data
-                slobodno = kolicina - dodeljeno
-                
-                # Status translation
-                status_map = {
-                    'Aktivan': T.get('status_active', self.lang),
-                    'Na servisu': T.get('status_in_service', self.lang),
-                    'Za rashod': T.get('status_for_disposal', self.lang)
-                }
-                display_status = status_map.get(status, status)
-                
-                # Redni broj
-                cell = ws.cell(row=idx+4, column=1)
-                cell.value = idx
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = thin_border
-                
-                # Model
-                cell = ws.cell(row=idx+4, column=2)
-                cell.value = model
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = thin_border
-                
-                # Količina
-                cell = ws.cell(row=idx+4, column=3)
-                cell.value = kolicina
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = thin_border
-                
-                # Dodeljeno
-                cell = ws.cell(row=idx+4, column=4)
-                cell.value = dodeljeno
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = thin_border
-                
-                # Slobodno
-                cell = ws.cell(row=idx+4, column=5)
-                cell.value = slobodno
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = thin_border
-                if slobodno > 0:
-                    cell.fill = PatternFill(start_color='C8E6C9', end_color='C8E6C9', fill_type='solid')
-                    cell.font = Font(bold=True, color='2E7D32')
-                elif slobodno == 0:
-                    cell.fill = PatternFill(start_color='FFCDD2', end_color='FFCDD2', fill_type='solid')
-                    cell.font = Font(bold=True, color='C62828')
-                
-                # Status
-                cell = ws.cell(row=idx+4, column=6)
-                cell.value = display_status
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = thin_border
-                if status == "Na servisu":
-                    cell.fill = PatternFill(start_color='FFF9C4', end_color='FFF9C4', fill_type='solid')
-                    cell.font = Font(bold=True, color='F57F17')
-                elif status == "Za rashod":
-                    cell.fill = PatternFill(start_color='FFCDD2', end_color='FFCDD2', fill_type='solid')
-                    cell.font = Font(bold=True, color='C62828')
-                
-                # Napomena
-                cell = ws.cell(row=idx+4, column=7)
-                cell.value = napomena if napomena else '-'
-                cell.alignment = Alignment(horizontal='left')
-                cell.border = thin_border
-            
-            # Auto width
-            for col_idx in range(1, 8):
-                max_length = 0
-                for row in ws.iter_rows(min_row=4, min_col=col_idx, max_col=col_idx):
-                    for cell in row:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                from openpyxl.utils import get_column_letter
-                ws.column_dimensions[get_column_letter(col_idx)].width = max_length + 3
-            
-            # Footer
-            footer_row = len(rows) + 6
-            if self.lang == 'sr':
-                footer_text = f"Različitih štampača: {len(rows)} | Ukupno komada: {ukupan_broj}"
-            else:
-                footer_text = f"Different printers: {len(rows)} | Total pieces: {ukupan_broj}"
-            ws.cell(row=footer_row, column=1).value = footer_text
-            ws.cell(row=footer_row, column=1).font = Font(italic=True, size=11)
-            
             # Save dialog
             file_path, _ = QFileDialog.getSaveFileName(
                 self,
@@ -3794,156 +5254,72 @@ class MainWindow(QMainWindow):
             )
             
             if file_path:
-                wb.save(file_path)
-                QMessageBox.information(self, T.get("success", self.lang),
-                    f"{'Fajl je sačuvan:' if self.lang == 'sr' else 'File saved:'}\n{file_path}")
-                
-                # Pitaj korisnika da li želi da otvori fajl
-                reply = QMessageBox.question(self,
-                    T.get("success", self.lang),
-                    T.get("msg_open_file", self.lang) if self.lang == 'sr' else "Open file?",
-                    QMessageBox.Yes | QMessageBox.No)
-                
-                if reply == QMessageBox.Yes:
-                    QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
+                self.submit_excel('stampaci', file_path, self._stampaci_sheet(rows, ukupan_broj), len(rows), self._on_excel_saved)
             
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
     
+    def _stampaci_sheet(self, rows, ukupan_broj):
+        """Excel list 'Lista štampača' - slobodni komadi zeleno/crveno, status servis/rashod obojen"""
+        status_map = status_labels(self.lang)
+        status_styles = {'Na servisu': 'yellow_border', 'Za rashod': 'pink_border'}
+        
+        def cells():
+            for idx, (model, kolicina, dodeljeno, status, napomena) in enumerate(rows, 1):
+                slobodno = kolicina - dodeljeno
+                if slobodno > 0:
+                    slobodno = (slobodno, 'green_border')
+                elif slobodno == 0:
+                    slobodno = (slobodno, 'pink_border')
+                yield (idx, model, kolicina, dodeljeno, slobodno,
+                       (status_map.get(status, status), status_styles.get(status, 'center_border')),
+                       napomena if napomena else '-')
+        
+        def footer(count):
+            if self.lang == 'sr':
+                return f"Različitih štampača: {count} | Ukupno komada: {ukupan_broj}"
+            return f"Different printers: {count} | Total pieces: {ukupan_broj}"
+        
+        return ExcelSheet(
+            'Lista štampača',
+            'LISTA ŠTAMPAČA' if self.lang == 'sr' else 'PRINTER LIST',
+            ['Br.' if self.lang == 'sr' else 'No.', T.get('col_model', self.lang),
+             T.get('col_quantity', self.lang), T.get('col_assigned', self.lang),
+             T.get('col_available', self.lang), T.get('col_status', self.lang), T.get('col_notes', self.lang)],
+            cells(), ('center_border',) * 6 + ('left_border',),
+            title_style='title18', header_style='header_border',
+            date_line=f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=footer, footer_style='footer11', width_pad=3)
+    
     def preview_narudzbu(self, rows):
         """Prikazuje preview narudžbine u browseru"""
-        try:
-            from datetime import datetime
-            import tempfile
-            import os
-            
-            # Kreiraj HTML sa prevodima
-            html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>{T.get('order_list_title', self.lang)}</title>
-                <style>
-                    body {{ 
-                        font-family: Arial, sans-serif; 
-                        margin: 40px;
-                        max-width: 1000px;
-                    }}
-                    h1 {{ 
-                        text-align: center; 
-                        color: #2C3E50; 
-                        margin-bottom: 10px;
-                        font-size: 24pt;
-                    }}
-                    .datum {{ 
-                        text-align: left; 
-                        margin-bottom: 30px;
-                        font-size: 12pt;
-                    }}
-                    table {{ 
-                        border-collapse: collapse; 
-                        width: 100%;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    }}
-                    th {{ 
-                        background-color: #34495E; 
-                        color: white; 
-                        padding: 15px; 
-                        border: 1px solid black;
-                        font-size: 14pt;
-                    }}
-                    td {{ 
-                        padding: 12px; 
-                        border: 1px solid black; 
-                        text-align: center;
-                        font-size: 12pt;
-                    }}
-                    tr:nth-child(even) {{ 
-                        background-color: #f2f2f2; 
-                    }}
-                    tr:hover {{
-                        background-color: #e8e8e8;
-                    }}
-                    .red {{ 
-                        background-color: #FFB6B6; 
-                        color: #C80000; 
-                        font-weight: bold;
-                        font-size: 14pt;
-                    }}
-                    .footer {{ 
-                        margin-top: 20px; 
-                        font-style: italic;
-                        font-size: 11pt;
-                    }}
-                    .print-button {{
-                        background-color: #4CAF50;
-                        color: white;
-                        padding: 15px 32px;
-                        text-align: center;
-                        font-size: 16px;
-                        margin: 20px 0;
-                        cursor: pointer;
-                        border: none;
-                        border-radius: 4px;
-                    }}
-                    .print-button:hover {{
-                        background-color: #45a049;
-                    }}
-                    @media print {{
-                        .print-button {{ display: none; }}
-                        body {{ margin: 20px; }}
-                    }}
-                </style>
-            </head>
-            <body>
-                <button class="print-button" onclick="window.print()">{T.get('preview_print_btn', self.lang)}</button>
-                
-                <h1>{T.get('order_list_title', self.lang)}</h1>
-                <p class="datum">{T.get('order_date', self.lang)} {datetime.now().strftime('%d.%m.%Y.')}</p>
-                <table>
-                    <tr>
-                        <th>{T.get('col_model', self.lang)}</th>
-                        <th>{T.get('col_min_qty', self.lang)}</th>
-                        <th>{T.get('col_stock', self.lang)}</th>
-                        <th>{T.get('col_for_order', self.lang)}</th>
-                    </tr>
-            """
-            
-            for row in rows:
-                model, min_kol, trenutno, za_nar = row
-                html += f"""
-                    <tr>
-                        <td>{model}</td>
-                        <td>{min_kol}</td>
-                        <td>{trenutno}</td>
-                        <td class="red">{za_nar}</td>
-                    </tr>
-                """
-            
-            html += f"""
-                </table>
-                <p class="footer">{T.get('order_total', self.lang).format(len(rows))}</p>
-            </body>
-            </html>
-            """
-            
-            # Sačuvaj u temp fajl i otvori u browseru
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8')
-            temp_file.write(html)
-            temp_file.close()
-            
-            QDesktopServices.openUrl(QUrl.fromLocalFile(temp_file.name))
-            
-        except Exception as e:
-            QMessageBox.critical(self, T.get("error", self.lang), f"{T.get('error', self.lang)}:\n{str(e)}")
+        rows = [tuple(row) for row in rows]
+        key = self.report_cache.key('narudzba', self.lang, rows)
+        path = self.report_cache.lookup(key)
+        if path:
+            self.open_preview(path)
+            return
+        self.export_jobs.submit(T.get('export_preview_job', self.lang),
+                                lambda job: self.write_preview(key, self._narudzba_html(rows), job),
+                                self.open_preview, self._on_preview_error, total=len(rows))
+    
+    def _narudzba_html(self, rows):
+        """HTML izveštaj narudžbine - količina za naručivanje je crvena"""
+        return HtmlReport(
+            'narudzba',
+            T.get('order_list_title', self.lang),
+            T.get('order_list_title', self.lang),
+            [T.get('col_model', self.lang), T.get('col_min_qty', self.lang),
+             T.get('col_stock', self.lang), T.get('col_for_order', self.lang)],
+            ((model, min_kol, trenutno, (za_nar, 'red')) for model, min_kol, trenutno, za_nar in rows),
+            date_line=f"{T.get('order_date', self.lang)} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=lambda count: T.get('order_total', self.lang).format(count),
+            print_button=T.get('preview_print_btn', self.lang))
     
     def stampaj_narudzbu_pdf(self, rows):
         """Štampa narudžbinu direktno na štampač"""
         try:
             from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-            from PyQt5.QtGui import QTextDocument
-            from datetime import datetime
             
             # Kreiraj printer
             printer = QPrinter(QPrinter.HighResolution)
@@ -3954,58 +5330,18 @@ class MainWindow(QMainWindow):
             if dialog.exec_() != QPrintDialog.Accepted:
                 return
             
-            # Kreiraj HTML dokument za štampanje
-            document = QTextDocument()
-            
-            # HTML sadržaj
-            html = f"""
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                    h1 {{ text-align: center; color: #2C3E50; margin-bottom: 5px; }}
-                    .datum {{ text-align: left; margin-bottom: 20px; }}
-                    table {{ border-collapse: collapse; width: 100%; }}
-                    th {{ background-color: #34495E; color: white; padding: 10px; border: 1px solid black; }}
-                    td {{ padding: 8px; border: 1px solid black; text-align: center; }}
-                    tr:nth-child(even) {{ background-color: #f2f2f2; }}
-                    .red {{ background-color: #FFB6B6; color: #C80000; font-weight: bold; }}
-                    .footer {{ margin-top: 15px; font-style: italic; }}
-                </style>
-            </head>
-            <body>
-                <h1>LISTA ZA NARUČIVANJE TONERA</h1>
-                <p class="datum">Datum: {datetime.now().strftime('%d.%m.%Y.')}</p>
-                <table>
-                    <tr>
-                        <th>Model</th>
-                        <th>Min. količina</th>
-                        <th>Trenutno</th>
-                        <th>Za naručivanje</th>
-                    </tr>
-            """
-            
-            for row in rows:
-                model, min_kol, trenutno, za_nar = row
-                html += f"""
-                    <tr>
-                        <td>{model}</td>
-                        <td>{min_kol}</td>
-                        <td>{trenutno}</td>
-                        <td class="red">{za_nar}</td>
-                    </tr>
-                """
-            
-            html += f"""
-                </table>
-                <p class="footer">Ukupno stavki za naručivanje: {len(rows)}</p>
-            </body>
-            </html>
-            """
-            
-            document.setHtml(html)
-            document.print_(printer)
+            # Kreiraj HTML dokument za štampanje (meri se od posle dijaloga)
+            with INSTRUMENTATION.measure('report_narudzba.print') as record:
+                document = QTextDocument()
+                
+                document.setHtml(HtmlRenderer.render(HtmlReport(
+                    'print_narudzba', '', 'LISTA ZA NARUČIVANJE TONERA',
+                    ['Model', 'Min. količina', 'Trenutno', 'Za naručivanje'],
+                    ((model, min_kol, trenutno, (za_nar, 'red')) for model, min_kol, trenutno, za_nar in rows),
+                    date_line=f"Datum: {datetime.now().strftime('%d.%m.%Y.')}",
+                    footer=lambda count: f"Ukupno stavki za naručivanje: {count}", page='PRINT_PAGE')))
+                document.print_(printer)
+                record.rows = len(rows)
             
             QMessageBox.information(self, T.get("success", self.lang), T.get("msg_sent_to_printer", self.lang))
             
@@ -4014,177 +5350,47 @@ class MainWindow(QMainWindow):
     
     def preview_pregled(self):
         """Prikazuje preview pregleda u browseru"""
+        self.db_worker.submit('report_pregled', lambda: self._fetch_preview('pregled', self._fetch_pregled_report),
+                              self._show_pregled_preview, self._on_report_error)
+    
+    def _show_pregled_preview(self, result):
+        key, path, rows = result
+        if path:
+            self.open_preview(path)
+            return
         try:
-            from datetime import datetime
-            import tempfile
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT 
-                    r.ime || ' ' || r.prezime as radnik,
-                    s.model as stampac_model,
-                    s.status,
-                    GROUP_CONCAT(t.model, ', ') as toneri
-                FROM radnici r
-                LEFT JOIN radnik_stampaci rs ON r.id = rs.radnik_id
-                LEFT JOIN stampaci s ON rs.stampac_id = s.id
-                LEFT JOIN stampac_toneri st ON s.id = st.stampac_id
-                LEFT JOIN toneri t ON st.toner_id = t.id
-                WHERE s.id IS NOT NULL
-                GROUP BY r.id, s.id
-                ORDER BY r.prezime, r.ime, s.model
-            """)
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
             if not rows:
                 QMessageBox.information(self, T.get("info", self.lang), T.get("error_no_data", self.lang))
                 return
             
-            # Kreiraj HTML
-            html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <title>{T.get('preview_overview_title', self.lang)}</title>
-                <style>
-                    body {{ 
-                        font-family: Arial, sans-serif; 
-                        margin: 30px;
-                    }}
-                    h1 {{ 
-                        text-align: center; 
-                        color: #2C3E50; 
-                        margin-bottom: 10px;
-                        font-size: 22pt;
-                    }}
-                    .datum {{ 
-                        text-align: left; 
-                        margin-bottom: 25px;
-                        font-size: 11pt;
-                    }}
-                    table {{ 
-                        border-collapse: collapse; 
-                        width: 100%;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    }}
-                    th {{ 
-                        background-color: #34495E; 
-                        color: white; 
-                        padding: 12px; 
-                        border: 1px solid black;
-                        font-size: 12pt;
-                    }}
-                    td {{ 
-                        padding: 10px; 
-                        border: 1px solid black;
-                        font-size: 11pt;
-                    }}
-                    tr:nth-child(even) {{ 
-                        background-color: #f2f2f2; 
-                    }}
-                    tr:hover {{
-                        background-color: #e8e8e8;
-                    }}
-                    .footer {{ 
-                        margin-top: 15px; 
-                        font-style: italic;
-                        font-size: 10pt;
-                    }}
-                    .print-button {{
-                        background-color: #4CAF50;
-                        color: white;
-                        padding: 15px 32px;
-                        text-align: center;
-                        font-size: 16px;
-                        margin: 20px 0;
-                        cursor: pointer;
-                        border: none;
-                        border-radius: 4px;
-                    }}
-                    .print-button:hover {{
-                        background-color: #45a049;
-                    }}
-                    @media print {{
-                        .print-button {{ display: none; }}
-                        body {{ margin: 15px; }}
-                    }}
-                </style>
-            </head>
-            <body>
-                <button class="print-button" onclick="window.print()">{T.get('preview_print_btn', self.lang)}</button>
-                
-                <h1>{T.get('preview_overview_title', self.lang)}</h1>
-                <p class="datum">Datum: {datetime.now().strftime('%d.%m.%Y.')}</p>
-                <table>
-                    <tr>
-                        <th>{T.get('col_employee', self.lang)}</th>
-                        <th>{T.get('col_printer', self.lang)}</th>
-                        <th>{T.get('col_status', self.lang)}</th>
-                        <th>{T.get('col_toners', self.lang)}</th>
-                    </tr>
-            """
-            
-            for row in rows:
-                radnik, stampac, status, toneri = row
-                html += f"""
-                    <tr>
-                        <td>{radnik if radnik else '-'}</td>
-                        <td>{stampac if stampac else '-'}</td>
-                        <td>{status if status else '-'}</td>
-                        <td>{toneri if toneri else '-'}</td>
-                    </tr>
-                """
-            
-            html += f"""
-                </table>
-                <p class="footer">{T.get('preview_total', self.lang).format(len(rows))}</p>
-            </body>
-            </html>
-            """
-            
-            # Sačuvaj u temp fajl i otvori u browseru
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8')
-            temp_file.write(html)
-            temp_file.close()
-            
-            QDesktopServices.openUrl(QUrl.fromLocalFile(temp_file.name))
+            self.export_jobs.submit(T.get('export_preview_job', self.lang),
+                                    lambda job: self.write_preview(key, self._pregled_html(rows), job),
+                                    self.open_preview, self._on_preview_error, total=len(rows))
                 
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom preview-a:\n{str(e)}")
     
+    def _pregled_html(self, rows, stylesheet='pregled', page='PAGE'):
+        """HTML izveštaj pregleda (radnik, štampač, status, toneri) - prazne vrednosti kao '-'"""
+        return HtmlReport(
+            stylesheet,
+            T.get('preview_overview_title', self.lang),
+            T.get('preview_overview_title', self.lang),
+            [T.get('col_employee', self.lang), T.get('col_printer', self.lang),
+             T.get('col_status', self.lang), T.get('col_toners', self.lang)],
+            ((radnik or '-', stampac or '-', status or '-', toneri or '-') for radnik, stampac, status, toneri in rows),
+            date_line=f"Datum: {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=lambda count: T.get('preview_total', self.lang).format(count),
+            print_button=T.get('preview_print_btn', self.lang), page=page)
+    
     def stampaj_pregled_pdf(self):
         """Štampa pregled direktno na štampač"""
+        self.db_worker.submit('print_pregled', self._fetch_pregled_report, self._print_pregled, self._on_report_error)
+    
+    def _print_pregled(self, result):
+        rows = result
         try:
             from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-            from PyQt5.QtGui import QTextDocument
-            from datetime import datetime
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT 
-                    r.ime || ' ' || r.prezime as radnik,
-                    s.model as stampac_model,
-                    s.status,
-                    GROUP_CONCAT(t.model, ', ') as toneri
-                FROM radnici r
-                LEFT JOIN radnik_stampaci rs ON r.id = rs.radnik_id
-                LEFT JOIN stampaci s ON rs.stampac_id = s.id
-                LEFT JOIN stampac_toneri st ON s.id = st.stampac_id
-                LEFT JOIN toneri t ON st.toner_id = t.id
-                WHERE s.id IS NOT NULL
-                GROUP BY r.id, s.id
-                ORDER BY r.prezime, r.ime, s.model
-            """)
-            
-            rows = cursor.fetchall()
-            conn.close()
             
             if not rows:
                 QMessageBox.information(self, T.get("info", self.lang), T.get("error_no_data", self.lang))
@@ -4200,56 +5406,13 @@ class MainWindow(QMainWindow):
             if dialog.exec_() != QPrintDialog.Accepted:
                 return
             
-            # Kreiraj HTML dokument
-            document = QTextDocument()
-            
-            html = f"""
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 15px; }}
-                    h1 {{ text-align: center; color: #2C3E50; margin-bottom: 5px; font-size: 18pt; }}
-                    .datum {{ text-align: left; margin-bottom: 15px; }}
-                    table {{ border-collapse: collapse; width: 100%; font-size: 9pt; }}
-                    th {{ background-color: #34495E; color: white; padding: 8px; border: 1px solid black; }}
-                    td {{ padding: 6px; border: 1px solid black; }}
-                    tr:nth-child(even) {{ background-color: #f2f2f2; }}
-                    .footer {{ margin-top: 10px; font-style: italic; }}
-                </style>
-            </head>
-            <body>
-                <h1>{T.get('preview_overview_title', self.lang)}</h1>
-                <p class="datum">Datum: {datetime.now().strftime('%d.%m.%Y.')}</p>
-                <table>
-                    <tr>
-                        <th>{T.get('col_employee', self.lang)}</th>
-                        <th>{T.get('col_printer', self.lang)}</th>
-                        <th>{T.get('col_status', self.lang)}</th>
-                        <th>{T.get('col_toners', self.lang)}</th>
-                    </tr>
-            """
-            
-            for row in rows:
-                radnik, stampac, status, toneri = row
-                html += f"""
-                    <tr>
-                        <td>{radnik if radnik else '-'}</td>
-                        <td>{stampac if stampac else '-'}</td>
-                        <td>{status if status else '-'}</td>
-                        <td>{toneri if toneri else '-'}</td>
-                    </tr>
-                """
-            
-            html += f"""
-                </table>
-                <p class="footer">{T.get('preview_total', self.lang).format(len(rows))}</p>
-            </body>
-            </html>
-            """
-            
-            document.setHtml(html)
-            document.print_(printer)
+            # Kreiraj HTML dokument (meri se od posle dijaloga)
+            with INSTRUMENTATION.measure('report_pregled.print') as record:
+                document = QTextDocument()
+                
+                document.setHtml(HtmlRenderer.render(self._pregled_html(rows, 'print_pregled', 'PRINT_PAGE')))
+                document.print_(printer)
+                record.rows = len(rows)
             
             QMessageBox.information(self, T.get("success", self.lang), T.get("msg_sent_to_printer", self.lang))
                 
@@ -4260,199 +5423,196 @@ class MainWindow(QMainWindow):
     def export_narudzbu_excel(self, rows):
         """Eksportuje narudžbinu u Excel"""
         try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment
-            from datetime import datetime
-            import os
-            
-            wb = Workbook()
-            ws = wb.active
-            ws.title = T.get('order_list_title', self.lang)[:31]  # Excel limit 31 chars
-            
-            # Naslov
-            ws['A1'] = T.get('order_list_title', self.lang)
-            ws['A1'].font = Font(size=16, bold=True)
-            ws['A1'].alignment = Alignment(horizontal='center')
-            ws.merge_cells('A1:D1')
-            
-            # Datum
-            ws['A2'] = f"{T.get('order_date', self.lang)} {datetime.now().strftime('%d.%m.%Y.')}"
-            ws['A2'].font = Font(size=11)
-            
-            # Header
-            headers = [
-                T.get('col_model', self.lang), 
-                T.get('col_min_qty', self.lang), 
-                T.get('col_stock', self.lang), 
-                T.get('col_for_order', self.lang)
-            ]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=4, column=col)
-                cell.value = header
-                cell.font = Font(bold=True, color='FFFFFF')
-                cell.fill = PatternFill(start_color='34495E', end_color='34495E', fill_type='solid')
-                cell.alignment = Alignment(horizontal='center')
-            
-            # Data
-            for row_idx, row_data in enumerate(rows, 5):
-                for col_idx, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_idx, column=col_idx)
-                    cell.value = value
-                    cell.alignment = Alignment(horizontal='center')
-                    
-                    # Highlight za naručivanje kolona
-                    if col_idx == 4:
-                        cell.fill = PatternFill(start_color='FFB6B6', end_color='FFB6B6', fill_type='solid')
-                        cell.font = Font(bold=True, color='C80000')
-            
-            # Auto width
-            for col_idx in range(1, 5):  # 4 kolone
-                max_length = 0
-                for row in ws.iter_rows(min_row=4, min_col=col_idx, max_col=col_idx):
-                    for cell in row:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                from openpyxl.utils import get_column_letter
-                ws.column_dimensions[get_column_letter(col_idx)].width = max_length + 2
-            
-            # Footer
-            footer_row = len(rows) + 6
-            if self.lang == 'sr':
-                footer_text = f"Ukupno stavki: {len(rows)}"
-            else:
-                footer_text = f"Total items: {len(rows)}"
-            ws.cell(row=footer_row, column=1).value = footer_text
-            ws.cell(row=footer_row, column=1).font = Font(italic=True)
-            
-            # Save
             filename = f"{'Narudzbina' if self.lang == 'sr' else 'Order'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             filepath = os.path.join(os.getcwd(), filename)
-            wb.save(filepath)
+            self.submit_excel('narudzba', filepath, self._narudzba_sheet(rows), len(rows), self._on_excel_created)
             
-            QMessageBox.information(self, T.get("success", self.lang), T.get("msg_excel_created", self.lang) + "\n\n" + T.get("msg_file", self.lang) + " " + filename)
-            
-            # Otvori fajl
-            import subprocess
-            import platform
-            if platform.system() == 'Windows':
-                os.startfile(filepath)
-            elif platform.system() == 'Darwin':
-                subprocess.Popen(['open', filepath])
-            else:
-                subprocess.Popen(['xdg-open', filepath])
-                
-        except ImportError:
-            QMessageBox.warning(self, T.get("error", self.lang), T.get("error_install_openpyxl", self.lang))
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom kreiranja Excel-a:\n{str(e)}")
     
+    def export_full_excel(self):
+        """Kompletan izvoz: toneri, štampači, radnici, pregled, istorija narudžbina i potrošnje u jednom fajlu"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            T.get("menu_full_export", self.lang),
+            f"{'Kompletan_izvoz' if self.lang == 'sr' else 'Full_export'}_{datetime.now().strftime('%Y%m%d')}.xlsx",
+            "Excel Files (*.xlsx)"
+        )
+        if file_path:
+            self.export_jobs.submit(os.path.basename(file_path),
+                                    lambda job: self._write_full_export(file_path, job),
+                                    lambda counts: self._on_excel_saved(file_path), self._on_export_error)
+    
+    def _write_full_export(self, file_path, job):
+        """Svi listovi se čitaju iz kopije baze (db.snapshot - isti presek baze), a upisuju posle toga -
+        izmene u aplikaciji čekaju samo na kopiranje baze. Vraća broj redova po listu."""
+        exporter = ExcelExporter(job)
+        spooled = []
+        try:
+            with INSTRUMENTATION.measure('report_full.fetch') as record, self.db.snapshot() as conn:
+                version = self.datasets.data_version(conn)
+                toneri = self._snapshot_dataset(conn, version, 'toneri', self._query_toneri)
+                stampaci = self._snapshot_dataset(conn, version, 'stampaci', self._query_stampaci)
+                radnici = self._snapshot_dataset(conn, version, 'radnici', self._query_radnici)
+                pregled = self._snapshot_dataset(conn, version, 'pregled', self._query_pregled)
+                # Pregled: samo povezani redovi (kategorija 0), kao _fetch_pregled_report
+                sheets = (
+                    self._toneri_sheet([row[1:4] for row in toneri.rows], toneri.total),
+                    self._stampaci_sheet([row[1:6] for row in stampaci.rows], stampaci.total),
+                    self._radnici_sheet(radnici.rows),
+                    self._pregled_sheet([row[1:] for row in pregled.rows if row[0] == 0]),
+                    self._narudzbe_istorija_sheet(conn.cursor()),
+                    self._potrosnja_istorija_sheet(conn.cursor()),
+                )
+                for sheet in sheets:
+                    spooled.append(exporter.spool(sheet))
+                record.rows = sum(item.count for item in spooled)
+            with INSTRUMENTATION.measure('report_full.excel') as record:
+                counts = [exporter.write_spooled(item) for item in spooled]
+                exporter.save(file_path)
+                record.rows = sum(counts)
+            return counts
+        finally:
+            for item in spooled:
+                item.file.close()
+    
+    def _snapshot_dataset(self, conn, version, name, build):
+        """Skup iz keša ako je na verziji snapshot-a, inače ga čita u snapshot-u i čuva"""
+        dataset = self.datasets.lookup(name, version)
+        if dataset is None:
+            dataset = self.datasets.store(name, version, *build(conn.cursor()))
+        return dataset
+    
+    def _radnici_sheet(self, rows):
+        """Excel list 'Radnici' - (id, ime, prezime) iz skupa 'radnici'"""
+        return ExcelSheet(
+            'Radnici',
+            T.get('sheet_employees_title', self.lang),
+            ['Br.' if self.lang == 'sr' else 'No.', T.get('col_first_name', self.lang), T.get('col_last_name', self.lang)],
+            ((idx, ime, prezime) for idx, (_, ime, prezime) in enumerate(rows, 1)),
+            ('center_border', 'left_border', 'left_border'),
+            title_style='title18', header_style='header_border',
+            date_line=f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=lambda count: T.get('preview_total', self.lang).format(count), footer_style='footer11', width_pad=3)
+    
+    @staticmethod
+    def _cursor_rows(cursor):
+        """Redovi kursora u blokovima od SPOOL_ROWS - fetchmany meri TimedCursor (i SlowQueryLog),
+        a iteracija kroz kursor ide mimo njega"""
+        rows = cursor.fetchmany(ExcelExporter.SPOOL_ROWS)
+        while rows:
+            yield from rows
+            rows = cursor.fetchmany(ExcelExporter.SPOOL_ROWS)
+    
+    def _narudzbe_istorija_sheet(self, cursor):
+        """Excel list 'Istorija narudžbina' - redovi idu direktno iz kursora, najnovije prvo"""
+        note_map = {
+            'Automatska narudžbina': T.get('auto_order_note', self.lang),
+            'Narudžbina': T.get('manual_order_note', self.lang)
+        }
+        cursor.execute("""
+            SELECT i.datum, t.model, i.kolicina, i.napomena
+            FROM istorija_narudzbi i
+            LEFT JOIN toneri t ON i.toner_id = t.id
+            ORDER BY i.datum DESC, i.id DESC
+        """)
+        return ExcelSheet(
+            'Istorija narudžbina',
+            T.get('sheet_orders_title', self.lang),
+            [T.get('col_date', self.lang), T.get('col_model', self.lang),
+             T.get('col_quantity', self.lang), T.get('col_note', self.lang)],
+            ((datum, model or '-', kolicina, note_map.get(napomena, napomena) if napomena else '-')
+             for datum, model, kolicina, napomena in self._cursor_rows(cursor)),
+            ('center', 'center', 'center', 'left'),
+            date_line=f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=lambda count: T.get('preview_total', self.lang).format(count))
+    
+    def _potrosnja_istorija_sheet(self, cursor):
+        """Excel list 'Istorija potrošnje' - redovi idu direktno iz kursora, najnovije prvo"""
+        cursor.execute("""
+            SELECT p.datum, t.model, p.kolicina
+            FROM istorija_potrosnje p
+            LEFT JOIN toneri t ON p.toner_id = t.id
+            ORDER BY p.datum DESC, p.id DESC
+        """)
+        return ExcelSheet(
+            'Istorija potrošnje',
+            T.get('sheet_consumption_title', self.lang),
+            [T.get('col_date', self.lang), T.get('col_model', self.lang), T.get('col_quantity', self.lang)],
+            ((datum, model or '-', kolicina) for datum, model, kolicina in self._cursor_rows(cursor)),
+            ('center', 'center', 'center'),
+            date_line=f"{'Datum:' if self.lang == 'sr' else 'Date:'} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=lambda count: T.get('preview_total', self.lang).format(count))
+    
+    def _narudzba_sheet(self, rows):
+        """Excel list narudžbine - kolona 'za naručivanje' je crvena"""
+        def footer(count):
+            return f"Ukupno stavki: {count}" if self.lang == 'sr' else f"Total items: {count}"
+        
+        return ExcelSheet(
+            T.get('order_list_title', self.lang),
+            T.get('order_list_title', self.lang),
+            [T.get('col_model', self.lang), T.get('col_min_qty', self.lang),
+             T.get('col_stock', self.lang), T.get('col_for_order', self.lang)],
+            (tuple(row) for row in rows), ('center', 'center', 'center', 'red'),
+            date_line=f"{T.get('order_date', self.lang)} {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=footer)
+    
     def export_pregled_excel(self):
         """Eksportuje pregled u Excel"""
+        self.db_worker.submit('export_pregled', self._fetch_pregled_report, self._write_pregled_excel, self._on_report_error)
+    
+    def _write_pregled_excel(self, result):
+        rows = result
         try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment
-            from datetime import datetime
-            import os
-            
-            conn = self.db.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT 
-                    r.ime || ' ' || r.prezime as radnik,
-                    s.model as stampac_model,
-                    s.status,
-                    GROUP_CONCAT(t.model, ', ') as toneri
-                FROM radnici r
-                LEFT JOIN radnik_stampaci rs ON r.id = rs.radnik_id
-                LEFT JOIN stampaci s ON rs.stampac_id = s.id
-                LEFT JOIN stampac_toneri st ON s.id = st.stampac_id
-                LEFT JOIN toneri t ON st.toner_id = t.id
-                WHERE s.id IS NOT NULL
-                GROUP BY r.id, s.id
-                ORDER BY r.prezime, r.ime, s.model
-            """)
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
             if not rows:
                 QMessageBox.information(self, T.get("info", self.lang), T.get("error_no_export_data", self.lang))
                 return
             
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Pregled"
-            
-            # Naslov
-            ws['A1'] = 'PREGLED ŠTAMPAČA I TONERA PO RADNICIMA'
-            ws['A1'].font = Font(size=16, bold=True)
-            ws['A1'].alignment = Alignment(horizontal='center')
-            ws.merge_cells('A1:D1')
-            
-            # Datum
-            ws['A2'] = f"Datum: {datetime.now().strftime('%d.%m.%Y.')}"
-            ws['A2'].font = Font(size=11)
-            
-            # Header
-            headers = ['Radnik', 'Štampač', 'Status', 'Toneri']
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=4, column=col)
-                cell.value = header
-                cell.font = Font(bold=True, color='FFFFFF')
-                cell.fill = PatternFill(start_color='34495E', end_color='34495E', fill_type='solid')
-                cell.alignment = Alignment(horizontal='center')
-            
-            # Data
-            for row_idx, row_data in enumerate(rows, 5):
-                for col_idx, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_idx, column=col_idx)
-                    cell.value = value if value else '-'
-                    cell.alignment = Alignment(horizontal='left' if col_idx in [1, 4] else 'center')
-            
-            # Auto width
-            for col_idx in range(1, 5):  # 4 kolone
-                max_length = 0
-                for row in ws.iter_rows(min_row=4, min_col=col_idx, max_col=col_idx):
-                    for cell in row:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                from openpyxl.utils import get_column_letter
-                ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 2, 50)
-            
-            # Footer
-            footer_row = len(rows) + 6
-            ws.cell(row=footer_row, column=1).value = f"{T.get('preview_total', self.lang).format(len(rows))}"
-            ws.cell(row=footer_row, column=1).font = Font(italic=True)
-            
             # Save
             filename = f"Pregled_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             filepath = os.path.join(os.getcwd(), filename)
-            wb.save(filepath)
-            
-            QMessageBox.information(self, T.get("success", self.lang), T.get("msg_excel_created", self.lang) + "\n\n" + T.get("msg_file", self.lang) + " " + filename)
+            self.submit_excel('pregled', filepath, self._pregled_sheet(rows), len(rows), self._on_excel_created)
             
-            # Otvori fajl
-            import subprocess
-            import platform
-            if platform.system() == 'Windows':
-                os.startfile(filepath)
-            elif platform.system() == 'Darwin':
-                subprocess.Popen(['open', filepath])
-            else:
-                subprocess.Popen(['xdg-open', filepath])
-                
-        except ImportError:
-            QMessageBox.warning(self, T.get("error", self.lang), T.get("error_install_openpyxl", self.lang))
         except Exception as e:
             QMessageBox.critical(self, T.get("error", self.lang), f"Greška prilikom kreiranja Excel-a:\n{str(e)}")
+    
+    def _pregled_sheet(self, rows):
+        """Excel list 'Pregled' - radnik, štampač, status, toneri (prazno je '-')"""
+        return ExcelSheet(
+            "Pregled",
+            'PREGLED ŠTAMPAČA I TONERA PO RADNICIMA',
+            ['Radnik', 'Štampač', 'Status', 'Toneri'],
+            (tuple(value if value else '-' for value in row) for row in rows),
+            ('left', 'center', 'center', 'left'),
+            date_line=f"Datum: {datetime.now().strftime('%d.%m.%Y.')}",
+            footer=lambda count: T.get('preview_total', self.lang).format(count),
+            max_width=50)
 
 
+def check_indexes():
+    """Komandna linija: --check-indexes proverava da li najčešći upiti koriste indekse"""
+    db = Database()
+    all_ok = True
+    for name, index_name, uses_index, plan in db.check_query_plans():
+        all_ok = all_ok and uses_index
+        print(f"{'✅' if uses_index else '❌'} {name} ({index_name})")
+        if not uses_index:
+            for step in plan:
+                print(f"      {step}")
+    db.close()
+    return 0 if all_ok else 1
+
 
 def main():
+    if '--check-indexes' in sys.argv:
+        sys.exit(check_indexes())
+    
+    startup = StartupSequencer()
     app = QApplication(sys.argv)
     app.setStyle('Fusion')  # Modern izgled
-    window = MainWindow()
+    startup.mark('qapplication')
+    window = MainWindow(startup)
     window.show()
     sys.exit(app.exec_())
 
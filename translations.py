@@ -14,6 +14,8 @@ class T:
         'menu_language': {'sr': 'Jezik', 'en': 'Language'},
         'menu_serbian': {'sr': 'Srpski', 'en': 'Serbian'},
         'menu_english': {'sr': 'Engleski', 'en': 'English'},
+        'menu_export': {'sr': 'Izvoz', 'en': 'Export'},
+        'menu_full_export': {'sr': '📦 Kompletan izvoz u Excel...', 'en': '📦 Full Excel export...'},
         'search_label': {'sr': 'Pretraga:', 'en': 'Search:'},
         'search_placeholder': {'sr': 'Pretraži po bilo čemu...', 'en': 'Search anything...'},
         
@@ -268,6 +270,34 @@ class T:
         'preview_total': {'sr': 'Ukupno zapisa: {}', 'en': 'Total records: {}'},
         'preview_print_btn': {'sr': '🖨️ Štampaj (Ctrl+P)', 'en': '🖨️ Print (Ctrl+P)'},
         
+        # ===== LOADING =====
+        'loading': {'sr': '⏳ Učitavanje...', 'en': '⏳ Loading...'},
+        
+        # ===== DIAGNOSTICS (Ctrl+Shift+D) =====
+        'diag_title': {'sr': 'Dijagnostika performansi', 'en': 'Performance diagnostics'},
+        'diag_startup': {'sr': 'Pokretanje:', 'en': 'Startup:'},
+        'diag_interactive': {'sr': 'spreman za {:.0f} ms', 'en': 'interactive in {:.0f} ms'},
+        'diag_operations': {'sr': 'Operacije (poslednjih {} merenja)', 'en': 'Operations (last {} samples)'},
+        'diag_slowest': {'sr': 'Najsporiji SQL upiti', 'en': 'Slowest SQL queries'},
+        'diag_col_operation': {'sr': 'Operacija', 'en': 'Operation'},
+        'diag_col_calls': {'sr': 'Poziva', 'en': 'Calls'},
+        'diag_col_rows': {'sr': 'Redova', 'en': 'Rows'},
+        'diag_col_time': {'sr': 'Vreme', 'en': 'Time'},
+        'diag_col_sql': {'sr': 'SQL', 'en': 'SQL'},
+        'btn_export_json': {'sr': '💾 Izvezi JSON', 'en': '💾 Export JSON'},
+        'btn_clear': {'sr': '🗑️ Obriši merenja', 'en': '🗑️ Clear samples'},
+        'msg_diag_exported': {'sr': 'Dijagnostika sačuvana:', 'en': 'Diagnostics saved:'},
+        
+        # ===== EXPORT JOBS =====
+        'export_running': {'sr': '⏳ {}', 'en': '⏳ {}'},
+        'export_queued': {'sr': '(+{} na čekanju)', 'en': '(+{} queued)'},
+        'export_rows': {'sr': '{} redova', 'en': '{} rows'},
+        'export_preview_job': {'sr': 'Priprema pregleda za štampu', 'en': 'Preparing print preview'},
+        'msg_export_cancelled': {'sr': 'Izvoz je otkazan', 'en': 'Export cancelled'},
+        'sheet_employees_title': {'sr': 'LISTA RADNIKA', 'en': 'EMPLOYEE LIST'},
+        'sheet_orders_title': {'sr': 'ISTORIJA NARUDŽBINA', 'en': 'ORDER HISTORY'},
+        'sheet_consumption_title': {'sr': 'ISTORIJA POTROŠNJE', 'en': 'CONSUMPTION HISTORY'},
+        
         # ===== TOOLTIPS =====
         'tooltip_click_link': {'sr': 'Klikni da otvoriš link', 'en': 'Click to open link'},
         